@@ -1,5 +1,4 @@
-from flask import Flask, render_template, redirect, url_for, request, flash, jsonify, session
-from flask_bcrypt import Bcrypt
+from flask import Blueprint, Flask, Response, current_app, g, render_template, redirect, url_for, request, flash, jsonify, session
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_limiter import Limiter
@@ -8,46 +7,95 @@ import os
 from werkzeug.utils import secure_filename
 import time
 from datetime import datetime, timedelta
-from flask_migrate import Migrate
-import logging
-from logging.handlers import RotatingFileHandler
 import json
 
-from models import db, User, Post, Comment, Notification, Conversation, Message, Achievement, UserAchievement
+import click
+
+from config import config
+from models import db, User, Post, Notification, Conversation, Message, Achievement, UserAchievement, NOTIFICATION_TYPES, DEFAULT_ACHIEVEMENTS
+import audit
+import bulk
+import comments
+import compression
+import counters
+import database
+import follow_graph
+import fragments
+import identity
+import instrumentation
+import jobs
+import page_cache
+import passwords
+import query_plans
+import ratelimit
+import read_models
+import retention
+import rollups
+import stats
+import structured_logging
+import user_search
+from database import decode_cursor, encode_cursor, read_only
+from page_cache import cached_page
+from passwords import PasswordHasherBusy, password_hasher
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'gizli_anahtar_cok_uzun_ve_guvenli_bir_anahtar_olmalı'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
-app.config["TEMPLATES_AUTO_RELOAD"] = True
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Güvenlik ayarları
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
-app.config['SESSION_COOKIE_SECURE'] = False  # Production'da True yap
-app.config['SESSION_COOKIE_HTTPONLY'] = True
-app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-
-# Fotoğraf yükleme klasörleri
-app.config['POST_IMAGES_FOLDER'] = os.path.join('static', 'post_images')
-app.config['PROFILE_PIC_FOLDER'] = os.path.join('static', 'profile_images')
-app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5 MB
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
-# Flask eklentileri
-bcrypt = Bcrypt(app)
-login_manager = LoginManager(app)
-login_manager.login_view = 'login'
-db.init_app(app)
-migrate = Migrate(app, db)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
-
-# Rate Limiter
-limiter = Limiter(
-    get_remote_address,
-    app=app,
-    default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
-)
+# Eklentiler uygulamasız oluşturulur; create_app içinde init_app ile bağlanır
+login_manager = LoginManager()
+login_manager.login_view = 'main.login'
+socketio = SocketIO()
+# Rate Limiter: süreçler arası SQLite deposu, kullanıcı/IP anahtarı (ratelimit.py)
+limiter = Limiter(ratelimit.rate_limit_key, default_limits=["200 per day", "50 per hour"])
+# Yazma işlemleri ortak kotadan maliyetlerine göre düşer
+write_limit = limiter.shared_limit(ratelimit.write_quota, scope='writes',
+                                   cost=ratelimit.request_cost, methods=['POST'])
+
+main = Blueprint('main', __name__, cli_group=None)
+
+
+def create_app(config_name=None):
+    """Uygulama fabrikası; config_name verilmezse FLASK_CONFIG (varsayılan: development).
+
+    `flask` komutları fabrikayı kendisi bulur; gunicorn için `app:create_app()`.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config[config_name or os.environ.get('FLASK_CONFIG', 'default')])
+    # Şablonlar yalnızca debug modunda (ya da TEMPLATES_AUTO_RELOAD=1 ile) her render'da yoklanır
+    if os.environ.get('TEMPLATES_AUTO_RELOAD'):
+        app.config["TEMPLATES_AUTO_RELOAD"] = os.environ['TEMPLATES_AUTO_RELOAD'] == '1'
+
+    comments.init_app(app)
+    fragments.init_app(app)  # jinja_env oluşturulmadan önce (bytecode önbelleği)
+    compression.init_app(app)  # after_request kancası en son çalışsın diye ilk sırada
+    passwords.init_app(app)
+    login_manager.init_app(app)
+    database.init_app(app, db)
+    instrumentation.init_app(app, db)
+    if click.get_current_context(silent=True) is not None:
+        # `flask db` komutları yalnızca CLI'da; alembic importu worker açılışını yavaşlatır
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    socketio.init_app(app, cors_allowed_origins="*", async_mode='threading')
+    query_plans.init_app(app)
+    counters.init_app(app)
+    stats.init_app(app)
+    rollups.init_app(app)
+    identity.init_app(app)
+    audit.init_app(app)
+    page_cache.init_app(app)
+    follow_graph.init_app(app)
+    user_search.init_app(app)
+    retention.init_app(app)
+    jobs.init_app(app)
+    bulk.init_app(app)
+    ratelimit.init_app(app)  # limiter'dan önce: depolama ayarları
+    limiter.init_app(app)
+    app.register_blueprint(main)
+
+    # Logging: kuyruk üzerinden arka planda JSON satırları (structured_logging.py)
+    structured_logging.init_app(app)
+    app.logger.info('SocialApp startup')
+    return app
 
 # Basit Cache Sınıfı (Redis yerine)
 class SimpleCache:
@@ -86,49 +134,14 @@ class SimpleCache:
     
     def scard(self, key):
         return len(self.cache.get(key, set()))
-    
-    def lpush(self, key, value):
-        if key not in self.cache:
-            self.cache[key] = []
-        self.cache[key].insert(0, value)
-    
-    def lrange(self, key, start, end):
-        if key in self.cache:
-            return self.cache[key][start:end]
-        return []
-    
-    def ltrim(self, key, start, end):
-        if key in self.cache:
-            self.cache[key] = self.cache[key][start:end]
 
 # Redis yerine basit cache kullan
 redis_client = SimpleCache()
 
-# Varsayılan Başarımlar (HATA DÜZELTME)
-DEFAULT_ACHIEVEMENTS = [
-    {'name': 'İlk Gönderi', 'description': 'İlk gönderini paylaştın!', 'points': 50, 'condition': 'posts_count >= 1'},
-    {'name': 'Aktif Kullanıcı', 'description': '10 gönderi paylaştın!', 'points': 100, 'condition': 'posts_count >= 10'},
-    {'name': 'Popüler', 'description': '5 takipçi kazandın!', 'points': 150, 'condition': 'followers_count >= 5'},
-    {'name': 'Ünlü', 'description': '20 takipçi kazandın!', 'points': 300, 'condition': 'followers_count >= 20'},
-    {'name': 'Puan Canavarı', 'description': '100 puan kazandın!', 'points': 50, 'condition': 'points >= 100'},
-    {'name': 'Efsane', 'description': '500 puan kazandın!', 'points': 200, 'condition': 'points >= 500'},
-]
-
-# Logging
-if not os.path.exists('logs'):
-    os.makedirs('logs')
-file_handler = RotatingFileHandler('logs/socialapp.log', maxBytes=10240, backupCount=10)
-file_handler.setFormatter(logging.Formatter(
-    '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-))
-file_handler.setLevel(logging.INFO)
-app.logger.addHandler(file_handler)
-app.logger.setLevel(logging.INFO)
-app.logger.info('SocialApp startup')
-
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Sürümlü kimlik önbelleği; tam ORM nesnesi yalnızca current_user.orm ile
+    return identity.identity_cache.load(int(user_id))
 
 # ===================== HELPER FUNCTIONS =====================
 
@@ -136,72 +149,60 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def log_security_event(event_type, user_id, ip_address, details):
-    """Güvenlik olaylarını loglar"""
-    security_log = {
-        'timestamp': datetime.utcnow().isoformat(),
-        'event_type': event_type,
-        'user_id': user_id,
-        'ip_address': ip_address,
-        'details': details
-    }
-    redis_client.lpush('security_events', json.dumps(security_log))
-    redis_client.ltrim('security_events', 0, 999)  # Son 1000 olayı tut
+    """Güvenlik olaylarını loglar (halka tampon + arka planda denetim veritabanı)"""
+    audit.security_audit.record(event_type, user_id, ip_address, details)
+
+def timestamp_cursor(cursor):
+    """(timestamp, id) imlecini çözer; geçersizse ilk sayfa"""
+    values = decode_cursor(cursor, 2)
+    if not values:
+        return None
+    try:
+        return datetime.fromisoformat(values[0]), int(values[1])
+    except (TypeError, ValueError):
+        return None
 
 def get_user_stats(user_id):
-    """Kullanıcı istatistiklerini getirir"""
-    stats = redis_client.get(f'user_stats:{user_id}')
-    if stats:
-        return json.loads(stats)
-    
-    user = User.query.get(user_id)
-    if not user:
+    """Kullanıcı istatistiklerini getirir (user_stats özet tablosundan tek sorgu)"""
+    snapshot = stats.get_stats_snapshot(user_id)
+    if not snapshot:
         return {}
-    
-    stats = {
-        'posts_count': user.posts_count(),
-        'followers_count': user.followers_count(),
-        'following_count': user.following_count(),
-        'likes_received': sum(post.like_count for post in user.user_posts),
-        'comments_received': sum(post.comment_count for post in user.user_posts),
-        'points': user.points,
-        'level': user.level,
-        'achievements_count': UserAchievement.query.filter_by(user_id=user_id).count()
-    }
-    
-    # 1 saat cache'le
-    redis_client.setex(f'user_stats:{user_id}', 3600, json.dumps(stats))
-    return stats
+    return snapshot.to_dict()
 
 # ===================== SOCKET.IO HANDLERS =====================
 
 @socketio.on('connect')
+@instrumentation.track_socket_event('connect')
 def handle_connect():
     if current_user.is_authenticated:
         join_room(f'user_{current_user.id}')
-        app.logger.info(f'User {current_user.username} connected')
+        current_app.logger.info(f'User {current_user.username} connected',
+                        extra={'sample': 'socket_connect'})
         emit('notification_count', {
             'count': current_user.get_unread_notifications_count()
         })
 
 @socketio.on('disconnect')
+@instrumentation.track_socket_event('disconnect')
 def handle_disconnect():
     if current_user.is_authenticated:
         leave_room(f'user_{current_user.id}')
-        app.logger.info(f'User {current_user.username} disconnected')
+        current_app.logger.info(f'User {current_user.username} disconnected',
+                        extra={'sample': 'socket_disconnect'})
 
 @socketio.on('mark_notification_read')
+@instrumentation.track_socket_event('mark_notification_read')
 def handle_mark_notification_read(data):
     notification_id = data.get('notification_id')
     if notification_id:
-        notification = Notification.query.get(notification_id)
-        if notification and notification.user_id == current_user.id:
-            notification.is_read = True
+        if current_user.mark_notifications_read(ids=[notification_id]):
             db.session.commit()
             emit('notification_count', {
                 'count': current_user.get_unread_notifications_count()
             })
 
 @socketio.on('send_message')
+@instrumentation.track_socket_event('send_message')
 def handle_send_message(data):
     conversation_id = data.get('conversation_id')
     content = data.get('content')
@@ -210,6 +211,10 @@ def handle_send_message(data):
     if not content or len(content.strip()) == 0:
         return
     
+    if not ratelimit.allow_socket_event(limiter, 'send_message'):
+        emit('rate_limited', {'event': 'send_message'})
+        return
+    
     if conversation_id:
         conversation = Conversation.query.get(conversation_id)
         if conversation and current_user.id in [p.id for p in conversation.participants]:
@@ -219,51 +224,75 @@ def handle_send_message(data):
                 content=content.strip()
             )
             db.session.add(message)
-            db.session.commit()
-            
-            # Alıcılara gönder
-            for participant in conversation.participants:
-                if participant.id != current_user.id:
-                    emit('new_message', {
-                        'message_id': message.id,
-                        'content': message.content,
-                        'sender': current_user.username,
-                        'timestamp': message.timestamp.isoformat(),
-                        'conversation_id': conversation.id
-                    }, room=f'user_{participant.id}')
-                    
-                    # Bildirim oluştur
-                    notification = Notification(
-                        user_id=participant.id,
-                        message=f'{current_user.username}: {message.content[:50]}...',
-                        notification_type='message',
-                        related_id=conversation.id
-                    )
-                    db.session.add(notification)
+            rollups.record('messages')
+            db.session.flush()
+            conversation.record_message(message)  # gelen kutusu sırası ve önizleme
             
+            recipients = [p.id for p in conversation.participants if p.id != current_user.id]
+            # Bildirim kayıtları arka planda (jobs.py)
+            for recipient_id in recipients:
+                jobs.enqueue('notify', {
+                    'user_id': recipient_id,
+                    'message': f'{current_user.username}: {message.content[:50]}...',
+                    'notification_type': 'message',
+                    'related_id': conversation.id
+                }, key=f'message:{message.id}:{recipient_id}')
             db.session.commit()
+            
+            # Mesajın kendisi gerçek zamanlı teslim edilir; kuyruğu beklemez
+            for recipient_id in recipients:
+                emit('new_message', {
+                    'message_id': message.id,
+                    'content': message.content,
+                    'sender': current_user.username,
+                    'timestamp': message.timestamp.isoformat(),
+                    'conversation_id': conversation.id
+                }, room=f'user_{recipient_id}')
+
+# ===================== ARKA PLAN İŞLERİ =====================
+
+@jobs.job('notify', concurrency=2)
+def notify_job(user_id, message, notification_type, related_id=None, push=None):
+    """Bildirimi kaydeder; push verildiyse commit sonrası kullanıcının odasına gönderir"""
+    db.session.add(Notification(
+        user_id=user_id,
+        message=message,
+        notification_type=notification_type,
+        related_id=related_id
+    ))
+    if push:
+        jobs.after_commit(lambda: socketio.emit('new_notification', push,
+                                                room=f'user_{user_id}', namespace='/'))
+
+@jobs.job('reward', concurrency=1)
+def reward_job(user_id, points=0):
+    """Puan ekler ve başarımları kontrol eder; puanlar SQL tarafında artırılır, süreçler arası yarışmaz"""
+    user = db.session.get(User, user_id)
+    if user is None:
+        return
+    if points:
+        user.add_points(points)
+    user.check_achievements()
 
 # ===================== ROUTES =====================
 
-@app.route("/")
+@main.route("/")
+@cached_page(tags=('index',))
+@read_only
 def index():
-    # İstatistikleri cache'le
-    site_stats = redis_client.get('site_stats')
-    if not site_stats:
-        site_stats = {
-            'total_users': User.query.count(),
-            'total_posts': Post.query.count(),
-            'total_comments': Comment.query.count(),
-            'online_users': len(redis_client.smembers('online_users') or [])
-        }
-        redis_client.setex('site_stats', 300, json.dumps(site_stats))  # 5 dakika cache
-    else:
-        site_stats = json.loads(site_stats)
+    # Toplamlar metrik kovalarından okunur (rollups.py)
+    totals = rollups.totals(['signups', 'posts', 'comments'])
+    site_stats = {
+        'total_users': totals['signups'],
+        'total_posts': totals['posts'],
+        'total_comments': totals['comments'],
+        'online_users': len(redis_client.smembers('online_users') or [])
+    }
     
     return render_template("index.html", site_stats=site_stats)
 
-@app.route("/register", methods=["GET", "POST"])
-@limiter.limit("5 per minute")
+@main.route("/register", methods=["GET", "POST"])
+@limiter.limit("5 per minute", key_func=get_remote_address, methods=['POST'])
 def register():
     if request.method == "POST":
         username = request.form["username"].strip()
@@ -275,13 +304,17 @@ def register():
             flash("Bu kullanıcı adı zaten alınmış!", "danger")
             log_security_event('register_attempt', None, request.remote_addr, 
                              f'Username already exists: {username}')
-            return redirect(url_for("register"))
+            return redirect(url_for("main.register"))
 
         if len(password) < 8:
             flash("Şifre en az 8 karakter olmalı.", "warning")
-            return redirect(url_for("register"))
+            return redirect(url_for("main.register"))
 
-        hashed_pw = bcrypt.generate_password_hash(password).decode('utf-8')
+        try:
+            hashed_pw = password_hasher.hash(password)
+        except PasswordHasherBusy:
+            flash("Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.", "warning")
+            return render_template("register.html"), 503
         user = User(
             username=username,
             password=hashed_pw,
@@ -289,73 +322,69 @@ def register():
             profile_image="default_avatar.png"
         )
         db.session.add(user)
+        rollups.record('signups')
         db.session.commit()
         
-        # Varsayılan başarımları ekle (HATA DÜZELTME)
-        achievements = Achievement.query.all()
-        if not achievements:
-            for achievement_data in DEFAULT_ACHIEVEMENTS:
-                achievement = Achievement(**achievement_data)
-                db.session.add(achievement)
-            db.session.commit()
-            achievements = Achievement.query.all()
-        
         flash("Kayıt başarılı, şimdi giriş yapabilirsin!", "success")
         log_security_event('register_success', user.id, request.remote_addr, 
                          f'New user: {username}')
-        return redirect(url_for("login"))
+        return redirect(url_for("main.login"))
 
     return render_template("register.html")
 
-@app.route("/login", methods=["GET", "POST"])
-@limiter.limit("5 per minute")
+@main.route("/login", methods=["GET", "POST"])
+@limiter.limit("5 per minute", key_func=get_remote_address, methods=['POST'],
+               deduct_when=ratelimit.login_failed)
+@limiter.limit("20 per hour", key_func=ratelimit.login_username_key, methods=['POST'],
+               deduct_when=ratelimit.login_failed)
 def login():
     if request.method == "POST":
         username = request.form["username"].strip()
         password = request.form["password"]
         
-        # Brute-force koruması
-        attempt_key = f"login_attempts:{request.remote_addr}"
-        attempts = redis_client.get(attempt_key) or 0
-        if int(attempts) >= 5:
-            flash("Çok fazla deneme yaptınız. Lütfen 15 dakika bekleyin.", "danger")
-            return redirect(url_for("login"))
-        
         user = User.query.filter_by(username=username).first()
         
-        if user and bcrypt.check_password_hash(user.password, password):
+        try:
+            verified = user is not None and password_hasher.verify(user.password, password)
+        except PasswordHasherBusy:
+            flash("Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.", "warning")
+            return render_template("login.html"), 503
+        
+        if verified:
             # Başarılı giriş
+            if password_hasher.needs_rehash(user.password):
+                # Maliyet faktörü değiştiyse şifreyi yeni maliyetle sakla
+                try:
+                    user.password = password_hasher.hash(password)
+                except PasswordHasherBusy:
+                    pass
             login_user(user)
             user.last_login = datetime.utcnow()
-            user.login_attempts = 0
             db.session.commit()
             
-            redis_client.delete(attempt_key)
             redis_client.sadd('online_users', user.id)
+            page_cache.page_cache.invalidate('index')  # çevrimiçi sayısı
             
             flash("Giriş başarılı!", "success")
             log_security_event('login_success', user.id, request.remote_addr, 
                              f'Successful login')
-            return redirect(url_for("dashboard"))
+            return redirect(url_for("main.dashboard"))
         else:
-            # Başarısız giriş
-            redis_client.incr(attempt_key)
-            redis_client.expire(attempt_key, 900)  # 15 dakika
-            
+            # Başarısız giriş (deneme sınırları limiter'da: IP ve kullanıcı adı + IP bazında,
+            # yalnızca başarısız denemeler sayılır)
+            g.login_failed = True
             flash("Hatalı kullanıcı adı veya şifre!", "danger")
             log_security_event('login_failed', None, request.remote_addr, 
                              f'Failed login attempt for: {username}')
     
     return render_template("login.html")
 
-@app.route("/dashboard")
+@main.route("/dashboard")
 @login_required
 def dashboard():
     user_stats = get_user_stats(current_user.id)
     recent_notifications = current_user.get_recent_notifications(5)
-    recent_messages = Message.query.join(Conversation).filter(
-        Conversation.participants.any(id=current_user.id)
-    ).order_by(Message.timestamp.desc()).limit(5).all()
+    recent_messages = current_user.get_recent_messages(5)
     
     return render_template("dashboard.html", 
                          name=current_user.username,
@@ -363,8 +392,10 @@ def dashboard():
                          notifications=recent_notifications,
                          messages=recent_messages)
 
-@app.route("/posts", methods=["GET", "POST"])
+@main.route("/posts", methods=["GET", "POST"])
+@write_limit
 @login_required
+@read_only
 def posts():
     if request.method == "POST":
         content = request.form["content"]
@@ -372,18 +403,18 @@ def posts():
 
         if not content.strip():
             flash("Gönderi içeriği boş olamaz!", "warning")
-            return redirect(url_for("posts"))
+            return redirect(url_for("main.posts"))
 
         image_filename = None
         if image and allowed_file(image.filename):
             secure_name = secure_filename(image.filename)
             timestamp = str(int(time.time()))
             image_filename = f"{current_user.username}_{timestamp}_{secure_name}"
-            image_path = os.path.join(app.root_path, app.config['POST_IMAGES_FOLDER'], image_filename)
+            image_path = os.path.join(current_app.root_path, current_app.config['POST_IMAGES_FOLDER'], image_filename)
             image.save(image_path)
         elif image:
             flash("Geçersiz dosya türü!", "danger")
-            return redirect(url_for("posts"))
+            return redirect(url_for("main.posts"))
 
         post = Post(
             body=content.strip(),
@@ -395,163 +426,207 @@ def posts():
         hashtags = post.extract_hashtags()
         
         db.session.add(post)
-        db.session.commit()
+        current_user.increment_counters(post_count=1)
+        rollups.record('posts')
+        db.session.flush()
         
-        # Puan ve başarım
-        current_user.add_points(10)
-        current_user.check_achievements()
+        # Puan ve başarım arka planda
+        jobs.enqueue('reward', {'user_id': current_user.id, 'points': 10}, key=f'reward:post:{post.id}')
+        db.session.commit()
         
         flash("Gönderi paylaşıldı! +10 puan", "success")
-        return redirect(url_for("posts"))
+        return redirect(url_for("main.posts"))
 
     # Önbelleklenmiş gönderileri getir
     cache_key = f'posts:{current_user.id}'
     cached_posts = redis_client.get(cache_key)
     
     if cached_posts:
-        posts_data = json.loads(cached_posts)
+        posts_data = [read_models.FeedPost(**post) for post in json.loads(cached_posts)]
     else:
-        # Takip edilenlerin gönderileri + kendi gönderileri
-        followed_posts = current_user.followed_posts()
-        own_posts = Post.query.filter_by(user_id=current_user.id)
-        all_posts = followed_posts.union(own_posts).order_by(Post.timestamp.desc()).all()
-        
-        posts_data = []
-        for post in all_posts:
-            posts_data.append({
-                'id': post.id,
-                'body': post.body,
-                'hashtags': post.hashtags,
-                'timestamp': post.timestamp.isoformat(),
-                'author': post.author.username,
-                'author_image': post.author.profile_image,
-                'image': post.image,
-                'like_count': post.like_count,
-                'comment_count': post.comment_count,
-                'is_liked': post.is_liked_by(current_user),
-                'comments': [
-                    {
-                        'body': c.body,
-                        'username': c.user.username,
-                        'timestamp': c.timestamp.isoformat()
-                    } for c in post.post_comments[:3]  # İlk 3 yorum
-                ]
-            })
+        # Takip edilenlerin gönderileri + kendi gönderileri (read_models.py, ORM'siz)
+        posts_data = read_models.feed(current_user.id)
         
         # 1 dakika cache'le
-        redis_client.setex(cache_key, 60, json.dumps(posts_data))
+        redis_client.setex(cache_key, 60, json.dumps([post._asdict() for post in posts_data], default=str))
     
     return render_template("posts.html", posts=posts_data)
 
-@app.route('/like_post/<int:post_id>', methods=['POST'])
+@main.route('/like_post/<int:post_id>', methods=['POST'])
+@write_limit
 @login_required
 def like_post(post_id):
     post = Post.query.get_or_404(post_id)
     
     if post.is_liked_by(current_user):
-        post.unlike(current_user)
+        post.unlike(current_user.orm)
+        rollups.record('likes', -1)
         message = "Beğeniden çıkarıldı"
         notification_type = 'unlike'
     else:
-        post.like(current_user)
+        post.like(current_user.orm)
+        rollups.record('likes')
         message = "Gönderi beğenildi"
         notification_type = 'like'
         
-        # Bildirim oluştur (kendi gönderini beğenmediyse)
-        if post.author.id != current_user.id:
-            notification = Notification(
-                user_id=post.author.id,
-                message=f'{current_user.username} gönderini beğendi',
-                notification_type='like',
-                related_id=post.id
-            )
-            db.session.add(notification)
-            
-            # Socket.IO ile bildirim gönder
-            emit('new_notification', {
+        # Bildirim (kendi gönderini beğenmediyse); beğen-vazgeç-beğen tek bildirim
+        if post.user_id != current_user.id:
+            jobs.enqueue('notify', {
+                'user_id': post.user_id,
                 'message': f'{current_user.username} gönderini beğendi',
-                'type': 'like'
-            }, room=f'user_{post.author.id}', namespace='/')
+                'notification_type': 'like',
+                'related_id': post.id,
+                'push': {'message': f'{current_user.username} gönderini beğendi', 'type': 'like'}
+            }, key=f'like:{post.id}:{current_user.id}')
     
     db.session.commit()
     flash(message, "success")
-    return redirect(url_for('posts'))
+    return redirect(url_for('main.posts'))
 
-@app.route('/comment_post/<int:post_id>', methods=['POST'])
+@main.route('/comment_post/<int:post_id>', methods=['POST'])
+@write_limit
 @login_required
 def comment_post(post_id):
     post = Post.query.get_or_404(post_id)
     comment_content = request.form['comment']
     
     if comment_content.strip():
-        comment = Comment(
-            body=comment_content.strip(),
-            post_id=post.id,
-            user_id=current_user.id
-        )
-        db.session.add(comment)
-        post.comment_count = len(post.post_comments)
+        comment = comments.add_comment(post, current_user.id, comment_content.strip())
+        rollups.record('comments')
+        db.session.flush()
         
-        # Bildirim oluştur (kendi gönderine yorum yapmadıysa)
-        if post.author.id != current_user.id:
-            notification = Notification(
-                user_id=post.author.id,
-                message=f'{current_user.username} gönderine yorum yaptı: {comment_content[:30]}...',
-                notification_type='comment',
-                related_id=post.id
-            )
-            db.session.add(notification)
-            
-            # Socket.IO ile bildirim gönder
-            emit('new_notification', {
-                'message': f'{current_user.username} gönderine yorum yaptı',
-                'type': 'comment'
-            }, room=f'user_{post.author.id}', namespace='/')
-        
-        # Puan ve başarım
-        current_user.add_points(5)
-        current_user.check_achievements()
+        # Bildirim (kendi gönderine yorum yapmadıysa), puan ve başarım arka planda
+        if post.user_id != current_user.id:
+            jobs.enqueue('notify', {
+                'user_id': post.user_id,
+                'message': f'{current_user.username} gönderine yorum yaptı: {comment_content[:30]}...',
+                'notification_type': 'comment',
+                'related_id': post.id,
+                'push': {'message': f'{current_user.username} gönderine yorum yaptı', 'type': 'comment'}
+            }, key=f'comment:{comment.id}')
+        jobs.enqueue('reward', {'user_id': current_user.id, 'points': 5}, key=f'reward:comment:{comment.id}')
         
         db.session.commit()
         flash("Yorum eklendi! +5 puan", "success")
     else:
         flash("Yorum boş olamaz!", "warning")
     
-    return redirect(url_for('posts'))
+    return redirect(url_for('main.posts'))
 
-@app.route("/logout")
+@main.route("/logout")
 @login_required
 def logout():
     redis_client.srem('online_users', current_user.id)
+    page_cache.page_cache.invalidate('index')
     logout_user()
     flash("Çıkış yapıldı.", "info")
-    return redirect(url_for("login"))
+    return redirect(url_for("main.login"))
 
-@app.route("/admin")
+@main.route("/profile", methods=["GET", "POST"])
+@write_limit
 @login_required
+def profile():
+    if request.method == "POST":
+        current_user.bio = request.form.get("bio", "").strip()
+        image = request.files.get("profile_image")
+
+        if image and allowed_file(image.filename):
+            extension = image.filename.rsplit('.', 1)[1].lower()
+            image_filename = f"{secure_filename(current_user.username)}_{int(time.time())}.{extension}"
+            image_path = os.path.join(current_app.root_path, current_app.config['PROFILE_PIC_FOLDER'], image_filename)
+            image.save(image_path)
+            current_user.profile_image = image_filename
+        elif image:
+            flash("Geçersiz dosya türü!", "danger")
+            return redirect(url_for("main.profile"))
+
+        db.session.commit()
+        flash("Profil güncellendi!", "success")
+        return redirect(url_for("main.profile"))
+
+    # Sayaçlar User satırında: ek COUNT sorgusu yok
+    stats = {
+        'followers': current_user.followers_count(),
+        'following': current_user.following_count(),
+        'posts': current_user.posts_count()
+    }
+    return render_template("profile.html", user=current_user, stats=stats)
+
+@main.route("/user/<username>")
+@read_only
+def user_profile(username):
+    user = User.query.filter_by(username=username).first_or_404()
+    user_posts = user.posts.order_by(Post.timestamp.desc()).limit(20).all()
+    is_following = (current_user.is_authenticated
+                    and follow_graph.follow_graph.is_following(current_user.id, user.id))
+    return render_template("users.html", user=user, posts=user_posts, is_following=is_following)
+
+@main.route("/users")
+@login_required
+@read_only
+def user_directory():
+    query = request.args.get('q', '').strip()
+    users, next_cursor = user_search.search_users(query, limit=30, cursor=request.args.get('cursor'))
+    return render_template("directory.html", users=users, query=query, next_cursor=next_cursor)
+
+@main.route('/api/users/search')
+@limiter.limit("120 per minute")
+@login_required
+@read_only
+def api_user_search():
+    # Yazarken öneri (@mention, konuşma başlatma); en az bir karakter
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'users': [], 'next_cursor': None})
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    users, next_cursor = user_search.search_users(query, limit=limit, cursor=request.args.get('cursor'))
+    return jsonify({'users': users, 'next_cursor': next_cursor})
+
+@main.route("/follow/<username>", methods=["POST"])
+@write_limit
+@login_required
+def follow(username):
+    user = User.query.filter_by(username=username).first_or_404()
+    if user.id == current_user.id:
+        flash("Kendinizi takip edemezsiniz!", "warning")
+    else:
+        current_user.follow(user)
+        # Takipçi sayısına bağlı başarımlar takip edilen kullanıcıya ait
+        jobs.enqueue('reward', {'user_id': user.id})
+        db.session.commit()
+        flash(f"{user.username} takip ediliyor.", "success")
+    return redirect(url_for("main.user_profile", username=username))
+
+@main.route("/unfollow/<username>", methods=["POST"])
+@write_limit
+@login_required
+def unfollow(username):
+    user = User.query.filter_by(username=username).first_or_404()
+    current_user.unfollow(user)
+    db.session.commit()
+    flash(f"{user.username} takipten çıkarıldı.", "info")
+    return redirect(url_for("main.user_profile", username=username))
+
+@main.route("/admin")
+@login_required
+@read_only
 def admin_panel():
     if current_user.username != "admin":
         flash("Yetkisiz erişim!", "danger")
-        return redirect(url_for("dashboard"))
+        return redirect(url_for("main.dashboard"))
     
     # Admin istatistikleri
-    total_users = User.query.count()
-    total_posts = Post.query.count()
-    total_comments = Comment.query.count()
+    totals = rollups.totals(['signups', 'posts', 'comments'])
+    total_users = totals['signups']
+    total_posts = totals['posts']
+    total_comments = totals['comments']
     online_users = len(redis_client.smembers('online_users') or [])
     
     # Son güvenlik olayları
-    security_events = []
-    events = redis_client.lrange('security_events', 0, 49)
-    for event in events:
-        security_events.append(json.loads(event))
-    
-    # Sistem durumu (HATA DÜZELTME - psutil kaldırıldı)
-    system_stats = {
-        'memory_usage': 0,
-        'disk_usage': 0,
-        'uptime': 0
-    }
+    security_events = audit.security_audit.recent(50)
+    
+    # Sistem durumu: /proc üzerinden RSS ve çalışma süresi
+    system_stats = instrumentation.system_stats(current_app.instance_path)
     
     return render_template("admin_panel.html",
                          total_users=total_users,
@@ -561,31 +636,57 @@ def admin_panel():
                          security_events=security_events,
                          system_stats=system_stats)
 
-@app.route('/notifications')
+@main.route('/notifications')
 @login_required
 def notifications():
-    notifications = current_user.get_recent_notifications(20)
-    # Okunmamış bildirimleri okundu olarak işaretle
-    for notification in notifications:
-        if not notification.is_read:
-            notification.is_read = True
-    db.session.commit()
+    notification_type = request.args.get('type')
+    if notification_type not in NOTIFICATION_TYPES:
+        notification_type = None
+    before = timestamp_cursor(request.args.get('cursor'))
+    notifications = read_models.notifications_page(current_user.id, 20, before, notification_type)
+    
+    # Gösterilen okunmamışlar tek UPDATE ile işaretlenir; sayfa yeni olanları vurgulamaya devam eder
+    unread_ids = [n.id for n in notifications if not n.is_read]
+    if unread_ids:
+        current_user.mark_notifications_read(ids=unread_ids)
+        db.session.commit()
     
-    return render_template('notifications.html', notifications=notifications)
+    next_cursor = None
+    if len(notifications) == 20:
+        next_cursor = encode_cursor(notifications[-1].timestamp, notifications[-1].id)
+    return render_template('notifications.html', notifications=notifications,
+                           notification_type=notification_type,
+                           notification_types=NOTIFICATION_TYPES,
+                           next_cursor=next_cursor)
 
-@app.route('/messages')
+@main.route('/notifications/read', methods=['POST'])
 @login_required
+def mark_all_notifications_read():
+    up_to = request.form.get('up_to', type=int)
+    updated = current_user.mark_notifications_read(up_to_id=up_to)
+    db.session.commit()
+    flash(f"{updated} bildirim okundu olarak işaretlendi.", "success")
+    return redirect(url_for('main.notifications'))
+
+@main.route('/messages')
+@login_required
+@read_only
 def messages():
-    conversations = current_user.conversations.order_by(Conversation.created_at.desc()).all()
-    return render_template('messages.html', conversations=conversations)
+    before = timestamp_cursor(request.args.get('cursor'))
+    conversations = read_models.inbox_page(current_user.id, 20, before)
+    
+    next_cursor = None
+    if len(conversations) == 20:
+        next_cursor = encode_cursor(conversations[-1].last_activity_at, conversations[-1].id)
+    return render_template('messages.html', conversations=conversations, next_cursor=next_cursor)
 
-@app.route('/conversation/<int:conversation_id>')
+@main.route('/conversation/<int:conversation_id>')
 @login_required
 def conversation(conversation_id):
     conversation = Conversation.query.get_or_404(conversation_id)
     if current_user not in conversation.participants:
         flash("Bu konuşmaya erişim izniniz yok.", "danger")
-        return redirect(url_for('messages'))
+        return redirect(url_for('main.messages'))
     
     # Mesajları okundu olarak işaretle
     unread_messages = Message.query.filter_by(
@@ -598,42 +699,59 @@ def conversation(conversation_id):
     
     db.session.commit()
     
-    messages = conversation.messages.order_by(Message.timestamp.asc()).all()
+    messages = conversation.ordered_messages().all()
     return render_template('conversation.html', 
                          conversation=conversation,
-                         messages=messages)
+                         messages=messages,
+                         has_archive=retention.retention_manager.has_archived_messages(conversation_id))
 
-@app.route('/start_conversation/<username>')
+@main.route('/conversation/<int:conversation_id>/archive')
+@login_required
+def conversation_archive(conversation_id):
+    """Saklama süresi dolup arşive taşınan mesajlar, sayfa sayfa eskiye doğru"""
+    conversation = Conversation.query.get_or_404(conversation_id)
+    if current_user not in conversation.participants:
+        flash("Bu konuşmaya erişim izniniz yok.", "danger")
+        return redirect(url_for('main.messages'))
+
+    limit = 50
+    before = timestamp_cursor(request.args.get('cursor'))
+    rows = retention.retention_manager.archived_messages(conversation_id, before, limit)
+    next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if len(rows) == limit else None
+    return render_template('conversation.html',
+                         conversation=conversation,
+                         messages=list(reversed(rows)),
+                         archived=True,
+                         next_cursor=next_cursor)
+
+@main.route('/start_conversation/<username>')
 @login_required
 def start_conversation(username):
     other_user = User.query.filter_by(username=username).first_or_404()
     
     if other_user.id == current_user.id:
         flash("Kendinizle konuşamazsınız!", "warning")
-        return redirect(url_for('messages'))
+        return redirect(url_for('main.messages'))
     
     # Var olan konuşmayı kontrol et
-    existing_conv = Conversation.query.filter(
-        Conversation.participants.any(id=current_user.id),
-        Conversation.participants.any(id=other_user.id),
-        Conversation.is_group == False
-    ).first()
+    existing_conv = current_user.get_direct_conversation(other_user)
     
     if existing_conv:
-        return redirect(url_for('conversation', conversation_id=existing_conv.id))
+        return redirect(url_for('main.conversation', conversation_id=existing_conv.id))
     
     # Yeni konuşma oluştur
     new_conversation = Conversation()
-    new_conversation.participants.append(current_user)
+    new_conversation.participants.append(current_user.orm)
     new_conversation.participants.append(other_user)
     
     db.session.add(new_conversation)
     db.session.commit()
     
-    return redirect(url_for('conversation', conversation_id=new_conversation.id))
+    return redirect(url_for('main.conversation', conversation_id=new_conversation.id))
 
-@app.route('/achievements')
+@main.route('/achievements')
 @login_required
+@read_only
 def achievements():
     user_achievements = UserAchievement.query.filter_by(
         user_id=current_user.id
@@ -645,96 +763,215 @@ def achievements():
                          user_achievements=user_achievements,
                          all_achievements=all_achievements)
 
-@app.route('/leaderboard')
+@main.route('/leaderboard')
+@cached_page(ttl=60, tags=('leaderboard',))
+@read_only
 def leaderboard():
-    # Liderlik tablosunu getir
-    leaderboard_cache = redis_client.get('leaderboard')
-    if leaderboard_cache:
-        leaders = json.loads(leaderboard_cache)
-    else:
-        leaders = User.query.order_by(User.points.desc()).limit(20).all()
-        leaders_data = []
-        for user in leaders:
-            leaders_data.append({
-                'username': user.username,
-                'points': user.points,
-                'level': user.level,
-                'achievements': UserAchievement.query.filter_by(user_id=user.id).count()
-            })
-        
-        # 5 dakika cache'le
-        redis_client.setex('leaderboard', 300, json.dumps(leaders_data))
-        leaders = leaders_data
-    
-    return render_template('leaderboard.html', leaders=leaders)
+    # Anonim ziyaretçiler için sayfa önbelleği; puan/başarım değişince düşer
+    return render_template('leaderboard.html', leaders=read_models.leaderboard(20))
 
-@app.route('/api/stats')
+@main.route('/api/stats')
 @login_required
+@read_only
 def api_stats():
     if current_user.username != "admin":
         return jsonify({'error': 'Unauthorized'}), 403
     
+    # Son 24 saat: saatlik kovaların toplamı, aktiflik: bugünün gün kovası
+    since = datetime.utcnow() - timedelta(hours=24)
+    last_day = rollups.window_sums(['signups', 'posts', 'comments'], 'hour', since)
+    today = rollups.window_sums(['active_users'], 'day', datetime.utcnow())
+    totals = rollups.totals(['signups'])
+    
+    system = instrumentation.system_stats(current_app.instance_path)
     stats = {
         'users': {
-            'total': User.query.count(),
-            'active_today': User.query.filter(
-                User.last_activity >= datetime.utcnow() - timedelta(hours=24)
-            ).count(),
-            'new_today': User.query.filter(
-                User.last_activity >= datetime.utcnow() - timedelta(hours=24)
-            ).count()
+            'total': totals['signups'],
+            'active_today': today['active_users'],
+            'new_today': last_day['signups']
         },
         'content': {
-            'posts_today': Post.query.filter(
-                Post.timestamp >= datetime.utcnow() - timedelta(hours=24)
-            ).count(),
-            'comments_today': Comment.query.filter(
-                Comment.timestamp >= datetime.utcnow() - timedelta(hours=24)
-            ).count()
+            'posts_today': last_day['posts'],
+            'comments_today': last_day['comments']
         },
         'system': {
             'online_users': len(redis_client.smembers('online_users') or []),
-            'memory_usage': 0,
-            'uptime': 0
+            'memory_usage': system['memory_usage'],
+            'uptime': system['uptime']
         }
     }
     
     return jsonify(stats)
 
+@main.route('/api/stats/series')
+@login_required
+@read_only
+def api_stats_series():
+    if current_user.username != "admin":
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    metric = request.args.get('metric', 'posts')
+    granularity = request.args.get('granularity', 'hour')
+    limit = min(request.args.get('limit', 60, type=int), 1440)
+    if metric not in rollups.METRICS or granularity not in rollups.GRANULARITIES:
+        return jsonify({'error': 'Geçersiz metrik veya periyot'}), 400
+    
+    points = rollups.series(metric, granularity, limit)
+    return jsonify({
+        'metric': metric,
+        'granularity': granularity,
+        'points': [{'start': start.isoformat(), 'value': value} for start, value in points]
+    })
+
+@main.route('/api/notifications')
+@login_required
+@read_only
+def api_notifications():
+    notification_type = request.args.get('type')
+    if notification_type and notification_type not in NOTIFICATION_TYPES:
+        return jsonify({'error': 'Geçersiz bildirim tipi'}), 400
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    before = timestamp_cursor(request.args.get('cursor'))
+    notifications = read_models.notifications_page(current_user.id, limit, before, notification_type)
+    
+    next_cursor = None
+    if len(notifications) == limit:
+        next_cursor = encode_cursor(notifications[-1].timestamp, notifications[-1].id)
+    return jsonify({
+        'notifications': [{
+            'id': n.id,
+            'message': n.message,
+            'type': n.notification_type,
+            'is_read': n.is_read,
+            'related_id': n.related_id,
+            'timestamp': n.timestamp.isoformat()
+        } for n in notifications],
+        'next_cursor': next_cursor,
+        'unread_count': current_user.get_unread_notifications_count()
+    })
+
+@main.route('/api/posts/<int:post_id>/comments')
+@login_required
+@read_only
+def api_post_comments(post_id):
+    # En yeniden eskiye; cursor son görülen yorumun (timestamp, id) anahtarı
+    if not db.session.scalar(db.select(Post.id).where(Post.id == post_id)):
+        return jsonify({'error': 'Gönderi bulunamadı'}), 404
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    before = timestamp_cursor(request.args.get('cursor'))
+    rows = comments.comments_page(post_id, limit, before)
+    
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return jsonify({
+        'comments': [comments.preview_dict(row) for row in rows],
+        'next_cursor': next_cursor
+    })
+
+@main.route('/api/notifications/read', methods=['POST'])
+@login_required
+def api_mark_notifications_read():
+    # up_to: istemcinin gördüğü en yeni bildirim id'si; sonradan gelenler okunmamış kalır
+    data = request.get_json(silent=True) or {}
+    up_to = data.get('up_to')
+    if up_to is not None and not isinstance(up_to, int):
+        return jsonify({'error': 'up_to tam sayı olmalı'}), 400
+    updated = current_user.mark_notifications_read(up_to_id=up_to)
+    db.session.commit()
+    return jsonify({'updated': updated, 'unread_count': current_user.get_unread_notifications_count()})
+
+@main.route('/api/suggestions')
+@login_required
+@read_only
+def api_suggestions():
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    suggested = follow_graph.follow_graph.suggestions(current_user.id, limit=limit)
+    users = {user.id: user for user in User.query.filter(User.id.in_([uid for uid, _ in suggested]))}
+    return jsonify({'suggestions': [
+        {
+            'username': users[uid].username,
+            'profile_image': users[uid].profile_image,
+            'mutual_count': mutual,
+            'follows_you': follow_graph.follow_graph.is_following(uid, current_user.id)
+        } for uid, mutual in suggested if uid in users
+    ]})
+
+@main.route('/api/security-events')
+@login_required
+@read_only
+def api_security_events():
+    if current_user.username != "admin":
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    since = datetime.utcnow() - timedelta(hours=request.args.get('hours', 24, type=float))
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    if request.args.get('top'):
+        sources = audit.security_audit.top_sources(
+            request.args.get('type', 'login_failed'), since=since, limit=limit)
+        return jsonify({'sources': [
+            {'ip_address': ip, 'count': count, 'last_seen': last_seen.isoformat()}
+            for ip, count, last_seen in sources
+        ]})
+    
+    events = audit.security_audit.search(
+        ip_address=request.args.get('ip'),
+        user_id=request.args.get('user_id', type=int),
+        event_type=request.args.get('type'),
+        since=since,
+        limit=limit
+    )
+    return jsonify({'events': events})
+
+@main.route('/api/slow-queries')
+@login_required
+def api_slow_queries():
+    if current_user.username != "admin":
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return jsonify({'queries': list(reversed(instrumentation.slow_queries))})
+
+@main.route('/metrics')
+@limiter.exempt
+@read_only
+def metrics():
+    # Prometheus metin formatı; ağ seviyesinde erişim kısıtlanmalı
+    return Response(instrumentation.render_prometheus() + jobs.render_prometheus(),
+                    mimetype='text/plain; version=0.0.4')
+
 # ===================== ERROR HANDLERS =====================
 
-@app.errorhandler(404)
+@main.app_errorhandler(404)
 def not_found_error(error):
     return render_template('404.html'), 404
 
-@app.errorhandler(500)
+@main.app_errorhandler(500)
 def internal_error(error):
     db.session.rollback()
     return render_template('500.html'), 500
 
-@app.errorhandler(429)
+@main.app_errorhandler(429)
 def ratelimit_handler(e):
     flash("Çok fazla istek gönderdiniz. Lütfen bir süre bekleyin.", "warning")
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
+
+# ===================== CLI =====================
+
+@main.cli.command('seed')
+def seed_command():
+    """Yükleme klasörlerini, tabloları ve varsayılan başarımları oluşturur (tekrar çalıştırılabilir)."""
+    os.makedirs(os.path.join(current_app.root_path, current_app.config['POST_IMAGES_FOLDER']), exist_ok=True)
+    os.makedirs(os.path.join(current_app.root_path, current_app.config['PROFILE_PIC_FOLDER']), exist_ok=True)
+    db.create_all()
+    existing = set(db.session.scalars(db.select(Achievement.name)))
+    missing = [data for data in DEFAULT_ACHIEVEMENTS if data['name'] not in existing]
+    db.session.add_all(Achievement(**data) for data in missing)
+    db.session.commit()
+    click.echo(f'{len(missing)} başarım eklendi')
 
 # ===================== MAIN =====================
 
 if __name__ == "__main__":
-    with app.app_context():
-        # Gerekli klasörleri oluştur
-        os.makedirs(os.path.join(app.root_path, app.config['POST_IMAGES_FOLDER']), exist_ok=True)
-        os.makedirs(os.path.join(app.root_path, app.config['PROFILE_PIC_FOLDER']), exist_ok=True)
-        os.makedirs('logs', exist_ok=True)
-        
-        # Veritabanını oluştur
-        db.create_all()
-        
-        # Varsayılan başarımları ekle (HATA DÜZELTME)
-        if Achievement.query.count() == 0:
-            for achievement_data in DEFAULT_ACHIEVEMENTS:
-                achievement = Achievement(**achievement_data)
-                db.session.add(achievement)
-            db.session.commit()
-    
-    # SocketIO ile çalıştır
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Kurulum için önce: flask seed
+    app = create_app()
+    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
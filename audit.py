@@ -0,0 +1,211 @@
+"""Güvenlik olayları için denetim kaydı.
+
+Son olaylar sabit boyutlu bir halka tamponda (deque) tutulur; ekleme O(1)'dir
+ve admin paneli doğrudan buradan okur. Her olay ayrıca bir kuyruğa bırakılır;
+arka plandaki yazıcı thread kuyruğu partiler halinde ayrı bir SQLite denetim
+veritabanına yazar. Denetim tablosu IP, kullanıcı ve olay tipine göre
+indekslidir; kaba kuvvet dalgaları bu indeksler üzerinden incelenir. Saklama
+süresini (AUDIT_RETENTION_DAYS) aşan kayıtlar retention.py tarafından
+arşivlenip silinir.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import (Column, DateTime, Index, Integer, MetaData, String, Table, Text,
+                        create_engine, event, func, insert, select)
+
+from database import DEFAULT_PRAGMAS, apply_pragmas
+
+metadata = MetaData()
+
+security_event = Table(
+    'security_event', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('timestamp', DateTime, nullable=False),
+    Column('event_type', String(32), nullable=False),
+    Column('user_id', Integer),
+    Column('ip_address', String(45)),
+    Column('details', Text),
+    Index('ix_security_event_ip_address_timestamp', 'ip_address', 'timestamp'),
+    Index('ix_security_event_user_id_timestamp', 'user_id', 'timestamp'),
+    Index('ix_security_event_event_type_timestamp', 'event_type', 'timestamp'),
+)
+
+_STOP = object()
+
+
+class SecurityAudit:
+    def __init__(self, recent_size=1000, batch_size=500):
+        self.recent_events = deque(maxlen=recent_size)
+        self.batch_size = batch_size
+        self.engine = None
+        self.uri = None
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=10000)
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def configure(self, uri, recent_size):
+        self.recent_events = deque(self.recent_events, maxlen=recent_size)
+        # Aynı süreçte tekrar create_app() çağrılırsa motor yeniden kullanılır
+        if self.engine is not None and uri == self.uri:
+            return
+        if self.engine is not None:
+            self.flush()
+            self.engine.dispose()
+        self.uri = uri
+        self.engine = create_engine(uri)
+        if self.engine.dialect.name == 'sqlite':
+            @event.listens_for(self.engine, 'connect')
+            def on_connect(dbapi_connection, connection_record):
+                apply_pragmas(dbapi_connection, DEFAULT_PRAGMAS)
+        metadata.create_all(self.engine)
+
+    def record(self, event_type, user_id, ip_address, details):
+        entry = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'event_type': event_type,
+            'user_id': user_id,
+            'ip_address': ip_address,
+            'details': details
+        }
+        self.recent_events.append(entry)
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # İstek yolunu asla bloklama; kayıp sayısı izlenir
+            self.dropped += 1
+        return entry
+
+    def recent(self, limit=50):
+        """Halka tampondaki son olaylar, yeniden eskiye"""
+        events = list(self.recent_events)
+        events.reverse()
+        return events[:limit]
+
+    def _ensure_writer(self):
+        if self._writer is not None or self.engine is None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name='security-audit', daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _STOP in batch
+            rows = [self._row(entry) for entry in batch if entry is not _STOP]
+            try:
+                if rows:
+                    with self.engine.begin() as connection:
+                        connection.execute(insert(security_event), rows)
+            except Exception:
+                self.dropped += len(rows)
+            if stop:
+                return
+
+    @staticmethod
+    def _row(entry):
+        return {
+            'timestamp': datetime.fromisoformat(entry['timestamp']),
+            'event_type': entry['event_type'],
+            'user_id': entry['user_id'],
+            'ip_address': entry['ip_address'],
+            'details': json.dumps(entry['details'], ensure_ascii=False),
+        }
+
+    def flush(self, timeout=5):
+        """Yazıcıyı durdurur ve kuyruktaki olayların diske yazılmasını bekler"""
+        if self._writer is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._writer.join(timeout)
+        self._writer = None
+
+    def search(self, ip_address=None, user_id=None, event_type=None, since=None, limit=100):
+        """Denetim deposunda indeksli arama; en yeni olaylar önce"""
+        query = select(security_event)
+        if ip_address:
+            query = query.where(security_event.c.ip_address == ip_address)
+        if user_id is not None:
+            query = query.where(security_event.c.user_id == user_id)
+        if event_type:
+            query = query.where(security_event.c.event_type == event_type)
+        if since:
+            query = query.where(security_event.c.timestamp >= since)
+        query = query.order_by(security_event.c.timestamp.desc()).limit(limit)
+        with self.engine.connect() as connection:
+            return [self._entry(row) for row in connection.execute(query)]
+
+    def top_sources(self, event_type='login_failed', since=None, limit=20):
+        """Olay tipine göre en çok olay üreten IP'ler: [(ip, adet, son görülme), ...]"""
+        since = since or datetime.utcnow() - timedelta(hours=1)
+        query = (
+            select(security_event.c.ip_address, func.count(), func.max(security_event.c.timestamp))
+            .where(security_event.c.event_type == event_type,
+                   security_event.c.timestamp >= since)
+            .group_by(security_event.c.ip_address)
+            .order_by(func.count().desc())
+            .limit(limit)
+        )
+        with self.engine.connect() as connection:
+            return [tuple(row) for row in connection.execute(query)]
+
+    @staticmethod
+    def _entry(row):
+        return {
+            'timestamp': row.timestamp.isoformat(),
+            'event_type': row.event_type,
+            'user_id': row.user_id,
+            'ip_address': row.ip_address,
+            'details': json.loads(row.details) if row.details else None
+        }
+
+
+security_audit = SecurityAudit()
+atexit.register(security_audit.flush)
+
+
+def init_app(app):
+    app.config.setdefault('AUDIT_DATABASE_URI',
+                          'sqlite:///' + os.path.join(app.instance_path, 'audit.db'))
+    app.config.setdefault('AUDIT_RECENT_EVENTS', 1000)
+    app.config.setdefault('AUDIT_RETENTION_DAYS', 90)  # retention.py okur
+    os.makedirs(app.instance_path, exist_ok=True)
+    security_audit.configure(app.config['AUDIT_DATABASE_URI'],
+                             app.config['AUDIT_RECENT_EVENTS'])
+
+    @app.cli.command('security-events')
+    @click.option('--ip', 'ip_address', help='IP adresine göre filtrele')
+    @click.option('--user-id', type=int, help='Kullanıcıya göre filtrele')
+    @click.option('--type', 'event_type', help='Olay tipine göre filtrele (örn. login_failed)')
+    @click.option('--hours', type=float, default=24, help='Son kaç saat')
+    @click.option('--limit', type=int, default=50)
+    @click.option('--top', is_flag=True, help='Olay tipine göre en çok olay üreten IP\'ler')
+    def security_events_command(ip_address, user_id, event_type, hours, limit, top):
+        """Denetim kayıtlarında IP, kullanıcı ve olay tipine göre arama yapar."""
+        since = datetime.utcnow() - timedelta(hours=hours)
+        if top:
+            for ip, count, last_seen in security_audit.top_sources(
+                    event_type or 'login_failed', since=since, limit=limit):
+                click.echo(f'{ip:<40}{count:>8}  {last_seen.isoformat()}')
+            return
+        for entry in security_audit.search(ip_address, user_id, event_type, since, limit):
+            click.echo(f"{entry['timestamp']}  {entry['event_type']:<18}"
+                       f"{entry['ip_address'] or '-':<40}{entry['user_id'] or '-':<8}{entry['details']}")
@@ -0,0 +1 @@
+"""Performans ölçümleri. Her modül `python -m benchmarks.<modül>` ile çalışır."""
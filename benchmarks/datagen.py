@@ -0,0 +1,207 @@
+"""Yük testleri için tohumlu (tekrarlanabilir) sentetik veri üretici.
+
+Takip grafiği güç yasasına uyar: çıkış dereceleri Pareto dağılımından,
+takip edilenler Zipf ağırlıklı popülerlik sırasından seçilir. Gönderiler
+hashtag içerir; beğeni, yorum, konuşma, mesaj ve bildirimler de aynı
+popülerliğe göre dağıtılır. Satırlar ORM yerine toplu executemany INSERT ile
+yazılır; sonunda sayaçlar, user_stats ve toplam metrik kovaları uygulamanın
+kendi fonksiyonlarıyla hesaplanır.
+
+    python -m benchmarks.datagen --scale 10k --output /tmp/bench-10k.db
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+import bulk
+import passwords
+from models import (db, User, Post, Comment, Notification, Conversation, Message,
+                    Achievement, DEFAULT_ACHIEVEMENTS, likes, followers, user_conversations)
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+HASHTAGS = ['python', 'flask', 'sqlite', 'kod', 'oyun', 'muzik', 'spor', 'film',
+            'kitap', 'seyahat', 'yemek', 'doga', 'teknoloji', 'sanat', 'bilim', 'tarih']
+WORDS = ['bugün', 'harika', 'bir', 'gün', 'yeni', 'proje', 'deneme', 'çok', 'güzel',
+         'akşam', 'sabah', 'kahve', 'hafta', 'sonu', 'paylaşım', 'herkese', 'selam']
+NOTIFICATION_TYPES = ['like', 'comment', 'message', 'follow']
+FIRST_NAMES = ['Ahmet', 'Ayşe', 'Mehmet', 'Fatma', 'Ali', 'Zeynep', 'Mustafa', 'Elif', 'Can',
+               'Emine', 'Hüseyin', 'Özge', 'İbrahim', 'Şule', 'Murat', 'Gül', 'Emre', 'Işıl']
+LAST_NAMES = ['Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Yıldırım', 'Öztürk',
+              'Aydın', 'Özdemir', 'Arslan', 'Doğan', 'Kılıç', 'Aslan', 'Çetin', 'Kara']
+
+
+class Generator:
+    def __init__(self, users, seed=42, follows=7, posts=5, likes_per_post=4,
+                 comments_per_post=1, notifications=5, messages=6, days=30):
+        self.rng = random.Random(seed)
+        self.users = users
+        self.follows = follows                   # Ortalama derece ~3 katı (Pareto, a=1.5)
+        self.posts = posts
+        self.likes_per_post = likes_per_post
+        self.comments_per_post = comments_per_post
+        self.notifications = notifications
+        self.messages = messages
+        self.now = datetime.utcnow()
+        self.days = days
+
+        # Popülerlik: sıra r'deki kullanıcının ağırlığı 1/(r+1); id'ler karıştırılır
+        self.by_rank = list(range(1, users + 1))
+        self.rng.shuffle(self.by_rank)
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(users)))
+
+    def popular_users(self, k):
+        return self.rng.choices(self.by_rank, cum_weights=self.cum_weights, k=k)
+
+    def timestamp(self):
+        return self.now - timedelta(seconds=self.rng.randint(0, self.days * 86400))
+
+    def body(self):
+        words = self.rng.choices(WORDS, k=self.rng.randint(3, 12))
+        tags = self.rng.choices(HASHTAGS, weights=[1 / (i + 1) for i in range(len(HASHTAGS))],
+                                k=self.rng.randint(0, 3))
+        return ' '.join(words + [f'#{tag}' for tag in tags]), ' '.join(tags)
+
+    def degree(self, minimum, cap):
+        return min(cap, int(self.rng.paretovariate(1.5) * minimum))
+
+
+def generate(gen, connection, progress=print):
+    password = passwords.PasswordHasher(pool_size=0).hash('password123')
+    counts = {}
+
+    def phase(name, table, rows):
+        started = time.perf_counter()
+        counts[name] = bulk.insert_batches(connection, table, rows)
+        progress(f'{name:<15}{counts[name]:>12} satır  {time.perf_counter() - started:>7.1f} sn')
+
+    phase('achievement', Achievement.__table__, iter(DEFAULT_ACHIEVEMENTS))
+
+    phase('user', User.__table__, (
+        {'id': uid, 'username': f'user{uid}', 'password': password,
+         'first_name': gen.rng.choice(FIRST_NAMES), 'last_name': gen.rng.choice(LAST_NAMES),
+         'bio': 'Sentetik kullanıcı', 'points': gen.rng.randint(0, 5000),
+         'level': 1, 'experience': 0, 'last_activity': gen.timestamp(),
+         'follower_count': 0, 'followed_count': 0, 'post_count': 0, 'identity_version': 0}
+        for uid in range(1, gen.users + 1)
+    ))
+
+    def follow_rows():
+        for uid in range(1, gen.users + 1):
+            targets = set(gen.popular_users(gen.degree(gen.follows, 1000)))
+            targets.discard(uid)
+            for followed in targets:
+                yield {'follower_id': uid, 'followed_id': followed}
+    phase('followers', followers, follow_rows())
+
+    post_authors = []
+
+    def post_rows():
+        post_id = 0
+        for uid in range(1, gen.users + 1):
+            for _ in range(gen.degree(gen.posts / 3, 500)):
+                post_id += 1
+                post_authors.append(uid)
+                body, hashtags = gen.body()
+                yield {'id': post_id, 'body': body, 'hashtags': hashtags, 'user_id': uid,
+                       'timestamp': gen.timestamp(), 'like_count': 0, 'comment_count': 0}
+    phase('post', Post.__table__, post_rows())
+
+    def like_rows():
+        for post_id in range(1, len(post_authors) + 1):
+            for uid in set(gen.popular_users(gen.degree(gen.likes_per_post / 3, 2000))):
+                yield {'post_id': post_id, 'user_id': uid}
+    phase('likes', likes, like_rows())
+
+    def comment_rows():
+        for post_id in range(1, len(post_authors) + 1):
+            for _ in range(gen.rng.randint(0, gen.comments_per_post * 2)):
+                yield {'body': gen.body()[0], 'post_id': post_id,
+                       'user_id': gen.popular_users(1)[0], 'timestamp': gen.timestamp()}
+    phase('comment', Comment.__table__, comment_rows())
+
+    pairs = []
+
+    def conversation_rows():
+        for conversation_id in range(1, gen.users // 2 + 1):
+            first = gen.rng.randint(1, gen.users)
+            second = gen.popular_users(1)[0]
+            if first == second:
+                second = first % gen.users + 1
+            pairs.append((first, second))
+            yield {'id': conversation_id, 'created_at': gen.timestamp(), 'is_group': False}
+    phase('conversation', Conversation.__table__, conversation_rows())
+
+    phase('participants', user_conversations, (
+        {'user_id': uid, 'conversation_id': conversation_id}
+        for conversation_id, pair in enumerate(pairs, start=1) for uid in pair
+    ))
+
+    phase('message', Message.__table__, (
+        {'conversation_id': conversation_id, 'sender_id': gen.rng.choice(pair),
+         'content': gen.body()[0], 'timestamp': gen.timestamp(), 'is_read': gen.rng.random() < 0.7}
+        for conversation_id, pair in enumerate(pairs, start=1)
+        for _ in range(gen.rng.randint(1, gen.messages * 2))
+    ))
+
+    phase('notification', Notification.__table__, (
+        {'user_id': uid, 'message': 'Sentetik bildirim',
+         'notification_type': gen.rng.choice(NOTIFICATION_TYPES),
+         'is_read': gen.rng.random() < 0.6, 'timestamp': gen.timestamp(),
+         'related_id': gen.rng.randint(1, max(1, len(post_authors)))}
+        for uid in range(1, gen.users + 1)
+        for _ in range(gen.rng.randint(0, gen.notifications * 2))
+    ))
+    return counts
+
+
+def finalize(progress=print):
+    """Türetilmiş alanları uygulamanın kendi yollarıyla hesaplar"""
+    started = time.perf_counter()
+    bulk.recompute_derived()
+    progress(f'{"türetilmiş":<15}{"":>12}       {time.perf_counter() - started:>7.1f} sn')
+
+
+def build(path, users, seed=42, progress=print, **options):
+    """`path` konumunda sıfırdan bir veritabanı üretir"""
+    if os.path.exists(path):
+        os.remove(path)
+    gen_app = Flask(__name__)
+    gen_app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.abspath(path)}'
+    gen_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(gen_app)
+
+    with gen_app.app_context():
+        db.create_all(bind_key=None)
+        with db.engine.begin() as connection:
+            # Üretim sırasında dayanıklılık gerekmiyor; WAL uygulama açınca kurulur
+            connection.exec_driver_sql('PRAGMA synchronous = OFF')
+            counts = generate(Generator(users, seed=seed, **options), connection, progress)
+        finalize(progress)
+        db.session.remove()
+        db.engine.dispose()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--users', type=int, help='Ölçek yerine doğrudan kullanıcı sayısı')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help='Varsayılan: bench-<ölçek>.db')
+    args = parser.parse_args()
+
+    users = args.users or SCALES[args.scale]
+    output = args.output or f'bench-{args.scale}.db'
+    started = time.perf_counter()
+    build(output, users, seed=args.seed)
+    print(f'{output}: {users} kullanıcı, {time.perf_counter() - started:.1f} sn')
+
+
+if __name__ == '__main__':
+    main()
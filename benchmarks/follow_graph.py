@@ -0,0 +1,67 @@
+"""Takip grafiği: kurulum süresi, bellek ve sorgu gecikmeleri.
+
+`benchmarks.datagen` ile üretilmiş bir veritabanından CSR grafiği kurar;
+`is_following` için veritabanı (EXISTS) ile bellek içi üyelik testini ve
+arkadaşların arkadaşları önerilerinin gecikmesini karşılaştırır.
+
+    python -m benchmarks.datagen --scale 100k --output /tmp/bench-100k.db
+    python -m benchmarks.follow_graph --db /tmp/bench-100k.db --samples 2000
+"""
+import argparse
+import os
+import random
+import time
+
+from benchmarks.load import percentile
+
+
+def timed(function, samples):
+    durations = []
+    for args in samples:
+        started = time.perf_counter()
+        function(*args)
+        durations.append(time.perf_counter() - started)
+    durations.sort()
+    return durations
+
+
+def report(name, durations):
+    print(f'{name:<28}{percentile(durations, 0.5) * 1e6:>10.1f}{percentile(durations, 0.99) * 1e6:>10.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='datagen ile üretilmiş SQLite dosyası')
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.db)}'
+    import app as application
+    from follow_graph import follow_graph
+    from models import db, User
+
+    app = application.create_app()
+    rng = random.Random(args.seed)
+    with app.app_context():
+        started = time.perf_counter()
+        follow_graph.rebuild(db.engine)
+        build_seconds = time.perf_counter() - started
+        edges = len(follow_graph.out.base.targets)
+        nbytes = sum(len(a) * a.itemsize for d in (follow_graph.out, follow_graph.inc)
+                     for a in (d.base.offsets, d.base.targets))
+        print(f'kurulum: {build_seconds:.2f} sn, {edges} kenar, {nbytes / 1024 / 1024:.1f} MB')
+
+        user_ids = db.session.scalars(db.select(User.id)).all()
+        pairs = [(rng.choice(user_ids), rng.choice(user_ids)) for _ in range(args.samples)]
+        users = {uid: db.session.get(User, uid) for pair in pairs[:200] for uid in pair}
+
+        print(f"{'işlem':<28}{'p50 µs':>10}{'p99 µs':>10}")
+        report('is_following (SQL)', timed(lambda a, b: users[a].is_following(users[b]), pairs[:200]))
+        report('is_following (grafik)', timed(follow_graph.is_following, pairs))
+        report('is_mutual (grafik)', timed(follow_graph.is_mutual, pairs))
+        report('suggestions (grafik)', timed(follow_graph.suggestions, [(a,) for a, _ in pairs[:500]]))
+
+
+if __name__ == '__main__':
+    main()
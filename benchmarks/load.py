@@ -0,0 +1,176 @@
+"""Flask ve Socket.IO test istemcileriyle tekrarlanabilir yük ölçümü.
+
+`benchmarks.datagen` ile üretilmiş bir veritabanının geçici kopyası üzerinde
+uygulamanın gerçek istek yollarını çalıştırır ve her senaryo için gecikme
+yüzdeliklerini (p50/p95/p99) ve istek başına SQL sorgu sayısını raporlar.
+Aynı tohum ve veritabanıyla iki çalıştırma aynı istek dizisini üretir;
+`--json` çıktısı çalıştırmalar arası karşılaştırma için saklanabilir.
+
+    python -m benchmarks.datagen --scale 10k --output /tmp/bench-10k.db
+    python -m benchmarks.load --db /tmp/bench-10k.db --requests 200 --json sonuc.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from sqlalchemy import event
+
+SCENARIOS = ('posts', 'like_post', 'comment_post', 'conversation', 'inbox', 'leaderboard', 'send_message')
+
+
+def percentile(values, q):
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class QueryCounter:
+    """Tüm engine'lerdeki cursor çalıştırmalarını sayar"""
+
+    def __init__(self, engines):
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def run(db_path, requests, seed=42, warmup=20, socket_users=50):
+    # Config sınıfları DATABASE_URL'i import anında okur
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(db_path)}'
+    import app as application
+    from models import db, User, Post, user_conversations
+
+    app, socketio = application.create_app(), application.socketio
+    application.limiter.enabled = False
+    rng = random.Random(seed)
+
+    with app.app_context():
+        counter = QueryCounter(db.engines.values())
+        user_ids = db.session.scalars(db.select(User.id)).all()
+        post_ids = db.session.scalars(db.select(Post.id)).all()
+        memberships = db.session.execute(
+            db.select(user_conversations.c.user_id, user_conversations.c.conversation_id)
+            .order_by(user_conversations.c.conversation_id)).all()
+        db.session.remove()
+
+    def client_for(user_id):
+        client = app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['_user_id'] = str(user_id)
+            flask_session['_fresh'] = True
+        return client
+
+    # Socket bağlantıları ölçümden önce kurulur; yalnızca olay işleme ölçülür
+    socket_members = rng.sample(memberships, min(socket_users, len(memberships)))
+    socket_clients = {
+        user_id: socketio.test_client(app, flask_test_client=client_for(user_id))
+        for user_id, _ in socket_members
+    }
+
+    def posts():
+        return client_for(rng.choice(user_ids)).get('/posts').status_code < 400
+
+    def like_post():
+        client = client_for(rng.choice(user_ids))
+        return client.post(f'/like_post/{rng.choice(post_ids)}').status_code < 400
+
+    def comment_post():
+        client = client_for(rng.choice(user_ids))
+        return client.post(f'/comment_post/{rng.choice(post_ids)}',
+                           data={'comment': 'Yük testi yorumu #benchmark'}).status_code < 400
+
+    def conversation():
+        user_id, conversation_id = rng.choice(memberships)
+        return client_for(user_id).get(f'/conversation/{conversation_id}').status_code < 400
+
+    def inbox():
+        user_id, _ = rng.choice(memberships)
+        return client_for(user_id).get('/messages').status_code < 400
+
+    def leaderboard():
+        return client_for(rng.choice(user_ids)).get('/leaderboard').status_code < 400
+
+    def send_message():
+        user_id, conversation_id = rng.choice(socket_members)
+        socket_clients[user_id].emit('send_message', {'conversation_id': conversation_id,
+                                                      'content': 'Yük testi mesajı'})
+        return True
+
+    scenarios = {'posts': posts, 'like_post': like_post, 'comment_post': comment_post,
+                 'conversation': conversation, 'inbox': inbox, 'leaderboard': leaderboard,
+                 'send_message': send_message}
+
+    results = {}
+    for name in SCENARIOS:
+        latencies, queries, errors = [], [], 0
+        for i in range(warmup + requests):
+            counter.count = 0
+            started = time.perf_counter()
+            try:
+                ok = scenarios[name]()
+            except Exception:
+                # Uygulama hatası ölçümü durdurmaz, hata olarak sayılır
+                ok = False
+            elapsed = time.perf_counter() - started
+            if i < warmup:
+                continue
+            errors += not ok
+            latencies.append(elapsed)
+            queries.append(counter.count)
+
+        latencies.sort()
+        results[name] = {
+            'requests': len(latencies),
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'queries_per_request': sum(queries) / len(queries) if queries else 0,
+            'errors': errors,
+        }
+
+    for socket_client in socket_clients.values():
+        socket_client.disconnect()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='benchmarks.datagen çıktısı')
+    parser.add_argument('--requests', type=int, default=200, help='Senaryo başına istek')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--in-place', action='store_true', help='Kopya almadan doğrudan çalış')
+    parser.add_argument('--json', dest='json_path', help='Sonuçları bu dosyaya yaz')
+    args = parser.parse_args()
+
+    # Yazan senaryolar veriyi değiştirir; tekrarlanabilirlik için kopya üzerinde çalış
+    workdir = None
+    db_path = args.db
+    if not args.in_place:
+        workdir = tempfile.mkdtemp(prefix='bench-')
+        db_path = os.path.join(workdir, os.path.basename(args.db))
+        shutil.copyfile(args.db, db_path)
+
+    try:
+        results = run(db_path, args.requests, seed=args.seed, warmup=args.warmup)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'senaryo':<15}{'istek':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'sorgu/istek':>13}{'hata':>7}")
+    for scenario, result in results.items():
+        print(f"{scenario:<15}{result['requests']:>8}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+              f"{result['p99_ms']:>10.2f}{result['queries_per_request']:>13.1f}{result['errors']:>7}")
+    if args.json_path:
+        with open(args.json_path, 'w') as output:
+            json.dump({'db': args.db, 'seed': args.seed, 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
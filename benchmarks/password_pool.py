@@ -0,0 +1,96 @@
+"""Süreç havuzu boyutuna göre giriş (bcrypt doğrulama) verimi.
+
+Her havuz boyutu için eşzamanlı "giriş" thread'leri `PasswordHasher.verify`
+çağırır; aynı anda bir yoklama thread'i kısa bir Python işinin gecikmesini
+ölçer. Havuz 0 iken her giriş thread'i bcrypt'i web sürecinde çalıştırır:
+eşzamanlı hash sayısı sınırsızdır ve hepsi yoklama thread'iyle aynı CPU için
+yarışır. Havuz boyutu eşzamanlı hash sayısını sınırlar ve CPU işini ayrı
+süreçlere taşır; yoklama gecikmesi diğer route'ların göreceği beklemedir.
+
+    python -m benchmarks.password_pool --clients 8 --seconds 5 --pools 0,1,2,4
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+from passwords import PasswordHasher, PasswordHasherBusy
+
+
+def probe_work():
+    # Sıradan bir isteğin Python tarafındaki işini taklit eder
+    return sum(i * i for i in range(2000))
+
+
+def run(pool_size, clients, seconds, rounds):
+    hasher = PasswordHasher(rounds=rounds, pool_size=pool_size,
+                            max_pending=max(clients, pool_size * 4))
+    pw_hash = PasswordHasher(rounds=rounds, pool_size=0).hash('password123')
+    if pool_size:
+        hasher.verify(pw_hash, 'password123')  # süreçleri ölçümden önce başlat
+
+    stop = threading.Event()
+    logins, rejected, probes = [], [0], []
+    lock = threading.Lock()
+
+    def client():
+        local = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                hasher.verify(pw_hash, 'password123')
+            except PasswordHasherBusy:
+                with lock:
+                    rejected[0] += 1
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            logins.extend(local)
+
+    def probe():
+        while not stop.is_set():
+            started = time.perf_counter()
+            probe_work()
+            probes.append(time.perf_counter() - started)
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    threads.append(threading.Thread(target=probe))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    hasher.shutdown()
+
+    logins.sort()
+    probes.sort()
+    return {
+        'logins_per_sec': len(logins) / seconds,
+        'login_p95_ms': logins[int(len(logins) * 0.95)] * 1000 if logins else 0,
+        'probe_p50_ms': statistics.median(probes) * 1000 if probes else 0,
+        'probe_p99_ms': probes[int(len(probes) * 0.99)] * 1000 if probes else 0,
+        'rejected': rejected[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8, help='Eşzamanlı giriş thread sayısı')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt maliyet faktörü')
+    parser.add_argument('--pools', default=f'0,1,2,{os.cpu_count() or 4}',
+                        help='Virgülle ayrılmış havuz boyutları (0 = havuzsuz)')
+    args = parser.parse_args()
+
+    print(f"{'havuz':<8}{'giriş/sn':>10}{'giriş p95 ms':>14}{'yoklama p50 ms':>16}{'yoklama p99 ms':>16}{'red':>6}")
+    for pool_size in (int(size) for size in args.pools.split(',')):
+        result = run(pool_size, args.clients, args.seconds, args.rounds)
+        print(f"{pool_size:<8}{result['logins_per_sec']:>10.1f}{result['login_p95_ms']:>14.1f}"
+              f"{result['probe_p50_ms']:>16.2f}{result['probe_p99_ms']:>16.2f}{result['rejected']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Listeleme sorguları: ORM nesneleri ile read_models satırlarının karşılaştırması.
+
+Her listeleme için aynı sorgu iki biçimde çalıştırılır: tam ORM varlıkları
+yüklenip şablon için sözlüğe kopyalanır (eski yol) ya da read_models.py'nin
+yalnızca gereken sütunları seçen Core sorgusu namedtuple'lara dönüştürülür.
+Medyan süre, tracemalloc ile ölçülen tepe bellek ve çağrı başına oluşturulan
+ORM nesnesi sayısı raporlanır. Kullanıcı olarak akışı en kalabalık olan
+(en çok kişiyi takip eden) hesap seçilir.
+
+    python -m benchmarks.read_models --db /tmp/bench-10k.db --runs 20
+"""
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import event
+
+
+def orm_listings(user_id):
+    """read_models öncesi yol: tam varlıklar, ardından sözlüğe kopyalama"""
+    from models import db, User, Post, Notification, UserAchievement, followers, likes
+    from sqlalchemy import exists, func, literal, select, union
+
+    def feed():
+        authors = union(select(followers.c.followed_id).where(followers.c.follower_id == user_id),
+                        select(literal(user_id)))
+        is_liked = exists().where(likes.c.post_id == Post.id, likes.c.user_id == user_id)
+        rows = db.session.execute(select(Post, User, is_liked).join(User, User.id == Post.user_id)
+                                  .where(Post.user_id.in_(authors)).order_by(Post.timestamp.desc())).all()
+        return [{'id': post.id, 'body': post.body, 'hashtags': post.hashtags, 'timestamp': post.timestamp,
+                 'image': post.image, 'like_count': post.like_count, 'comment_count': post.comment_count,
+                 'author': author.username, 'author_image': author.profile_image, 'is_liked': liked}
+                for post, author, liked in rows]
+
+    def leaderboard():
+        achievements = select(func.count()).where(UserAchievement.user_id == User.id).scalar_subquery()
+        rows = db.session.execute(select(User, achievements).order_by(User.points.desc()).limit(20)).all()
+        return [{'username': user.username, 'points': user.points, 'level': user.level,
+                 'achievements': count} for user, count in rows]
+
+    def notifications():
+        return db.session.scalars(select(Notification).where(Notification.user_id == user_id)
+                                  .order_by(Notification.timestamp.desc(), Notification.id.desc())
+                                  .limit(20)).all()
+
+    return {'feed': feed, 'leaderboard': leaderboard, 'notifications': notifications}
+
+
+def core_listings(user_id):
+    import read_models
+    # Akış yorum önizlemelerini de içerir; ölçüm turlarında önizleme önbelleği sıcaktır
+    return {'feed': lambda: read_models.feed(user_id),
+            'leaderboard': lambda: read_models.leaderboard(20),
+            'notifications': lambda: read_models.notifications_page(user_id, 20)}
+
+
+class LoadCounter:
+    """ORM'nin veritabanı satırından oluşturduğu nesneleri sayar"""
+
+    def __init__(self, base):
+        self.count = 0
+        event.listen(base, 'load', self._on_load, propagate=True)
+
+    def _on_load(self, target, context):
+        self.count += 1
+
+
+def measure(call, runs, session, loads):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+        session.remove()
+    loads.count = 0
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    session.remove()
+    return statistics.median(timings), peak, loads.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='benchmarks.datagen çıktısı')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.db)}'
+    import app as application
+    from models import db, User
+
+    app = application.create_app()
+    with app.app_context():
+        user_id = db.session.scalar(db.select(User.id).order_by(User.followed_count.desc()).limit(1))
+        db.session.remove()
+        variants = {'orm': orm_listings(user_id), 'core': core_listings(user_id)}
+        loads = LoadCounter(db.Model)
+
+        print(f"{'liste':<15}{'yol':<6}{'medyan ms':>11}{'tepe KB':>10}{'ORM nesnesi':>13}")
+        for name in ('feed', 'leaderboard', 'notifications'):
+            for variant, listings in variants.items():
+                median, peak, objects = measure(listings[name], args.runs, db.session, loads)
+                print(f'{name:<15}{variant:<6}{median * 1000:>11.2f}{peak / 1024:>10.0f}{objects:>13}')
+
+
+if __name__ == '__main__':
+    main()
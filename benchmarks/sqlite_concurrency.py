@@ -0,0 +1,129 @@
+"""Yazma patlamaları sırasında eşzamanlı okuma verimi.
+
+Varsayılan SQLite ayarları (rollback journal, busy_timeout yok) ile
+database.py'deki WAL profilini aynı iş yükü altında karşılaştırır:
+okuyucu thread'ler sürekli akış sorgusu çalıştırırken bir yazıcı thread
+belirli aralıklarla toplu INSERT yapar.
+
+    python -m benchmarks.sqlite_concurrency --readers 8 --seconds 5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from database import DEFAULT_PRAGMAS, apply_pragmas
+
+READ_SQL = text('SELECT id, body FROM post WHERE user_id = :user_id ORDER BY timestamp DESC LIMIT 20')
+WRITE_SQL = text("INSERT INTO post (body, timestamp, user_id) VALUES (hex(randomblob(512)), CURRENT_TIMESTAMP, :user_id)")
+
+
+def make_engine(path, pragmas, query_only=False):
+    engine = create_engine(f'sqlite:///{path}', pool_size=16, max_overflow=0)
+    if pragmas:
+        @event.listens_for(engine, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, pragmas, query_only=query_only)
+    return engine
+
+
+def prepare(path, users=100, posts=20000):
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE post (id INTEGER PRIMARY KEY, body TEXT, '
+                          'timestamp DATETIME, user_id INTEGER)'))
+        conn.execute(text('CREATE INDEX ix_post_user_id_timestamp ON post (user_id, timestamp)'))
+        conn.execute(text("INSERT INTO post (body, timestamp, user_id) VALUES ('x', CURRENT_TIMESTAMP, :u)"),
+                     [{'u': i % users} for i in range(posts)])
+    engine.dispose()
+
+
+def run(profile, readers, seconds, burst, pause):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    prepare(path)
+    pragmas = DEFAULT_PRAGMAS if profile == 'wal' else {}
+    read_engine = make_engine(path, pragmas, query_only=profile == 'wal')
+    write_engine = make_engine(path, pragmas)
+
+    stop = threading.Event()
+    latencies, locked, writes = [], [0], [0]
+    lock = threading.Lock()
+
+    def reader(n):
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with read_engine.connect() as conn:
+                    conn.execute(READ_SQL, {'user_id': n}).fetchall()
+            except OperationalError:
+                with lock:
+                    locked[0] += 1
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    def writer():
+        while not stop.is_set():
+            try:
+                with write_engine.begin() as conn:
+                    conn.execute(WRITE_SQL, [{'user_id': i} for i in range(burst)])
+                    # Yazma kilidi tutulurken uzun süren bir işlemi taklit et
+                    time.sleep(pause)
+                writes[0] += burst
+            except OperationalError:
+                with lock:
+                    locked[0] += 1
+            time.sleep(pause)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    read_engine.dispose()
+    write_engine.dispose()
+    os.remove(path)
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    latencies.sort()
+    return {
+        'reads_per_sec': len(latencies) / seconds,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0,
+        'max_ms': latencies[-1] * 1000 if latencies else 0,
+        'rows_written': writes[0],
+        'locked_errors': locked[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--burst', type=int, default=5000, help='Her yazma işlemindeki satır sayısı')
+    parser.add_argument('--pause', type=float, default=0.05, help='Yazmalar arası bekleme (sn)')
+    args = parser.parse_args()
+
+    print(f"{'profil':<10}{'okuma/sn':>12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'yazılan':>10}{'kilit hatası':>14}")
+    for profile in ('default', 'wal'):
+        result = run(profile, args.readers, args.seconds, args.burst, args.pause)
+        print(f"{profile:<10}{result['reads_per_sec']:>12.0f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['max_ms']:>10.2f}{result['rows_written']:>10}{result['locked_errors']:>14}")
+
+
+if __name__ == '__main__':
+    main()
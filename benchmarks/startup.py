@@ -0,0 +1,67 @@
+"""Worker açılış süresi: import, create_app ve ilk istek.
+
+Her ölçüm yeni bir Python sürecinde yapılır (modül önbelleği boş, .pyc
+dosyaları diskte). Süreç `app` modülünü import eder, `create_app()` çağırır
+ve ilk isteği test istemcisiyle gönderir; üç aşamanın süresi ayrı raporlanır.
+`--budget` verilirse medyan toplam süre bütçeyi aşınca çıkış kodu 1 olur;
+CI'da açılış süresindeki gerilemeleri yakalamak için kullanılır.
+
+    python -m benchmarks.startup --runs 7 --budget 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app as application
+imported = time.perf_counter()
+app = application.create_app()
+created = time.perf_counter()
+app.test_client().get('/login')
+served = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create_app': created - imported,
+                  'first_request': served - created, 'total': served - started,
+                  'migrate_loaded': 'flask_migrate' in sys.modules}))
+'''
+
+
+def measure(env):
+    output = subprocess.run([sys.executable, '-c', CHILD], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--config', default='production', help='FLASK_CONFIG değeri')
+    parser.add_argument('--budget', type=float, help='Medyan toplam süre üst sınırı (sn)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, FLASK_CONFIG=args.config,
+                   DATABASE_URL=f'sqlite:///{os.path.join(workdir, "startup.db")}')
+        measure(env)  # .pyc ve Jinja bytecode önbelleğini ısıt
+        runs = [measure(env) for _ in range(args.runs)]
+
+    phases = ('import', 'create_app', 'first_request', 'total')
+    print(f"{'aşama':<16}{'medyan ms':>12}{'en kötü ms':>12}")
+    for phase in phases:
+        values = [run[phase] for run in runs]
+        print(f'{phase:<16}{statistics.median(values) * 1000:>12.1f}{max(values) * 1000:>12.1f}')
+    print(f"flask_migrate yüklendi: {any(run['migrate_loaded'] for run in runs)}")
+
+    median_total = statistics.median(run['total'] for run in runs)
+    if args.budget is not None and median_total > args.budget:
+        print(f'Bütçe aşıldı: {median_total:.3f} sn > {args.budget:.3f} sn')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+"""Toplu veri içe/dışa aktarma: varlık başına bir JSONL dosyası.
+
+`flask export-data DIZIN` kullanıcıları, takipleri, gönderileri, yorumları,
+beğenileri ve mesajları (konuşmaları ve katılımcılarıyla birlikte)
+`DIZIN/<varlık>.jsonl` dosyalarına yazar. Satırlar sunucu tarafında
+`yield_per` ile partiler halinde okunur; bellek kullanımı tablo boyutundan
+bağımsızdır.
+
+`flask import-data DIZIN` aynı dosyaları bağımlılık sırasıyla yükler.
+Satırlar ORM yerine BATCH_SIZE'lık executemany INSERT'lerle yazılır,
+her parti kendi kısa transaction'ında commit edilir. Kayıtlar kaynak
+veritabanındaki id'leri taşır; hedefte id çakışmasın diye aynı çalıştırmada
+yüklenen her tablonun id'leri hedefteki en büyük id kadar kaydırılır ve
+referanslar da aynı ofsetle çevrilir (eşleme tablosu tutulmaz). Bu yüzden
+birbirine referans veren dosyalar aynı çalıştırmada yüklenmelidir; referans
+verilen varlık çalıştırmada yoksa ve hedef tablosu boş değilse yükleme
+başlamadan reddedilir (satırlar rastgele mevcut kayıtlara bağlanırdı).
+Sayaçlar (like_count, follower_count, ...), konuşmaların son mesajı,
+user_stats, arama terimleri ve toplam metrik kovaları satır başına değil
+yükleme bittikten sonra bir kez hesaplanır. Gönderi ve profil resmi dosyaları taşınmaz, yalnızca adları.
+
+Yükleme yarıda kalırsa (geçersiz JSON, tekrar eden kullanıcı adı, hatalı
+satır) commit edilmiş partiler tabloda kalır; türetilmiş alanlar yine de
+hesaplanır ve hata mesajı bu çalıştırmanın satırlarını silen ifadeleri verir.
+Kaldığı yerden sürdürme yoktur: temizleyip komutu yeniden çalıştırın.
+"""
+import gzip
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import click
+from sqlalchemy import DateTime, func, select, update
+
+import counters
+import rollups
+import stats
+import user_search
+from models import db, User, Post, Comment, Conversation, Message, followers, likes, user_conversations
+
+BATCH_SIZE = 10_000
+PROGRESS_EVERY = 100_000  # satır
+
+# fields: dosyadaki alanlar; refs: alan -> id'si kaydırılacak varlık
+Entity = namedtuple('Entity', 'name table fields refs')
+
+# Türetilmiş sayaçlar dışa aktarılmaz; yüklemeden sonra yeniden hesaplanır
+USER_FIELDS = ('id', 'username', 'password', 'bio', 'profile_image', 'first_name', 'last_name',
+               'instagram', 'twitter', 'github', 'points', 'level', 'experience', 'last_activity')
+
+# Bağımlılık sırası: referans verilen varlık önce yüklenir
+ENTITIES = {entity.name: entity for entity in (
+    Entity('users', User.__table__, USER_FIELDS, {'id': 'users'}),
+    Entity('follows', followers, ('follower_id', 'followed_id'),
+           {'follower_id': 'users', 'followed_id': 'users'}),
+    Entity('posts', Post.__table__, ('id', 'user_id', 'body', 'hashtags', 'image', 'timestamp'),
+           {'id': 'posts', 'user_id': 'users'}),
+    Entity('comments', Comment.__table__, ('id', 'post_id', 'user_id', 'body', 'timestamp'),
+           {'id': 'comments', 'post_id': 'posts', 'user_id': 'users'}),
+    Entity('likes', likes, ('post_id', 'user_id'), {'post_id': 'posts', 'user_id': 'users'}),
+    Entity('conversations', Conversation.__table__, ('id', 'created_at', 'is_group', 'group_name'),
+           {'id': 'conversations'}),
+    Entity('participants', user_conversations, ('conversation_id', 'user_id'),
+           {'conversation_id': 'conversations', 'user_id': 'users'}),
+    Entity('messages', Message.__table__,
+           ('id', 'conversation_id', 'sender_id', 'content', 'timestamp', 'is_read'),
+           {'id': 'messages', 'conversation_id': 'conversations', 'sender_id': 'users'}),
+)}
+
+
+class Progress:
+    """İşlenen satır sayısını ve hızı stderr'e yazar"""
+
+    def __init__(self, name, every=PROGRESS_EVERY):
+        self.name = name
+        self.every = every
+        self.count = 0
+        self.started = time.perf_counter()
+        self._next = every
+
+    def add(self, count):
+        self.count += count
+        if self.count >= self._next:
+            self._next += self.every
+            self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.count / elapsed if elapsed else 0
+        click.echo(f'{self.name:<15}{self.count:>12} satır  {elapsed:>7.1f} sn  {rate:>10,.0f} satır/sn',
+                   err=True)
+
+
+def insert_batches(connection, table, rows, batch_size=BATCH_SIZE, progress=None):
+    """Satır üretecini batch_size'lık executemany çağrılarıyla yazar; satır sayısını döner"""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            connection.execute(table.insert(), batch)
+            total += len(batch)
+            if progress:
+                progress.add(len(batch))
+            batch = []
+    if batch:
+        connection.execute(table.insert(), batch)
+        total += len(batch)
+        if progress:
+            progress.add(len(batch))
+    return total
+
+
+def recompute_derived(min_post_id=0):
+    """Türetilmiş alanları uygulamanın kendi yollarıyla hesaplar.
+
+    min_post_id verilirse gönderi sayaçları yalnızca daha büyük id'ler için
+    güncellenir (yeni yüklenen gönderiler).
+    """
+    like_count = select(func.count()).where(likes.c.post_id == Post.id).scalar_subquery()
+    comment_count = select(func.count()).where(Comment.post_id == Post.id).scalar_subquery()
+    db.session.execute(update(Post).where(Post.id > min_post_id)
+                       .values(like_count=like_count, comment_count=comment_count))
+    last_message = select(func.max(Message.id)).where(Message.conversation_id == Conversation.id)
+    last_activity = select(func.max(Message.timestamp)).where(Message.conversation_id == Conversation.id)
+    db.session.execute(update(Conversation).values(
+        last_message_id=last_message.scalar_subquery(),
+        last_activity_at=func.coalesce(last_activity.scalar_subquery(), Conversation.created_at)))
+    db.session.commit()
+    counters.reconcile_user_counters(repair=True)
+    stats.refresh_all_user_stats()
+    rollups.backfill_totals()
+    user_search.rebuild_search_index()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def entity_path(directory, name):
+    """Varlığın dosyası; sıkıştırılmış sürüm varsa o seçilir"""
+    path = os.path.join(directory, f'{name}.jsonl')
+    return path + '.gz' if os.path.exists(path + '.gz') else path
+
+
+def open_text(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def parse_entities(value):
+    names = list(ENTITIES) if value == 'all' else [name.strip() for name in value.split(',')]
+    unknown = [name for name in names if name not in ENTITIES]
+    if unknown:
+        raise click.BadParameter(f'Bilinmeyen varlık: {", ".join(unknown)} (seçenekler: {", ".join(ENTITIES)})')
+    return [name for name in ENTITIES if name in names]  # bağımlılık sırası
+
+
+# ===================== DIŞA AKTARMA =====================
+
+def export_entity(connection, entity, output, batch_size=BATCH_SIZE):
+    """Tabloyu sunucu tarafı imleçle okuyup satır başına bir JSON nesnesi yazar"""
+    columns = [entity.table.c[field] for field in entity.fields]
+    query = select(*columns)
+    if 'id' in entity.fields:
+        query = query.order_by(entity.table.c.id)
+    progress = Progress(entity.name)
+    result = connection.execution_options(yield_per=batch_size).execute(query)
+    for rows in result.partitions():
+        for row in rows:
+            output.write(json.dumps(row._asdict(), ensure_ascii=False, default=datetime.isoformat))
+            output.write('\n')
+        progress.add(len(rows))
+    progress.report()
+    return progress.count
+
+
+# ===================== İÇE AKTARMA =====================
+
+def id_offsets(connection, names):
+    """Bu çalıştırmada yüklenen id'li tabloların hedefteki en büyük id'si"""
+    offsets = {}
+    for name in names:
+        table = ENTITIES[name].table
+        if 'id' in table.c:
+            offsets[name] = connection.scalar(select(func.coalesce(func.max(table.c.id), 0)))
+    return offsets
+
+
+def unresolved_refs(connection, names):
+    """Bu çalıştırmada yüklenmeyen, hedefte satırı olan referans hedefleri: [(varlık, hedef)]"""
+    unresolved = []
+    for name in names:
+        for target in sorted(set(ENTITIES[name].refs.values()) - set(names)):
+            if connection.scalar(select(ENTITIES[target].table.c.id).limit(1)) is not None:
+                unresolved.append((name, target))
+    return unresolved
+
+
+def read_records(path):
+    """Dosyayı satır satır okur; boş satırlar atlanır"""
+    with open_text(path, 'r') as source:
+        for number, line in enumerate(source, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as error:
+                    raise click.ClickException(f'{path}:{number}: geçersiz JSON ({error})')
+
+
+def existing_usernames(connection, path, batch_size=900):
+    """Hedefte zaten bulunan kullanıcı adları (yükleme başlamadan kontrol)"""
+    found = []
+    batch = []
+    for record in read_records(path):
+        batch.append(record['username'])
+        if len(batch) >= batch_size:
+            found += connection.scalars(select(User.username).where(User.username.in_(batch))).all()
+            batch = []
+    if batch:
+        found += connection.scalars(select(User.username).where(User.username.in_(batch))).all()
+    return found
+
+
+def row_builder(entity, offsets):
+    """JSON kaydını INSERT parametrelerine çevirir: id ofseti, tarih ayrıştırma, varsayılanlar"""
+    shifts = {field: offsets.get(target, 0) for field, target in entity.refs.items()}
+    dates = {field for field in entity.fields if isinstance(entity.table.c[field].type, DateTime)}
+    defaults = {}
+    for field in entity.fields:
+        default = entity.table.c[field].default
+        if default is not None and default.is_scalar:
+            defaults[field] = default.arg
+    if entity.table is User.__table__:
+        # executemany'de her satır aynı anahtarları taşımalı
+        defaults.update(follower_count=0, followed_count=0, post_count=0, identity_version=0)
+
+    def build(record):
+        row = dict(defaults)
+        for field in entity.fields:
+            value = record.get(field, row.get(field))
+            if value is not None:
+                if field in shifts:
+                    value += shifts[field]
+                elif field in dates:
+                    value = datetime.fromisoformat(value)
+            row[field] = value
+        return row
+    return build
+
+
+def import_entity(entity, path, offsets, batch_size=BATCH_SIZE):
+    """Dosyayı partiler halinde yükler; her parti ayrı transaction'da commit edilir"""
+    build = row_builder(entity, offsets)
+    progress = Progress(entity.name)
+    rows = (build(record) for record in read_records(path))
+    while True:
+        with db.engine.begin() as connection:
+            written = insert_batches(connection, entity.table, _take(rows, batch_size), batch_size, progress)
+        if written < batch_size:
+            break
+    progress.report()
+    return progress.count
+
+
+def _take(iterator, count):
+    for _, item in zip(range(count), iterator):
+        yield item
+
+
+def cleanup_statements(names, offsets):
+    """Bu çalıştırmanın yazdığı satırları silen ifadeler, bağımlılık sırasının tersiyle"""
+    statements = []
+    for name in reversed(names):
+        entity = ENTITIES[name]
+        if 'id' in entity.table.c:
+            condition = entity.table.c.id > offsets[name]
+        else:
+            # Ara tablolar: ilk referans bu çalıştırmanın kaydırılmış id'lerini gösterir
+            field, target = next(iter(entity.refs.items()))
+            condition = entity.table.c[field] > offsets.get(target, 0)
+        statements.append(str(entity.table.delete().where(condition)
+                              .compile(db.engine, compile_kwargs={'literal_binds': True})))
+    return statements
+
+
+def partial_import_message(failed, error, counts, names, offsets):
+    loaded = ', '.join(f'{name} {count}' for name, count in counts.items()) or 'yok'
+    statements = cleanup_statements(names[:names.index(failed) + 1], offsets)
+    error = getattr(error, 'orig', error)  # DBAPI hatası; parti parametreleri mesaja girmesin
+    return (f'{failed} yüklenirken durdu: {error}\n'
+            f'Tamamlanan varlıklar: {loaded}; {failed} dosyasının commit edilen partileri tabloda kaldı. '
+            f'Türetilmiş alanlar yüklenen satırlara göre hesaplandı.\n'
+            f'Kaldığı yerden sürdürülemez (id ofsetleri yeniden hesaplanır). Hatayı düzeltip bu '
+            f'çalıştırmanın satırlarını silin (yükleme sırasında uygulama yazmadıysa yalnızca '
+            f'bunlardır), sonra komutu yeniden çalıştırın:\n  '
+            + ';\n  '.join(statements) + ';')
+
+
+def import_directory(directory, names, batch_size=BATCH_SIZE):
+    """Dizindeki dosyaları bağımlılık sırasıyla yükler; varlık başına satır sayısını döner"""
+    present = [name for name in names if os.path.exists(entity_path(directory, name))]
+    # Yazıcı havuzu tek bağlantılı; kontrol ve partiler aynı anda bağlantı tutmaz
+    with db.engine.connect() as connection:
+        unresolved = unresolved_refs(connection, present)
+        clashes = existing_usernames(connection, entity_path(directory, 'users')) if 'users' in present else []
+        offsets = id_offsets(connection, present)
+    if unresolved:
+        pairs = ', '.join(f'{name} -> {target}' for name, target in unresolved)
+        raise click.ClickException(f'Referans verilen varlıklar bu çalıştırmada yok ve hedef tabloları boş değil '
+                                   f'({pairs}); ilgili dosyaları birlikte yükleyin')
+    if clashes:
+        raise click.ClickException(f'{len(clashes)} kullanıcı adı hedefte zaten var: {", ".join(clashes[:10])}')
+    counts = {}
+    try:
+        for name in present:
+            counts[name] = import_entity(ENTITIES[name], entity_path(directory, name), offsets, batch_size)
+    except Exception as error:
+        failed = next(name for name in present if name not in counts)
+        raise click.ClickException(
+            partial_import_message(failed, error, counts, present, offsets)) from error
+    finally:
+        # Yarıda kalsa da commit edilen partilerin sayaçları ve özetleri tutarlı olsun
+        started = time.perf_counter()
+        recompute_derived(min_post_id=offsets.get('posts', 0))
+        click.echo(f'{"türetilmiş":<15}{"":>12}       {time.perf_counter() - started:>7.1f} sn', err=True)
+    return counts, offsets
+
+
+def init_app(app):
+    @app.cli.command('export-data')
+    @click.argument('directory', type=click.Path(file_okay=False))
+    @click.option('--entities', default='all', show_default=True,
+                  help=f'Virgülle ayrılmış: {",".join(ENTITIES)}')
+    @click.option('--gzip', 'compress', is_flag=True, help='.jsonl.gz olarak yaz')
+    @click.option('--batch-size', default=BATCH_SIZE, show_default=True)
+    def export_data_command(directory, entities, compress, batch_size):
+        """Tabloları varlık başına bir JSONL dosyasına akıtır (sabit bellek)."""
+        names = parse_entities(entities)
+        os.makedirs(directory, exist_ok=True)
+        started = time.perf_counter()
+        total = 0
+        with db.engine.connect() as connection:
+            for name in names:
+                path = os.path.join(directory, f'{name}.jsonl' + ('.gz' if compress else ''))
+                with open_text(path, 'w') as output:
+                    total += export_entity(connection, ENTITIES[name], output, batch_size)
+        click.echo(f'{total} satır {directory} dizinine yazıldı ({time.perf_counter() - started:.1f} sn)')
+
+    @app.cli.command('import-data')
+    @click.argument('directory', type=click.Path(exists=True, file_okay=False))
+    @click.option('--entities', default='all', show_default=True,
+                  help=f'Virgülle ayrılmış: {",".join(ENTITIES)}')
+    @click.option('--batch-size', default=BATCH_SIZE, show_default=True)
+    def import_data_command(directory, entities, batch_size):
+        """JSONL dosyalarını toplu INSERT ile yükler, sayaçları sonda hesaplar."""
+        started = time.perf_counter()
+        counts, offsets = import_directory(directory, parse_entities(entities), batch_size)
+        if not counts:
+            raise click.ClickException(f'{directory} içinde yüklenecek .jsonl dosyası yok')
+        shifted = ', '.join(f'{name} +{offset}' for name, offset in offsets.items() if offset)
+        click.echo(f'{sum(counts.values())} satır yüklendi ({time.perf_counter() - started:.1f} sn)'
+                   + (f'; id ofsetleri: {shifted}' if shifted else ''))
@@ -0,0 +1,133 @@
+"""Yorum ekleme, keyset sayfalı listeleme ve akış için son yorumlar önbelleği.
+
+Yorumlar ix_comment_post_id_timestamp üzerinden (timestamp, id) azalan
+sırada sayfalanır. SQLite her index kaydına rowid'i (id) eklediği için bu
+index fiilen (post_id, timestamp, id) index'idir; binlerce yorumu olan bir
+gönderide de sayfa başına yalnızca istenen satırlar okunur.
+
+Yorum eklenirken gönderinin sayacı tek bir `comment_count + 1` UPDATE'i ile
+artırılır; gönderinin yorumları belleğe yüklenmez, eşzamanlı yorumlar
+birbirinin artışını ezmez.
+
+Akış kartları her gönderinin son COMMENT_PREVIEW_SIZE yorumunu gösterir.
+Önizlemeler süreç içi bir LRU'da (gönderi id, comment_count) anahtarıyla
+tutulur: yeni yorum sayacı değiştirdiği için anahtar da değişir, eski
+önizleme silinmeye gerek kalmadan LRU'dan düşer ve diğer worker'lar bayat
+önizleme göstermez (fragments.py'deki kart sürümüyle aynı yaklaşım).
+Eksik önizlemeler tek sorguda, gönderi başına LIMIT'li UNION ALL ile okunur.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import select, union_all, update
+
+from models import db, Comment, Post, User, mark_stats_dirty
+
+UNION_CHUNK = 100  # SQLite birleşik sorgu sınırı 500 dal
+
+
+class CommentPreviewCache:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (post_id, comment_count) -> yorum sözlükleri
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            comments = self._entries.get(key)
+            if comments is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return comments
+
+    def set(self, key, comments):
+        with self._lock:
+            self._entries[key] = comments
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+comment_preview_cache = CommentPreviewCache()
+
+
+def comment_select():
+    return select(Comment.id, Comment.post_id, Comment.body, Comment.timestamp,
+                  User.username).join(User, User.id == Comment.user_id)
+
+
+def newest_first(query):
+    return query.order_by(Comment.timestamp.desc(), Comment.id.desc())
+
+
+def add_comment(post, user_id, body):
+    """Yorumu ekler ve sayacı atomik olarak artırır; commit çağırana kalır"""
+    comment = Comment(body=body, post_id=post.id, user_id=user_id)
+    db.session.add(comment)
+    db.session.execute(
+        update(Post).where(Post.id == post.id).values(comment_count=Post.comment_count + 1),
+        execution_options={'synchronize_session': False}
+    )
+    mark_stats_dirty(post.user_id)
+    return comment
+
+
+def comments_page(post_id, limit=20, before=None):
+    """(timestamp, id) azalan keyset sayfası; before=(timestamp, id) son görülen"""
+    query = comment_select().where(Comment.post_id == post_id)
+    if before:
+        query = query.where(db.tuple_(Comment.timestamp, Comment.id) < db.tuple_(*before))
+    return db.session.execute(newest_first(query).limit(limit)).all()
+
+
+def preview_dict(row):
+    # posts() önbelleği JSON'a yazıldığı için zaman ISO metni
+    return {'id': row.id, 'body': row.body, 'username': row.username,
+            'timestamp': row.timestamp.isoformat()}
+
+
+def latest_comments(posts, size=None):
+    """posts: (id, comment_count) çiftleri. {post_id: son yorumlar (eskiden yeniye)} döner"""
+    size = size or current_app.config['COMMENT_PREVIEW_SIZE']
+    previews = {}
+    missing = []
+    for post_id, count in posts:
+        if not count:
+            previews[post_id] = []
+            continue
+        cached = comment_preview_cache.get((post_id, count))
+        if cached is None:
+            missing.append((post_id, count))
+        else:
+            previews[post_id] = cached
+
+    for start in range(0, len(missing), UNION_CHUNK):
+        chunk = missing[start:start + UNION_CHUNK]
+        # Her dal kendi gönderisinin index'inde en yeni `size` satırda durur
+        branches = [select(newest_first(comment_select().where(Comment.post_id == post_id))
+                           .limit(size).subquery())
+                    for post_id, _ in chunk]
+        query = branches[0] if len(branches) == 1 else union_all(*branches)
+        rows_by_post = {}
+        for row in db.session.execute(query):
+            rows_by_post.setdefault(row.post_id, []).append(row)
+        for post_id, count in chunk:
+            rows = sorted(rows_by_post.get(post_id, ()), key=lambda row: (row.timestamp, row.id))
+            previews[post_id] = [preview_dict(row) for row in rows]
+            comment_preview_cache.set((post_id, count), previews[post_id])
+    return previews
+
+
+def init_app(app):
+    app.config.setdefault('COMMENT_PREVIEW_SIZE', 3)
+    app.config.setdefault('COMMENT_PREVIEW_CACHE_MAX_ENTRIES', 10000)
+    comment_preview_cache.max_entries = app.config['COMMENT_PREVIEW_CACHE_MAX_ENTRIES']
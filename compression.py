@@ -0,0 +1,220 @@
+"""HTML/JSON yanıtlarının Accept-Encoding'e göre sıkıştırılması.
+
+Sıkıştırma `after_request` içinde, yanıt gönderilmeden hemen önce yapılır.
+İstemcinin kabul ettiği kodlamalardan zstd (zstandard paketi kuruluysa) ya
+da gzip seçilir. Yalnızca COMPRESS_MIMETYPES içindeki içerik tipleri ve
+COMPRESS_MIN_SIZE'dan büyük gövdeler sıkıştırılır; küçük yanıtlarda başlık
+yükü kazancı aşar. Generator yanıtları parça parça, her parçadan sonra
+flush edilerek sıkıştırılır; istemci ilk baytları beklemeden alır.
+
+Aynı güçlü ETag'e sahip gövdeler (page_cache sayfaları) bir kez sıkıştırılır
+ve sonuç küçük bir LRU'da tutulur. Sıkıştırılan yanıtın ETag'i güçlü kalır
+ama kodlamaya özgü olur ("<etag>-gzip"); koşullu istekler bu varyantı da
+kabul eder (page_cache.py). Statik dosyalar istek sırasında
+sıkıştırılmaz: `flask compress-static` yanlarına .gz/.zst kopyalarını bir
+kez üretir, istek geldiğinde hazır kopya gönderilir.
+"""
+import gzip
+import mimetypes
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+import click
+from flask import request, send_from_directory
+
+try:
+    import zstandard
+except ImportError:  # isteğe bağlı bağımlılık
+    zstandard = None
+
+COMPRESS_MIMETYPES = {
+    'text/html', 'text/plain', 'text/css', 'text/javascript', 'application/javascript',
+    'application/json', 'image/svg+xml',
+}
+STATIC_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg', '.txt', '.map'}
+SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def encoded_etag(etag, encoding):
+    return f'{etag}-{encoding}'
+
+
+def etag_variants(etag):
+    """Aynı gövdenin kodlamaya özgü ETag'leri"""
+    return [encoded_etag(etag, encoding) for encoding in SUFFIXES]
+
+
+def available_encodings():
+    return ('zstd', 'gzip') if zstandard is not None else ('gzip',)
+
+
+def negotiate(accept_encodings):
+    """En yüksek kaliteli desteklenen kodlama; eşitlikte zstd tercih edilir"""
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_bytes(data, encoding, level):
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level):
+    """Her parçadan sonra flush: istemci gövdenin tamamını beklemez"""
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip başlığı
+        flush_mode = zlib.Z_SYNC_FLUSH
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(flush_mode)
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+class CompressedBodyCache:
+    """(ETag, kodlama) -> sıkıştırılmış gövde; önbellekten gelen sayfalar için"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+compressed_bodies = CompressedBodyCache()
+
+
+def _should_compress(response, config):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers or response.direct_passthrough:
+        return False
+    if response.mimetype not in config['COMPRESS_MIMETYPES']:
+        return False
+    if response.is_streamed:
+        return config['COMPRESS_STREAMS']
+    return response.calculate_content_length() >= config['COMPRESS_MIN_SIZE']
+
+
+def compress_response(response, encoding, level):
+    etag, weak = response.get_etag()
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        key = (etag, encoding) if etag and not weak else None
+        body = compressed_bodies.get(key) if key else None
+        if body is None:
+            body = compress_bytes(response.get_data(), encoding, level)
+            if key:
+                compressed_bodies.set(key, body)
+        response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if etag and not weak:
+        # Bayt gösterimi değişti; güçlü ETag kodlamaya özgü hale gelir, If-Match bozulmaz
+        response.set_etag(encoded_etag(etag, encoding))
+    return response
+
+
+def precompressed_static(app, filename):
+    """Statik dosyanın hazır sıkıştırılmış kopyası varsa onu gönderir"""
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None or os.path.splitext(filename)[1] not in STATIC_EXTENSIONS:
+        return None
+    source = os.path.join(app.static_folder, filename)
+    variant = source + SUFFIXES[encoding]
+    try:
+        if os.path.getmtime(variant) < os.path.getmtime(source):
+            return None  # kaynak sonradan değişmiş; yeniden üretilene kadar ham dosya
+    except OSError:
+        return None
+    response = send_from_directory(app.static_folder, filename + SUFFIXES[encoding],
+                                   mimetype=mimetypes.guess_type(filename)[0])
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def compress_static_folder(folder, level, min_size):
+    """Sıkıştırılabilir statik dosyaların yanına .gz/.zst kopyası yazar"""
+    written = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1] not in STATIC_EXTENSIONS or os.path.getsize(path) < min_size:
+                continue
+            with open(path, 'rb') as source:
+                data = None
+                for encoding in available_encodings():
+                    target = path + SUFFIXES[encoding]
+                    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                        continue
+                    data = data if data is not None else source.read()
+                    with open(target, 'wb') as out:
+                        out.write(compress_bytes(data, encoding, level))
+                    written.append(target)
+    return written
+
+
+def init_app(app):
+    """Diğer after_request kancalarından önce kaydedilir; böylece en son çalışır"""
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIMETYPES', COMPRESS_MIMETYPES)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)  # bayt
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_STREAMS', True)
+
+    @app.after_request
+    def compress(response):
+        if not app.config['COMPRESS_ENABLED']:
+            return response
+        if request.endpoint == 'static':
+            variant = precompressed_static(app, request.view_args['filename']) \
+                if response.status_code == 200 else None
+            if variant is None:
+                return response
+            response.close()  # ham dosyanın tanıtıcısı
+            return variant
+        if not _should_compress(response, app.config):
+            return response
+        encoding = negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+        return compress_response(response, encoding, app.config['COMPRESS_LEVEL'])
+
+    @app.cli.command('compress-static')
+    @click.option('--level', type=int, default=9, help='Sıkıştırma seviyesi (bir kez yapıldığı için yüksek)')
+    def compress_static_command(level):
+        """Statik dosyaların .gz (ve zstandard kuruluysa .zst) kopyalarını üretir."""
+        written = compress_static_folder(app.static_folder, level, app.config['COMPRESS_MIN_SIZE'])
+        for path in written:
+            click.echo(path)
+        click.echo(f'{len(written)} dosya sıkıştırıldı')
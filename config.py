@@ -6,9 +6,6 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///users.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
-    # Redis konfigürasyonu
-    REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
-    
     # Güvenlik ayarları
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     SESSION_COOKIE_SECURE = False
@@ -17,16 +14,17 @@ class Config:
     
     # Upload ayarları
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB
-    UPLOAD_FOLDER = 'static/uploads'
+    POST_IMAGES_FOLDER = os.path.join('static', 'post_images')
+    PROFILE_PIC_FOLDER = os.path.join('static', 'profile_images')
     
-    # Rate limiting
-    RATELIMIT_STORAGE_URL = REDIS_URL
+    # Rate limiting deposu ratelimit.py'de (instance/ratelimit.db)
 
 class DevelopmentConfig(Config):
     DEBUG = True
 
 class ProductionConfig(Config):
     DEBUG = False
+    TEMPLATES_AUTO_RELOAD = False  # şablonlar bir kez derlenir (fragments.py)
     SESSION_COOKIE_SECURE = True
 
 config = {
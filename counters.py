@@ -0,0 +1,114 @@
+"""User sayaç kolonlarının (follower_count, followed_count, post_count) mutabakatı.
+
+Sayaçlar takip/gönderi işlemleriyle aynı transaction'da artırılır; bu modül
+gerçek COUNT(*) değerleriyle karşılaştırıp sapmaları bulur ve düzeltir.
+`flask reconcile-counters` ile elle ya da cron'dan, `COUNTER_RECONCILE_INTERVAL`
+ayarlıysa arka plan thread'i ile periyodik olarak çalışır.
+"""
+import threading
+import time
+
+import click
+from sqlalchemy import func, select, update
+
+from database import READ_BIND_KEY
+from models import db, User, Post, followers, mark_identity_dirty, mark_stats_dirty
+
+BATCH_SIZE = 1000
+
+
+def actual_counts():
+    """Her sayaç için ilişkili tablodan hesaplanan gerçek değer ifadeleri"""
+    return {
+        'follower_count': select(func.count()).where(
+            followers.c.followed_id == User.id).scalar_subquery(),
+        'followed_count': select(func.count()).where(
+            followers.c.follower_id == User.id).scalar_subquery(),
+        'post_count': select(func.count()).where(
+            Post.user_id == User.id).scalar_subquery(),
+    }
+
+
+def reconcile_user_counters(repair=True, batch_size=BATCH_SIZE):
+    """Sapan sayaçları bulur; repair=True ise düzeltir. Sapmaların listesini döner"""
+    expected = actual_counts()
+    drifts = []
+    last_id = 0
+    # Tarama okuma havuzundan yapılır; tek yazıcı bağlantısı yalnızca düzeltme
+    # UPDATE'leri için, batch başına kısa bir transaction'da tutulur
+    engine = db.engines.get(READ_BIND_KEY) or db.engine
+    while True:
+        with engine.connect() as connection:
+            rows = connection.execute(
+                select(User.id, *[getattr(User, name) for name in expected],
+                       *expected.values())
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        width = len(expected)
+        drifted_ids = set()
+        for row in rows:
+            stored, actual = row[1:1 + width], row[1 + width:]
+            for name, have, want in zip(expected, stored, actual):
+                if have != want:
+                    drifts.append((row[0], name, have, want))
+                    drifted_ids.add(row[0])
+
+        if repair and drifted_ids:
+            db.session.execute(
+                update(User).where(User.id.in_(drifted_ids))
+                .values(**expected, identity_version=User.identity_version + 1),
+                execution_options={'synchronize_session': False}
+            )
+            # user_stats commit öncesi yenilenir, önbellekteki profiller düşer
+            mark_stats_dirty(*drifted_ids)
+            mark_identity_dirty(*drifted_ids)
+            db.session.commit()
+    return drifts
+
+
+def start_reconciler(app, interval):
+    """Mutabakatı `interval` saniyede bir çalıştıran daemon thread başlatır"""
+    def loop():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    drifts = reconcile_user_counters()
+                    if drifts:
+                        app.logger.warning(f'Sayaç sapması düzeltildi: {len(drifts)} kayıt')
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception('Sayaç mutabakatı başarısız')
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=loop, name='counter-reconciler', daemon=True)
+    thread.start()
+    return thread
+
+
+def init_app(app):
+    app.config.setdefault('COUNTER_RECONCILE_INTERVAL', 3600)
+    started = threading.Lock()
+
+    @app.before_request
+    def start_reconciler_once():
+        # Thread yalnızca sunucu gerçekten istek almaya başlayınca kurulur
+        interval = app.config['COUNTER_RECONCILE_INTERVAL']
+        if interval and started.acquire(blocking=False):
+            start_reconciler(app, interval)
+
+    @app.cli.command('reconcile-counters')
+    @click.option('--dry-run', is_flag=True, help='Sadece raporla, düzeltme')
+    def reconcile_counters_command(dry_run):
+        """User sayaçlarını gerçek değerlerle karşılaştırır ve düzeltir."""
+        drifts = reconcile_user_counters(repair=not dry_run)
+        for user_id, name, have, want in drifts:
+            click.echo(f'user {user_id}: {name} {have} -> {want}')
+        click.echo(f"{len(drifts)} sapma {'bulundu' if dry_run else 'düzeltildi'}")
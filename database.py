@@ -0,0 +1,123 @@
+"""SQLite motor profili ve okuma/yazma bağlantı yönlendirmesi.
+
+Her yeni SQLite bağlantısına `SQLITE_PRAGMAS` içindeki ayarlar (WAL,
+busy_timeout, synchronous=NORMAL, mmap ve cache boyutu) `connect` olayı ile
+uygulanır. Yeni veritabanları auto_vacuum=INCREMENTAL ile oluşur; arşivleme
+sonrası boşalan sayfalar retention.py tarafından dosyaya iade edilir.
+Yazmalar tek bağlantılı bir havuzdan sırayla geçer; `read_only` ile
+işaretlenen GET istekleri ise `query_only` açık, ayrı bir okuma havuzuna
+yönlendirilir. WAL sayesinde okuyucular yazma sırasında beklemez.
+"""
+import base64
+import json
+
+from flask import g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+READ_BIND_KEY = 'reader'
+
+DEFAULT_PRAGMAS = {
+    'auto_vacuum': 'INCREMENTAL',   # yalnızca yeni dosyada etkili; ilk sırada olmalı
+    'busy_timeout': 5000,           # ms
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,           # negatif değer KB cinsinden (~64 MB)
+}
+
+
+class RoutingSession(Session):
+    """Salt okunur isteklerde sorguları okuma havuzuna yönlendiren oturum"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing
+                and not getattr(clause, 'is_dml', False)
+                and has_app_context() and g.get('db_read_only')):
+            engines = self._db.engines
+            if READ_BIND_KEY in engines:
+                return engines[READ_BIND_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """GET/HEAD isteklerinde view'i okuma havuzunda çalıştırır"""
+    view._db_read_only = True
+    return view
+
+
+def encode_cursor(*values):
+    """Keyset sayfalama için opak imleç: son satırın sıralama anahtarı"""
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Geçersiz imleçte None döner (ilk sayfa)"""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def _is_file_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def apply_pragmas(dbapi_connection, pragmas, query_only=False):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    if query_only:
+        cursor.execute('PRAGMA query_only=ON')
+    cursor.close()
+
+
+def init_app(app, db):
+    """Motor seçeneklerini ayarlar, db'yi uygulamaya bağlar ve pragmaları kaydeder"""
+    app.config.setdefault('SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+    app.config.setdefault('SQLITE_WRITER_POOL_SIZE', 1)
+    app.config.setdefault('SQLITE_READER_POOL_SIZE', 8)
+    app.config.setdefault('SQLITE_POOL_TIMEOUT', 30)
+
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    routed = _is_file_sqlite(uri)
+    if routed:
+        # Tek yazıcı: tüm yazmalar tek bağlantı üzerinden sıraya girer
+        engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        engine_options.setdefault('pool_size', app.config['SQLITE_WRITER_POOL_SIZE'])
+        engine_options.setdefault('max_overflow', 0)
+        engine_options.setdefault('pool_timeout', app.config['SQLITE_POOL_TIMEOUT'])
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault(READ_BIND_KEY, {
+            'url': uri,
+            'pool_size': app.config['SQLITE_READER_POOL_SIZE'],
+            'max_overflow': 0,
+            'pool_timeout': app.config['SQLITE_POOL_TIMEOUT'],
+        })
+
+    db.init_app(app)
+
+    pragmas = app.config['SQLITE_PRAGMAS']
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if engine.dialect.name != 'sqlite':
+                continue
+            query_only = key == READ_BIND_KEY
+
+            @event.listens_for(engine, 'connect')
+            def on_connect(dbapi_connection, connection_record, query_only=query_only):
+                apply_pragmas(dbapi_connection, pragmas, query_only=query_only)
+
+    @app.before_request
+    def route_read_only_requests():
+        view = app.view_functions.get(request.endpoint)
+        if routed and request.method in ('GET', 'HEAD') and getattr(view, '_db_read_only', False):
+            g.db_read_only = True
@@ -0,0 +1,341 @@
+"""Bellek içi, sıkıştırılmış (CSR) takip grafiği.
+
+`followers` tablosu iki yönlü bitişiklik dizisine yüklenir: `offsets[u]` ile
+`offsets[u + 1]` arası, `targets` içinde u'nun sıralı komşularıdır. Dizi
+elemanları `array('i')` olduğu için kenar başına 4 bayt tutulur; üyelik
+testi komşu dilimi üzerinde ikili aramadır, sorgu atılmaz.
+
+Bu süreçte commit edilen follow/unfollow'lar (`mark_follow_changed`) commit
+sonrası küçük bir ek/silme katmanına işlenir. Katman FOLLOW_GRAPH_COMPACT_AT
+kenarı aşınca ya da grafik FOLLOW_GRAPH_REFRESH saniyeden eskiyse arka planda
+tablodan yeniden kurulur. Yeniden kurulum sırasında gelen değişiklikler yeni
+grafiğe tekrar uygulanır.
+
+Diğer süreçlerin değişiklikleri için her FOLLOW_GRAPH_CHECK saniyede tablonun
+kenar sayısı ve en büyük rowid'i grafiğin beklediğiyle karşılaştırılır. Fark
+varsa yeniden kurulum başlar ve o bitene kadar üyelik testleri
+(`is_following`, `is_mutual`) veritabanından yanıtlanır.
+
+Yazma yolu (`User.follow`/`unfollow`) tekrar kaydı önlemek için hâlâ
+veritabanına bakar; grafik yalnızca okuma yolundadır.
+"""
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from flask import current_app
+from sqlalchemy import event, exists, func, literal_column, select
+
+from database import READ_BIND_KEY, RoutingSession
+from models import db, followers, User
+
+
+class Adjacency:
+    """Tek yönlü CSR bitişiklik: kaynak -> sıralı hedefler"""
+    __slots__ = ('offsets', 'targets')
+
+    def __init__(self, size):
+        self.offsets = array('i', bytes(4 * (size + 1)))
+        self.targets = array('i')
+
+    @classmethod
+    def from_sorted_pairs(cls, pairs, size):
+        """(kaynak, hedef) çiftleri kaynak, hedef sırasıyla gelmeli"""
+        adjacency = cls(size)
+        counts, targets = adjacency.offsets, adjacency.targets
+        previous = None
+        for pair in pairs:
+            if pair == previous:  # tabloda tekil kısıt yok; tekrarları at
+                continue
+            previous = pair
+            counts[pair[0] + 1] += 1
+            targets.append(pair[1])
+        for node in range(1, size + 1):
+            counts[node] += counts[node - 1]
+        return adjacency
+
+    def bounds(self, node):
+        if node + 1 >= len(self.offsets):
+            return 0, 0
+        return self.offsets[node], self.offsets[node + 1]
+
+    def contains(self, node, target):
+        lo, hi = self.bounds(node)
+        index = bisect_left(self.targets, target, lo, hi)
+        return index < hi and self.targets[index] == target
+
+    def degree(self, node):
+        lo, hi = self.bounds(node)
+        return hi - lo
+
+    def neighbors(self, node):
+        lo, hi = self.bounds(node)
+        return self.targets[lo:hi]
+
+
+class Direction:
+    """CSR + bu süreçte commit edilmiş ekleme/silme katmanı"""
+    __slots__ = ('base', 'added', 'removed', 'lock')
+
+    def __init__(self, base, lock):
+        self.base = base
+        self.added = {}
+        self.removed = {}
+        self.lock = lock  # FollowGraph._lock; apply() katmanı bu kilit altında değiştirir
+
+    def contains(self, node, target):
+        if target in self.added.get(node, ()):
+            return True
+        return target not in self.removed.get(node, ()) and self.base.contains(node, target)
+
+    def neighbors(self, node):
+        # Kümeler kilit altında kopyalanır; dolaşırken değişmesinler
+        with self.lock:
+            added = set(self.added.get(node, ()))
+            removed = set(self.removed.get(node, ()))
+        result = [t for t in self.base.neighbors(node) if t not in removed] if removed \
+            else list(self.base.neighbors(node))
+        if added:
+            result = sorted(set(result) | added)
+        return result
+
+    def degree(self, node):
+        return self.base.degree(node) + len(self.added.get(node, ())) - len(self.removed.get(node, ()))
+
+    def apply(self, source, target, delta):
+        """Kenarın durumu değiştiyse True döner"""
+        present = self.contains(source, target)
+        if delta > 0:
+            self.removed.get(source, set()).discard(target)
+            if not self.base.contains(source, target):
+                self.added.setdefault(source, set()).add(target)
+        else:
+            self.added.get(source, set()).discard(target)
+            if self.base.contains(source, target):
+                self.removed.setdefault(source, set()).add(target)
+        return present != (delta > 0)
+
+    def overlay_size(self):
+        with self.lock:
+            return sum(map(len, self.added.values())) + sum(map(len, self.removed.values()))
+
+
+class FollowGraph:
+    def __init__(self):
+        self.out = None  # takip edilenler
+        self.inc = None  # takipçiler
+        self.popular = []  # öneri yedeği: en çok takipçili kullanıcılar
+        self.built_at = 0.0
+        # Grafiğin beklediği tablo durumu; yerel commit'lerle birlikte ilerler
+        self.edge_count = 0
+        self.max_rowid = None  # yerel değişiklikten sonra bilinmez, sonraki kontrolde alınır
+        self.checked_at = 0.0
+        self.current = True  # son kontrolde tablo grafikle uyuşuyordu
+        self._lock = threading.Lock()
+        self._ready = threading.Event()  # ilk kurulum bitti
+        self._rebuilding = False
+        self._journal = None  # yeniden kurulum sırasında gelen değişiklikler
+
+    @property
+    def loaded(self):
+        return self.out is not None
+
+    # ---- kurulum ----
+
+    @staticmethod
+    def table_version(connection):
+        """(kenar sayısı, en büyük rowid); tabloda tamsayı anahtar yok, rowid ekleme sırasıdır"""
+        return tuple(connection.execute(
+            select(func.count(), func.max(literal_column('rowid'))).select_from(followers)).one())
+
+    def build(self, connection, popular_size=100):
+        # Sürüm taramadan önce okunur: arada gelen değişiklik sonraki kontrolde
+        # fark olarak görünür ve en kötü ihtimalle bir kurulum daha yapılır
+        version = self.table_version(connection)
+        size = (connection.execute(select(func.max(User.id))).scalar() or 0) + 1
+        out_pairs = connection.execute(
+            select(followers.c.follower_id, followers.c.followed_id)
+            .order_by(followers.c.follower_id, followers.c.followed_id)
+            .execution_options(yield_per=50000))
+        out = Adjacency.from_sorted_pairs(map(tuple, out_pairs), size)
+        in_pairs = connection.execute(
+            select(followers.c.followed_id, followers.c.follower_id)
+            .order_by(followers.c.followed_id, followers.c.follower_id)
+            .execution_options(yield_per=50000))
+        inc = Adjacency.from_sorted_pairs(map(tuple, in_pairs), size)
+        popular = heapq.nlargest(popular_size, range(size), key=inc.degree)
+        return out, inc, popular, version
+
+    def rebuild(self, engine):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+            self._journal = []
+        try:
+            with engine.connect() as connection:
+                out, inc, popular, version = self.build(connection)
+            with self._lock:
+                self.out, self.inc = Direction(out, self._lock), Direction(inc, self._lock)
+                self.popular = popular
+                self.edge_count, self.max_rowid = version
+                # Okuma başladıktan sonra commit edilenler yeni grafikte olmayabilir
+                for change in self._journal:
+                    self._apply(*change)
+                self.built_at = self.checked_at = time.monotonic()
+                self.current = True
+            self._ready.set()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._journal = None
+
+    def ensure_fresh(self):
+        """İlk kullanımda kurar, sonrasında eskiyince arka planda yeniler.
+
+        Grafik tabloyla uyuşuyorsa True döner; False ise üyelik testleri
+        veritabanına sorulmalıdır.
+        """
+        config = current_app.config
+        # Tablo taraması tek yazıcı bağlantısını tutmasın diye okuma havuzundan
+        # yapılır; yönlendirme kapalıysa (bellek içi veritabanı) varsayılan motor
+        engine = db.engines.get(READ_BIND_KEY) or db.engine
+        while not self.loaded:
+            # Kurulumu bir istek yapar, eşzamanlı gelenler bitmesini bekler;
+            # kurulum hata verirse bekleyenlerden biri yeniden dener
+            self.rebuild(engine)
+            self._ready.wait(1)
+        now = time.monotonic()
+        if now - self.checked_at > config['FOLLOW_GRAPH_CHECK']:
+            self.checked_at = now
+            self.current = self._matches_table(engine)
+        stale = not self.current or now - self.built_at > config['FOLLOW_GRAPH_REFRESH']
+        oversized = self.out.overlay_size() > config['FOLLOW_GRAPH_COMPACT_AT']
+        if (stale or oversized) and not self._rebuilding:
+            threading.Thread(target=self.rebuild, args=(engine,),
+                             name='follow-graph-rebuild', daemon=True).start()
+        return self.current
+
+    def _matches_table(self, engine):
+        """Diğer süreçlerin follow/unfollow'ları kenar sayısını ya da en büyük rowid'i değiştirir"""
+        with engine.connect() as connection:
+            count, max_rowid = self.table_version(connection)
+        with self._lock:
+            if count != self.edge_count:
+                return False
+            if self.max_rowid is None:
+                self.max_rowid = max_rowid
+            return max_rowid == self.max_rowid
+
+    # ---- güncelleme ----
+
+    def _apply(self, follower_id, followed_id, delta):
+        if self.out.apply(follower_id, followed_id, delta):
+            self.edge_count += delta
+            self.max_rowid = None
+        self.inc.apply(followed_id, follower_id, delta)
+
+    def apply(self, changes):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.extend(changes)
+            if self.loaded:
+                for change in changes:
+                    self._apply(*change)
+
+    # ---- sorgular ----
+
+    @staticmethod
+    def _edge_in_table(follower_id, followed_id):
+        return db.session.execute(select(exists().where(
+            followers.c.follower_id == follower_id,
+            followers.c.followed_id == followed_id))).scalar()
+
+    def is_following(self, follower_id, followed_id):
+        if not self.ensure_fresh():
+            return self._edge_in_table(follower_id, followed_id)
+        return self.out.contains(follower_id, followed_id)
+
+    def is_mutual(self, a, b):
+        if not self.ensure_fresh():
+            return self._edge_in_table(a, b) and self._edge_in_table(b, a)
+        return self.out.contains(a, b) and self.out.contains(b, a)
+
+    def following(self, user_id):
+        self.ensure_fresh()
+        return self.out.neighbors(user_id)
+
+    def followers(self, user_id):
+        self.ensure_fresh()
+        return self.inc.neighbors(user_id)
+
+    def mutual_follows(self, user_id):
+        """Karşılıklı takipleşilen kullanıcılar: iki sıralı listenin kesişimi"""
+        self.ensure_fresh()
+        followers_of = set(self.inc.neighbors(user_id))
+        return [other for other in self.out.neighbors(user_id) if other in followers_of]
+
+    def suggestions(self, user_id, limit=10, max_neighbors=100, max_edges=10000):
+        """Arkadaşların arkadaşları; ortak bağlantı sayısına, sonra popülerliğe göre.
+
+        İş sınırlıdır: en fazla `max_neighbors` takip edilen, toplamda en fazla
+        `max_edges` kenar taranır. Çok kullanıcı takip edenlerde takip listesi
+        eşit aralıklarla örneklenir.
+        """
+        self.ensure_fresh()
+        followed = self.out.neighbors(user_id)
+        if len(followed) > max_neighbors:
+            step = len(followed) / max_neighbors
+            sampled = [followed[int(i * step)] for i in range(max_neighbors)]
+        else:
+            sampled = followed
+        excluded = set(followed)
+        excluded.add(user_id)
+
+        scores = {}
+        budget = max_edges
+        per_neighbor = max(1, max_edges // max(1, len(sampled)))
+        for friend in sampled:
+            if budget <= 0:
+                break
+            candidates = self.out.neighbors(friend)[:min(per_neighbor, budget)]
+            budget -= len(candidates)
+            for candidate in candidates:
+                if candidate not in excluded:
+                    scores[candidate] = scores.get(candidate, 0) + 1
+
+        ranked = heapq.nlargest(limit, scores.items(),
+                                key=lambda item: (item[1], self.inc.degree(item[0]), -item[0]))
+        result = [(candidate, mutual) for candidate, mutual in ranked]
+        if len(result) < limit:
+            # Az takip eden kullanıcılar için popüler hesaplarla tamamla
+            chosen = excluded | {candidate for candidate, _ in result}
+            for candidate in self.popular:
+                if len(result) >= limit:
+                    break
+                if candidate not in chosen and self.inc.degree(candidate) > 0:
+                    result.append((candidate, 0))
+        return result
+
+
+follow_graph = FollowGraph()
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def apply_follow_changes(session):
+    changes = session.info.pop('follow_changes', None)
+    if changes:
+        follow_graph.apply(changes)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_follow_changes(session):
+    session.info.pop('follow_changes', None)
+
+
+def init_app(app):
+    app.config.setdefault('FOLLOW_GRAPH_REFRESH', 300)  # sn
+    app.config.setdefault('FOLLOW_GRAPH_CHECK', 5)  # sn; diğer süreçlerin değişiklikleri için
+    app.config.setdefault('FOLLOW_GRAPH_COMPACT_AT', 50000)  # katmandaki kenar sayısı
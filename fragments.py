@@ -0,0 +1,111 @@
+"""Jinja bytecode önbelleği ve gönderi kartı parça (fragment) önbelleği.
+
+Şablonlar derlendikten sonra bytecode'ları instance/jinja_cache altına
+yazılır; aynı makinedeki tüm worker'lar derlemeyi bir kez yapar. Otomatik
+yeniden yükleme yalnızca debug modunda açıktır; production'da şablon
+dosyaları her render'da yoklanmaz.
+
+Gönderi kartları izleyiciden bağımsız olarak bir kez render edilir ve
+(gönderi id, sürüm) anahtarıyla LRU'da tutulur. Sürüm kartta görünen
+sayaçlardan ve yazar bilgisinden üretilir; gönderi değiştiğinde anahtar
+değişir, eski kart LRU'dan düşer. İzleyiciye özel kısımlar (beğeni butonu
+durumu) kartta yer tutucu olarak bırakılır ve her istekte yerine konur.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+# Kullanıcı içeriği escape edildiği için bu işaret yalnızca şablondan gelebilir
+LIKE_CLASS_SLOT = '<!--viewer:like-class-->'
+
+
+class FragmentCache:
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return html
+
+    def set(self, key, html):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+def post_version(post):
+    """Kartta görünen ve değişebilen alanlar; gövde ve resim düzenlenemiyor"""
+    return (post.like_count, post.comment_count, post.author, post.author_image)
+
+
+def _render_fragment(template_name, key, **context):
+    if not current_app.config['FRAGMENT_CACHE_ENABLED']:
+        return current_app.jinja_env.get_template(template_name).render(**context)
+    html = fragment_cache.get(key)
+    if html is None:
+        # render_template yerine doğrudan şablon: context processor'lar (current_user)
+        # parçaya giremez, böylece kart izleyiciden bağımsız kalır
+        html = current_app.jinja_env.get_template(template_name).render(**context)
+        fragment_cache.set(key, html)
+    return html
+
+
+def post_card(post):
+    """Akıştaki gönderi kartı (read_models.FeedPost)"""
+    html = _render_fragment('_post_card.html', ('post_card', post.id, post_version(post)), post=post)
+    like_class = 'btn-danger' if post.is_liked else 'btn-outline-danger'
+    return Markup(html.replace(LIKE_CLASS_SLOT, like_class))
+
+
+def profile_post_card(post):
+    """Profil sayfasındaki gönderi kartı (ORM nesnesi)"""
+    return Markup(_render_fragment('_profile_post_card.html',
+                                   ('profile_post_card', post.id, post.timestamp), post=post))
+
+
+def format_timestamp(value, fmt='%d.%m.%Y %H:%M'):
+    """datetime ya da ISO metni (önbellekten gelen satırlar)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime(fmt) if value else ''
+
+
+def init_app(app):
+    app.config.setdefault('JINJA_BYTECODE_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache'))
+    app.config.setdefault('FRAGMENT_CACHE_ENABLED', True)
+    app.config.setdefault('FRAGMENT_CACHE_MAX_ENTRIES', 5000)
+    fragment_cache.max_entries = app.config['FRAGMENT_CACHE_MAX_ENTRIES']
+
+    cache_dir = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        # jinja_env ilk erişimde oluşturulur; bu yüzden init_app ondan önce çağrılmalı
+        app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(cache_dir)}
+
+    app.add_template_global(post_card)
+    app.add_template_global(profile_post_card)
+    app.add_template_filter(format_timestamp)
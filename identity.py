@@ -0,0 +1,150 @@
+"""`load_user` için sürümlü kimlik önbelleği.
+
+Her HTTP isteği ve Socket.IO olayı için çalışan `User.query.get` yerine,
+şablonların ve handler'ların okuduğu alanların salt okunur bir kopyası
+(`CachedUser`) süreç içinde tutulur. Kullanıcı satırındaki
+`identity_version` profil, şifre, puan ve sayaç değişikliklerinde artırılır;
+aynı süreçteki kopya commit anında düşürülür, diğer süreçlerdeki kopyalar en
+geç `IDENTITY_CACHE_TTL` saniye sonra tek kolonluk bir sürüm sorgusuyla
+doğrulanır. Kullanıcıyı değiştiren handler'lar `current_user.orm` ile tam ORM
+nesnesini yükler.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
+
+from database import RoutingSession
+from models import db, User
+
+SNAPSHOT_FIELDS = (
+    'id', 'username', 'profile_image', 'bio', 'first_name', 'last_name',
+    'instagram', 'twitter', 'github', 'points', 'level', 'experience',
+    'last_activity', 'follower_count', 'followed_count', 'post_count',
+    'is_verified', 'identity_version',
+)
+
+# Değişince önbelleği geçersiz kılan alanlar
+TRACKED_FIELDS = frozenset(SNAPSHOT_FIELDS) - {'id', 'identity_version'} | {'password'}
+
+# Yalnızca self.id ve kopyadaki alanları okuyan User metotları
+SHARED_METHODS = (
+    'followers_count', 'following_count', 'posts_count',
+    'increment_counters', 'get_unread_notifications_count', 'get_recent_notifications',
+    'mark_notifications_read',
+    'get_recent_messages', 'get_unread_messages_count', 'get_direct_conversation',
+)
+
+
+class CachedUser(UserMixin):
+    """User satırının istek başına oluşturulan salt okunur kopyası"""
+    __slots__ = SNAPSHOT_FIELDS + ('_orm',)
+
+    def __init__(self, values):
+        for name, value in zip(SNAPSHOT_FIELDS, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_orm', None)
+
+    @property
+    def orm(self):
+        """Tam ORM nesnesi; ilk erişimde birincil anahtarla yüklenir"""
+        if self._orm is None:
+            object.__setattr__(self, '_orm', db.session.get(User, self.id))
+        return self._orm
+
+    def __getattr__(self, name):
+        # Kopyada olmayan alan/metotlar ORM nesnesine devredilir
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.orm, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.orm, name, value)
+        if name in SNAPSHOT_FIELDS:
+            object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+
+
+for _name in SHARED_METHODS:
+    setattr(CachedUser, _name, getattr(User, _name))
+
+
+class IdentityCache:
+    def __init__(self, ttl=5.0, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # user_id -> (version, checked_at, values)
+        self._lock = threading.Lock()
+
+    def load(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+
+        if entry is not None:
+            version, checked_at, values = entry
+            if now - checked_at < self.ttl:
+                return CachedUser(values)
+            current = db.session.scalar(
+                select(User.identity_version).where(User.id == user_id))
+            if current == version:
+                self._store(user_id, (version, now, values))
+                return CachedUser(values)
+
+        columns = [getattr(User, name) for name in SNAPSHOT_FIELDS]
+        row = db.session.execute(select(*columns).where(User.id == user_id)).first()
+        if row is None:
+            self.invalidate([user_id])
+            return None
+        values = tuple(row)
+        self._store(user_id, (row.identity_version, now, values))
+        return CachedUser(values)
+
+    def _store(self, user_id, entry):
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+
+identity_cache = IdentityCache()
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def bump_identity_versions(session, flush_context, instances):
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in TRACKED_FIELDS):
+            obj.identity_version = User.identity_version + 1
+            session.info.setdefault('identity_dirty', set()).add(obj.id)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def drop_committed_identities(session):
+    dirty = session.info.pop('identity_dirty', None)
+    if dirty:
+        identity_cache.invalidate(dirty)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_identity_marks(session):
+    session.info.pop('identity_dirty', None)
+
+
+def init_app(app):
+    app.config.setdefault('IDENTITY_CACHE_TTL', 5.0)
+    app.config.setdefault('IDENTITY_CACHE_SIZE', 10000)
+    identity_cache.ttl = app.config['IDENTITY_CACHE_TTL']
+    identity_cache.max_size = app.config['IDENTITY_CACHE_SIZE']
@@ -0,0 +1,237 @@
+"""İstek başına SQL ve gecikme ölçümü, Prometheus metin çıktısı.
+
+SQLAlchemy `before/after_cursor_execute` olaylarıyla her sorgunun süresi
+ölçülür ve o anki isteğe (ya da Socket.IO olayına) yazılır. İstek bitince
+sorgu sayısı, SQL süresi ve toplam gecikme endpoint bazında histogramlara
+eklenir. Eşiği aşan sorgular normalize edilmiş halleriyle yavaş sorgu
+günlüğünde tutulur. `/metrics` bu verileri Prometheus metin formatında sunar.
+"""
+import inspect
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import wraps
+
+from flask import before_render_template, g, has_app_context, request, template_rendered
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+PROCESS_STARTED = time.time()
+
+
+class Histogram:
+    """Etiket başına kümülatif kovalı histogram (Prometheus semantiği)"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}  # etiket -> [kova sayaçları..., toplam, adet]
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self, label_name):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted(self._series.items())
+        for label, series in items:
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {series[-2]:.6f}')
+            lines.append(f'{self.name}_count{{{label_name}="{label}"}} {series[-1]}')
+        return lines
+
+
+request_latency = Histogram('http_request_duration_seconds', 'Toplam istek süresi', LATENCY_BUCKETS)
+request_sql_time = Histogram('http_request_sql_seconds', 'İstek başına SQL süresi', LATENCY_BUCKETS)
+request_queries = Histogram('http_request_sql_queries', 'İstek başına sorgu sayısı', QUERY_COUNT_BUCKETS)
+request_render_time = Histogram('http_request_render_seconds', 'İstek başına şablon render süresi', LATENCY_BUCKETS)
+socket_latency = Histogram('socketio_event_duration_seconds', 'Socket.IO olay süresi', LATENCY_BUCKETS)
+socket_sql_time = Histogram('socketio_event_sql_seconds', 'Olay başına SQL süresi', LATENCY_BUCKETS)
+socket_queries = Histogram('socketio_event_sql_queries', 'Olay başına sorgu sayısı', QUERY_COUNT_BUCKETS)
+
+slow_queries = deque(maxlen=200)
+
+
+def normalize_statement(statement):
+    """Literal'leri ve IN listelerini ? ile değiştirip boşlukları sadeleştirir"""
+    statement = _STRING_RE.sub('?', statement)
+    statement = _NUMBER_RE.sub('?', statement)
+    statement = _IN_LIST_RE.sub('(?...)', statement)
+    return _SPACE_RE.sub(' ', statement).strip()
+
+
+def _start_measurement(label):
+    g._metrics_label = label
+    g._metrics_started = time.perf_counter()
+    g._sql_count = 0
+    g._sql_time = 0.0
+    g._render_time = 0.0
+
+
+def _finish_measurement():
+    started = g.pop('_metrics_started', None)
+    if started is None:
+        return None
+    return time.perf_counter() - started, g.pop('_sql_count', 0), g.pop('_sql_time', 0.0)
+
+
+def track_socket_event(event_name):
+    """Socket.IO handler'ını ölçer; @socketio.on'un altına eklenir"""
+    def decorator(handler):
+        # Flask-SocketIO connect handler'ını önce auth ile çağırır, TypeError
+        # alırsa argümansız tekrarlar; handler'a yalnızca kabul ettiği kadar
+        # konumsal argüman iletilir, imza korunur
+        code = handler.__code__
+        accepts = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            if accepts is not None:
+                args = args[:accepts]
+            _start_measurement(event_name)
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                latency, count, sql_time = _finish_measurement()
+                socket_latency.observe(event_name, latency)
+                socket_sql_time.observe(event_name, sql_time)
+                socket_queries.observe(event_name, count)
+        return wrapper
+    return decorator
+
+
+def read_proc_status(field):
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def process_uptime():
+    """Süreç çalışma süresi (sn); /proc yoksa modülün yüklendiği andan itibaren"""
+    try:
+        with open('/proc/self/stat') as stat:
+            # comm alanı boşluk içerebilir; ')' sonrasından say
+            fields = stat.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as uptime:
+            system_uptime = float(uptime.read().split()[0])
+        return system_uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return time.time() - PROCESS_STARTED
+
+
+def system_stats(path='.'):
+    """Admin paneli için RSS (MB), disk doluluk yüzdesi ve çalışma süresi (sn)"""
+    rss_kb = read_proc_status('VmRSS') or 0
+    disk = shutil.disk_usage(path)
+    return {
+        'memory_usage': round(rss_kb / 1024, 1),
+        'disk_usage': round(disk.used / disk.total * 100, 1),
+        'uptime': int(process_uptime())
+    }
+
+
+def render_prometheus():
+    lines = []
+    for histogram in (request_latency, request_sql_time, request_queries, request_render_time):
+        lines.extend(histogram.render('endpoint'))
+    for histogram in (socket_latency, socket_sql_time, socket_queries):
+        lines.extend(histogram.render('event'))
+    rss_kb = read_proc_status('VmRSS')
+    if rss_kb is not None:
+        lines += ['# TYPE process_resident_memory_bytes gauge',
+                  f'process_resident_memory_bytes {rss_kb * 1024}']
+    lines += ['# TYPE process_uptime_seconds gauge', f'process_uptime_seconds {process_uptime():.0f}']
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app, db):
+    app.config.setdefault('SLOW_QUERY_THRESHOLD', 0.1)  # sn
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_started'].pop()
+        source = None
+        if has_app_context() and '_sql_count' in g:
+            g._sql_count += 1
+            g._sql_time += duration
+            source = g.get('_metrics_label')
+        if duration >= app.config['SLOW_QUERY_THRESHOLD']:
+            slow_queries.append({
+                'timestamp': datetime.utcnow().isoformat(),
+                'duration_ms': round(duration * 1000, 2),
+                'source': source,
+                'statement': normalize_statement(statement)
+            })
+
+    def handle_error(exception_context):
+        # Hata veren sorgunun başlangıç zamanı sonraki sorguya kalmasın
+        if exception_context.connection is not None:
+            exception_context.connection.info.pop('query_started', None)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+            event.listen(engine, 'handle_error', handle_error)
+
+    # İç içe render_template çağrılarında yalnızca en dıştaki ölçülür
+    def start_render(sender, template, context, **extra):
+        if has_app_context() and '_render_time' in g:
+            g._render_depth = g.get('_render_depth', 0) + 1
+            if g._render_depth == 1:
+                g._render_started = time.perf_counter()
+
+    def finish_render(sender, template, context, **extra):
+        if has_app_context() and '_render_depth' in g:
+            g._render_depth -= 1
+            if g._render_depth == 0:
+                g._render_time += time.perf_counter() - g._render_started
+
+    before_render_template.connect(start_render, app, weak=False)
+    template_rendered.connect(finish_render, app, weak=False)
+
+    @app.before_request
+    def start_request_measurement():
+        _start_measurement(request.endpoint or 'unmatched')
+
+    @app.after_request
+    def record_request_metrics(response):
+        measured = _finish_measurement()
+        if measured:
+            latency, count, sql_time = measured
+            endpoint = g.pop('_metrics_label')
+            request_latency.observe(endpoint, latency)
+            request_sql_time.observe(endpoint, sql_time)
+            request_queries.observe(endpoint, count)
+            request_render_time.observe(endpoint, g.pop('_render_time', 0.0))
+        return response
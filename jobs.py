@@ -0,0 +1,264 @@
+"""SQLite'ta kalıcı, süreç içi arka plan iş kuyruğu.
+
+İstek handler'ları yan etkileri (bildirim kaydı, puan/başarım, Socket.IO
+bildirimi) doğrudan çalıştırmak yerine `enqueue` ile `job` tablosuna yazar.
+Kayıt isteğin kendi transaction'ına eklenir: istek geri alınırsa iş de
+oluşmaz, commit edilirse süreç çökse bile kaybolmaz. Commit sonrası
+worker'lar uyandırılır.
+
+Worker thread'leri sıradaki hazır işi tek bir `UPDATE ... RETURNING` ile alır
+ve JOBS_LEASE süresince kiralar; kirası dolan işler (çöken süreç) yeniden
+alınır. İşin veritabanı yazmaları ile `done` işareti aynı transaction'da
+commit edilir; Socket.IO yayınları gibi dış etkiler `after_commit` ile
+commit'ten sonra çalışır. Hata veren işler üstel geri çekilme ile tekrar
+denenir, max_attempts'a ulaşınca `failed` olarak kalır.
+
+Her iş tipinin süreç başına eşzamanlılık sınırı vardır; örneğin puan işleri
+her süreçte tek tek çalışır. Sınır süreçler arası değildir: aynı satırı
+güncelleyen işler (puan, sayaçlar) `col = col + n` biçiminde atomik UPDATE
+kullanır. İdempotency anahtarı verilen bir iş aynı anahtarla ikinci kez
+eklenmez; tamamlanan işler anahtarlarıyla birlikte saklama süresi boyunca
+(retention.py) tutulur, başarısız işler elle yeniden denenene kadar silinmez.
+Kuyruk derinliği ve gecikmesi /metrics'te ve `flask jobs` ile görülür.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import event, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import RoutingSession
+from instrumentation import LATENCY_BUCKETS, Histogram
+from models import db, Job
+
+JobType = namedtuple('JobType', 'name handler concurrency max_attempts')
+
+job_types = {}
+job_duration = Histogram('job_duration_seconds', 'Arka plan işi süresi', LATENCY_BUCKETS)
+
+
+def job(name, concurrency=1, max_attempts=5):
+    """İş tipini kaydeder; handler payload alanlarını anahtar kelime argümanı olarak alır"""
+    def decorator(handler):
+        job_types[name] = JobType(name, handler, concurrency, max_attempts)
+        return handler
+    return decorator
+
+
+def enqueue(job_type, payload, key=None, delay=0):
+    """İşi açık transaction'a ekler; commit ile kalıcı olur ve worker'lar uyanır"""
+    now = datetime.utcnow()
+    statement = sqlite_insert(Job).values(
+        job_type=job_type,
+        payload=json.dumps(payload, ensure_ascii=False, default=str),
+        idempotency_key=key,
+        status='queued',
+        attempts=0,
+        max_attempts=job_types[job_type].max_attempts,
+        run_at=now + timedelta(seconds=delay),
+        created_at=now,
+    )
+    if key is not None:
+        statement = statement.on_conflict_do_nothing(index_elements=['idempotency_key'])
+    db.session.execute(statement)
+    db.session.info['jobs_enqueued'] = True
+
+
+def after_commit(callback):
+    """Açık transaction commit edildikten sonra çağrılır; geri alınırsa atılır"""
+    db.session.info.setdefault('commit_callbacks', []).append(callback)
+
+
+class JobQueue:
+    def __init__(self):
+        self.app = None
+        self.running = Counter()  # tip -> bu süreçte çalışan iş sayısı
+        self.processed = Counter()  # (tip, sonuç) -> adet
+        self.workers = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def claim(self):
+        """Hazır en eski işi kiralar; eşzamanlılık sınırı dolu tipler atlanır"""
+        with self._lock:
+            allowed = [name for name, spec in job_types.items() if self.running[name] < spec.concurrency]
+            if not allowed:
+                return None
+            now = datetime.utcnow()
+            next_id = (select(Job.id)
+                       .where(Job.status.in_(('queued', 'running')),  # running: kirası dolmuş
+                              Job.job_type.in_(allowed), Job.run_at <= now)
+                       .order_by(Job.run_at, Job.id)
+                       .limit(1)
+                       .scalar_subquery())
+            row = db.session.execute(
+                update(Job).where(Job.id == next_id)
+                .values(status='running', attempts=Job.attempts + 1,
+                        run_at=now + timedelta(seconds=self.app.config['JOBS_LEASE']))
+                .returning(Job.id, Job.job_type, Job.payload, Job.attempts, Job.max_attempts),
+                execution_options={'synchronize_session': False}
+            ).first()
+            db.session.commit()
+            if row is not None:
+                self.running[row.job_type] += 1
+            return row
+
+    def run(self, row):
+        started = time.perf_counter()
+        try:
+            job_types[row.job_type].handler(**json.loads(row.payload))
+            db.session.execute(update(Job).where(Job.id == row.id).values(
+                status='done', finished_at=datetime.utcnow(), last_error=None))
+            db.session.commit()
+            outcome = 'done'
+        except Exception as error:
+            db.session.rollback()
+            outcome = self.retry_or_fail(row, error)
+        finally:
+            with self._lock:
+                self.running[row.job_type] -= 1
+            job_duration.observe(row.job_type, time.perf_counter() - started)
+        self.processed[(row.job_type, outcome)] += 1
+        return outcome
+
+    def retry_or_fail(self, row, error):
+        config = self.app.config
+        now = datetime.utcnow()
+        values = {'last_error': f'{type(error).__name__}: {error}'[:1000]}
+        if row.attempts >= row.max_attempts:
+            values.update(status='failed', finished_at=now)
+            self.app.logger.warning(f'İş başarısız: {row.job_type} #{row.id}: {values["last_error"]}')
+        else:
+            # Üstel geri çekilme + jitter: aynı anda düşen işler aynı anda dönmesin
+            backoff = min(config['JOBS_BACKOFF_MAX'], config['JOBS_BACKOFF_BASE'] * 2 ** (row.attempts - 1))
+            values.update(status='queued', run_at=now + timedelta(seconds=backoff * random.uniform(0.5, 1.0)))
+        db.session.execute(update(Job).where(Job.id == row.id).values(values))
+        db.session.commit()
+        return 'failed' if values['status'] == 'failed' else 'retry'
+
+    def run_pending(self):
+        """Hazır işleri bu thread'de bitene kadar çalıştırır; çalıştırılan sayıyı döner"""
+        count = 0
+        while (row := self.claim()) is not None:
+            self.run(row)
+            count += 1
+        return count
+
+    def _work(self):
+        poll = self.app.config['JOBS_POLL_INTERVAL']
+        while True:
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    row = self.claim()
+                    if row is not None:
+                        self.run(row)
+                        continue
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('İş kuyruğu hatası')
+                finally:
+                    db.session.remove()
+            self._wakeup.wait(poll)
+
+    def start(self, app):
+        self.app = app
+        for number in range(app.config['JOBS_WORKERS']):
+            thread = threading.Thread(target=self._work, name=f'job-worker-{number}', daemon=True)
+            thread.start()
+            self.workers.append(thread)
+
+
+job_queue = JobQueue()
+
+
+def queue_stats(now=None):
+    """Tip ve durum başına derinlik; hazır bekleyen en eski işin gecikmesi (sn)"""
+    now = now or datetime.utcnow()
+    rows = db.session.execute(
+        select(Job.job_type, Job.status, func.count(), func.min(Job.run_at))
+        .where(Job.status.in_(('queued', 'running', 'failed')))
+        .group_by(Job.status, Job.job_type)
+    ).all()
+    stats = {}
+    for job_type, status, count, oldest in rows:
+        entry = stats.setdefault(job_type, {'queued': 0, 'running': 0, 'failed': 0, 'lag': 0.0})
+        entry[status] = count
+        if status == 'queued':
+            entry['lag'] = max(0.0, (now - oldest).total_seconds())
+    return stats
+
+
+def render_prometheus():
+    stats = queue_stats()
+    lines = ['# TYPE jobs_queue_depth gauge']
+    for job_type, entry in sorted(stats.items()):
+        for status in ('queued', 'running', 'failed'):
+            lines.append(f'jobs_queue_depth{{job_type="{job_type}",status="{status}"}} {entry[status]}')
+    lines.append('# TYPE jobs_queue_lag_seconds gauge')
+    for job_type, entry in sorted(stats.items()):
+        lines.append(f'jobs_queue_lag_seconds{{job_type="{job_type}"}} {entry["lag"]:.3f}')
+    lines.append('# TYPE jobs_processed_total counter')
+    for (job_type, outcome), count in sorted(job_queue.processed.items()):
+        lines.append(f'jobs_processed_total{{job_type="{job_type}",outcome="{outcome}"}} {count}')
+    lines.extend(job_duration.render('job_type'))
+    return '\n'.join(lines) + '\n'
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def run_commit_callbacks(session):
+    if session.info.pop('jobs_enqueued', None):
+        job_queue.wake()
+    for callback in session.info.pop('commit_callbacks', ()):
+        try:
+            callback()
+        except Exception:
+            # Transaction zaten commit edildi; iş tekrar çalıştırılmamalı
+            current_app.logger.exception('Commit sonrası çağrı başarısız')
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_enqueued(session):
+    session.info.pop('jobs_enqueued', None)
+    session.info.pop('commit_callbacks', None)
+
+
+def init_app(app):
+    app.config.setdefault('JOBS_WORKERS', 2)  # 0: yalnızca `flask jobs --run`
+    app.config.setdefault('JOBS_POLL_INTERVAL', 1.0)  # sn; uyandırma kaçarsa en geç bu kadar
+    app.config.setdefault('JOBS_LEASE', 300)  # sn; bu süreyi aşan iş yeniden alınır
+    app.config.setdefault('JOBS_BACKOFF_BASE', 2.0)  # sn
+    app.config.setdefault('JOBS_BACKOFF_MAX', 600)  # sn
+    job_queue.app = app
+    started = threading.Lock()
+
+    @app.before_request
+    def start_workers_once():
+        if app.config['JOBS_WORKERS'] and started.acquire(blocking=False):
+            job_queue.start(app)
+
+    @app.cli.command('jobs')
+    @click.option('--run', 'run_now', is_flag=True, help='Hazır işleri bu süreçte çalıştır')
+    @click.option('--retry-failed', is_flag=True, help='Başarısız işleri yeniden kuyruğa al')
+    def jobs_command(run_now, retry_failed):
+        """İş kuyruğu derinliği ve gecikmesi; isteğe bağlı çalıştırma/yeniden deneme."""
+        if retry_failed:
+            requeued = db.session.execute(update(Job).where(Job.status == 'failed').values(
+                status='queued', attempts=0, run_at=datetime.utcnow(), finished_at=None)).rowcount
+            db.session.commit()
+            click.echo(f'{requeued} iş yeniden kuyruğa alındı')
+        if run_now:
+            click.echo(f'{job_queue.run_pending()} iş çalıştırıldı')
+        click.echo(f'{"tip":<20}{"queued":>8}{"running":>9}{"failed":>8}{"lag (sn)":>10}')
+        for job_type, entry in sorted(queue_stats().items()):
+            click.echo(f'{job_type:<20}{entry["queued"]:>8}{entry["running"]:>9}'
+                       f'{entry["failed"]:>8}{entry["lag"]:>10.1f}')
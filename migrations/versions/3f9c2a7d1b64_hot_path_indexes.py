@@ -0,0 +1,51 @@
+"""hot path indexes
+
+Revision ID: 3f9c2a7d1b64
+Revises: 24d8b1a99c6d
+Create Date: 2026-10-19 10:12:44.201733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1b64'
+down_revision = '24d8b1a99c6d'
+branch_labels = None
+depends_on = None
+
+
+# (index adı, tablo, kolonlar) - models.py içindeki tanımlarla birebir aynı
+INDEXES = [
+    ('ix_likes_post_id_user_id', 'likes', ['post_id', 'user_id']),
+    ('ix_likes_user_id_post_id', 'likes', ['user_id', 'post_id']),
+    ('ix_followers_follower_id_followed_id', 'followers', ['follower_id', 'followed_id']),
+    ('ix_followers_followed_id_follower_id', 'followers', ['followed_id', 'follower_id']),
+    ('ix_user_conversations_user_id_conversation_id', 'user_conversations', ['user_id', 'conversation_id']),
+    ('ix_user_conversations_conversation_id_user_id', 'user_conversations', ['conversation_id', 'user_id']),
+    ('ix_notification_user_id_is_read', 'notification', ['user_id', 'is_read']),
+    ('ix_notification_user_id_timestamp', 'notification', ['user_id', 'timestamp']),
+    ('ix_message_conversation_id_timestamp', 'message', ['conversation_id', 'timestamp']),
+    ('ix_user_achievement_user_id_achievement_id', 'user_achievement', ['user_id', 'achievement_id']),
+    ('ix_post_user_id_timestamp', 'post', ['user_id', 'timestamp']),
+    ('ix_post_timestamp', 'post', ['timestamp']),
+    ('ix_comment_post_id_timestamp', 'comment', ['post_id', 'timestamp']),
+    ('ix_comment_user_id', 'comment', ['user_id']),
+    ('ix_comment_timestamp', 'comment', ['timestamp']),
+    ('ix_user_points', 'user', ['points']),
+    ('ix_user_last_activity', 'user', ['last_activity']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+    # Planlayıcının yeni index'ler için istatistik toplaması
+    op.execute(sa.text('ANALYZE'))
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,38 @@
+"""user counters
+
+Revision ID: 8b41e0c7d2a9
+Revises: 3f9c2a7d1b64
+Create Date: 2026-10-19 11:40:02.518094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41e0c7d2a9'
+down_revision = '3f9c2a7d1b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('follower_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('followed_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('post_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Mevcut veriden sayaçları doldur
+    op.execute(sa.text(
+        'UPDATE "user" SET '
+        'follower_count = (SELECT count(*) FROM followers WHERE followers.followed_id = "user".id), '
+        'followed_count = (SELECT count(*) FROM followers WHERE followers.follower_id = "user".id), '
+        'post_count = (SELECT count(*) FROM post WHERE post.user_id = "user".id)'
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('post_count')
+        batch_op.drop_column('followed_count')
+        batch_op.drop_column('follower_count')
@@ -0,0 +1,26 @@
+"""notification type index
+
+Revision ID: a4c8e2f17b35
+Revises: f3b6a2c84d17
+Create Date: 2026-10-19 18:21:07.530914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c8e2f17b35'
+down_revision = 'f3b6a2c84d17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tipe göre filtrelenmiş bildirim sayfaları için (user_id, tip, zaman, rowid)
+    op.create_index('ix_notification_user_id_type_timestamp', 'notification',
+                    ['user_id', 'notification_type', 'timestamp'])
+
+
+def downgrade():
+    op.drop_index('ix_notification_user_id_type_timestamp', table_name='notification')
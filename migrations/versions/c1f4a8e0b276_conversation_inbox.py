@@ -0,0 +1,38 @@
+"""conversation inbox
+
+Revision ID: c1f4a8e0b276
+Revises: b9e3d5f28c41
+Create Date: 2026-10-19 21:12:37.904415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1f4a8e0b276'
+down_revision = 'b9e3d5f28c41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_message_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_message_conversation_id_is_read', 'message', ['conversation_id', 'is_read'])
+
+    # Mevcut mesajlardan son mesaj ve etkinlik zamanını doldur
+    op.execute(sa.text(
+        'UPDATE conversation SET '
+        'last_message_id = (SELECT max(id) FROM message WHERE message.conversation_id = conversation.id), '
+        'last_activity_at = coalesce((SELECT max(timestamp) FROM message '
+        'WHERE message.conversation_id = conversation.id), created_at)'
+    ))
+
+
+def downgrade():
+    op.drop_index('ix_message_conversation_id_is_read', table_name='message')
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_column('last_activity_at')
+        batch_op.drop_column('last_message_id')
@@ -0,0 +1,50 @@
+"""user stats snapshot
+
+Revision ID: c5d7a3e91f02
+Revises: 8b41e0c7d2a9
+Create Date: 2026-10-19 13:05:27.664310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d7a3e91f02'
+down_revision = '8b41e0c7d2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('posts_count', sa.Integer(), nullable=False),
+        sa.Column('followers_count', sa.Integer(), nullable=False),
+        sa.Column('following_count', sa.Integer(), nullable=False),
+        sa.Column('likes_received', sa.Integer(), nullable=False),
+        sa.Column('comments_received', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('level', sa.Integer(), nullable=False),
+        sa.Column('achievements_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Mevcut kullanıcılar için özetleri doldur
+    op.execute(sa.text(
+        'INSERT INTO user_stats (user_id, posts_count, followers_count, following_count, '
+        'likes_received, comments_received, points, level, achievements_count, updated_at) '
+        'SELECT "user".id, "user".post_count, "user".follower_count, "user".followed_count, '
+        '(SELECT coalesce(sum(post.like_count), 0) FROM post WHERE post.user_id = "user".id), '
+        '(SELECT coalesce(sum(post.comment_count), 0) FROM post WHERE post.user_id = "user".id), '
+        'coalesce("user".points, 0), coalesce("user".level, 1), '
+        '(SELECT count(*) FROM user_achievement WHERE user_achievement.user_id = "user".id), '
+        'CURRENT_TIMESTAMP FROM "user"'
+    ))
+
+
+def downgrade():
+    op.drop_table('user_stats')
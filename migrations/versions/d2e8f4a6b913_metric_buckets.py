@@ -0,0 +1,39 @@
+"""metric buckets
+
+Revision ID: d2e8f4a6b913
+Revises: c5d7a3e91f02
+Create Date: 2026-10-19 14:22:51.907335
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2e8f4a6b913'
+down_revision = 'c5d7a3e91f02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'metric_bucket',
+        sa.Column('metric', sa.String(length=32), nullable=False),
+        sa.Column('granularity', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('metric', 'granularity', 'bucket_start')
+    )
+
+    # Toplam kovalarını mevcut verilerle başlat
+    for metric, table in [('signups', '"user"'), ('posts', 'post'), ('comments', 'comment'),
+                          ('likes', 'likes'), ('messages', 'message')]:
+        op.execute(sa.text(
+            f"INSERT INTO metric_bucket (metric, granularity, bucket_start, value) "
+            f"SELECT '{metric}', 'total', '1970-01-01 00:00:00.000000', count(*) FROM {table}"
+        ))
+
+
+def downgrade():
+    op.drop_table('metric_bucket')
@@ -0,0 +1,26 @@
+"""user identity version
+
+Revision ID: e7a1c9d35b80
+Revises: d2e8f4a6b913
+Create Date: 2026-10-19 15:48:13.310587
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a1c9d35b80'
+down_revision = 'd2e8f4a6b913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('identity_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('identity_version')
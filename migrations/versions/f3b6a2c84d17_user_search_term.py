@@ -0,0 +1,35 @@
+"""user search term
+
+Revision ID: f3b6a2c84d17
+Revises: e7a1c9d35b80
+Create Date: 2026-10-19 17:02:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b6a2c84d17'
+down_revision = 'e7a1c9d35b80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_search_term',
+        sa.Column('term', sa.String(length=200), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('term', 'user_id'),
+        sqlite_with_rowid=False
+    )
+    op.create_index('ix_user_search_term_user_id_term', 'user_search_term', ['user_id', 'term'])
+    # Terimler Python'da normalize edildiği için mevcut kullanıcılar
+    # `flask rebuild-search-index` ile doldurulur
+
+
+def downgrade():
+    op.drop_index('ix_user_search_term_user_id_term', table_name='user_search_term')
+    op.drop_table('user_search_term')
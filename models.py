@@ -3,31 +3,64 @@ from datetime import datetime
 from flask_login import UserMixin
 import re
 
+from database import RoutingSession
+
 # db'yi burada oluşturuyoruz
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Beğeniler için ilişki
 likes = db.Table(
     'likes',
     db.Column('post_id', db.Integer, db.ForeignKey('post.id')),
-    db.Column('user_id', db.Integer, db.ForeignKey('user.id'))
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id')),
+    db.Index('ix_likes_post_id_user_id', 'post_id', 'user_id'),
+    db.Index('ix_likes_user_id_post_id', 'user_id', 'post_id')
 )
 
 # Takipçi ilişkisi
 followers = db.Table(
     'followers',
     db.Column('follower_id', db.Integer, db.ForeignKey('user.id')),
-    db.Column('followed_id', db.Integer, db.ForeignKey('user.id'))
+    db.Column('followed_id', db.Integer, db.ForeignKey('user.id')),
+    db.Index('ix_followers_follower_id_followed_id', 'follower_id', 'followed_id'),
+    db.Index('ix_followers_followed_id_follower_id', 'followed_id', 'follower_id')
 )
 
 # Mesajlaşma için ilişki
 user_conversations = db.Table(
     'user_conversations',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id')),
-    db.Column('conversation_id', db.Integer, db.ForeignKey('conversation.id'))
+    db.Column('conversation_id', db.Integer, db.ForeignKey('conversation.id')),
+    db.Index('ix_user_conversations_user_id_conversation_id', 'user_id', 'conversation_id'),
+    db.Index('ix_user_conversations_conversation_id_user_id', 'conversation_id', 'user_id')
 )
 
+def mark_stats_dirty(*user_ids):
+    """user_stats özetinin commit öncesi yenilenmesi için kullanıcıları işaretler (stats.py)"""
+    db.session.info.setdefault('stats_dirty', set()).update(user_ids)
+
+
+def mark_follow_changed(follower_id, followed_id, delta):
+    """Commit sonrası bellek içi takip grafiğine işlenecek kenar değişikliği (follow_graph.py)"""
+    db.session.info.setdefault('follow_changes', []).append((follower_id, followed_id, delta))
+
+
+def mark_identity_dirty(*user_ids):
+    """Commit sonrası kimlik önbelleğinden düşürülecek kullanıcıları işaretler (identity.py)"""
+    db.session.info.setdefault('identity_dirty', set()).update(user_ids)
+
+
+NOTIFICATION_TYPES = ('like', 'comment', 'message', 'follow', 'level_up', 'achievement')
+
+
 class Notification(db.Model):
+    __table_args__ = (
+        db.Index('ix_notification_user_id_is_read', 'user_id', 'is_read'),
+        # SQLite her indeksin sonuna rowid'i (id) ekler: (user_id, timestamp, id) keyset
+        db.Index('ix_notification_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_notification_user_id_type_timestamp', 'user_id', 'notification_type', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     message = db.Column(db.Text, nullable=False)
@@ -44,6 +77,9 @@ class Conversation(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_group = db.Column(db.Boolean, default=False)
     group_name = db.Column(db.String(100))
+    # Gelen kutusu için denormalize alanlar; mesaj gönderilirken güncellenir
+    last_message_id = db.Column(db.Integer)  # arşivlenmiş olabilir (retention.py)
+    last_activity_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     participants = db.relationship(
         'User', secondary=user_conversations,
@@ -51,8 +87,28 @@ class Conversation(db.Model):
     )
     messages = db.relationship('Message', backref='conversation', lazy=True)
 
+    def ordered_messages(self):
+        return Message.query.filter_by(
+            conversation_id=self.id
+        ).order_by(Message.timestamp.asc())
+
+    def record_message(self, message):
+        """Son mesaj alanlarını ilerletir (flush sonrası); daha eski bir mesajla geri gitmez"""
+        db.session.execute(
+            db.update(Conversation)
+            .where(Conversation.id == self.id,
+                   db.or_(Conversation.last_message_id == None, Conversation.last_message_id < message.id))
+            .values(last_message_id=message.id, last_activity_at=message.timestamp),
+            execution_options={'synchronize_session': False}
+        )
+
 
 class Message(db.Model):
+    __table_args__ = (
+        db.Index('ix_message_conversation_id_timestamp', 'conversation_id', 'timestamp'),
+        db.Index('ix_message_conversation_id_is_read', 'conversation_id', 'is_read'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     conversation_id = db.Column(db.Integer, db.ForeignKey('conversation.id'), nullable=False)
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -64,6 +120,10 @@ class Message(db.Model):
 
 
 class UserAchievement(db.Model):
+    __table_args__ = (
+        db.Index('ix_user_achievement_user_id_achievement_id', 'user_id', 'achievement_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     achievement_id = db.Column(db.Integer, db.ForeignKey('achievement.id'), nullable=False)
@@ -79,7 +139,82 @@ class Achievement(db.Model):
     condition = db.Column(db.String(100))  # Örn: "posts_count >= 10"
 
 
+class UserStats(db.Model):
+    """Dashboard için kullanıcı başına önceden hesaplanmış istatistikler"""
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    posts_count = db.Column(db.Integer, default=0, nullable=False)
+    followers_count = db.Column(db.Integer, default=0, nullable=False)
+    following_count = db.Column(db.Integer, default=0, nullable=False)
+    likes_received = db.Column(db.Integer, default=0, nullable=False)
+    comments_received = db.Column(db.Integer, default=0, nullable=False)
+    points = db.Column(db.Integer, default=0, nullable=False)
+    level = db.Column(db.Integer, default=1, nullable=False)
+    achievements_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'posts_count': self.posts_count,
+            'followers_count': self.followers_count,
+            'following_count': self.following_count,
+            'likes_received': self.likes_received,
+            'comments_received': self.comments_received,
+            'points': self.points,
+            'level': self.level,
+            'achievements_count': self.achievements_count
+        }
+
+
+class MetricBucket(db.Model):
+    """Dakika/saat/gün kovalarında olay sayaçları (rollups.py)"""
+    __tablename__ = 'metric_bucket'
+
+    metric = db.Column(db.String(32), primary_key=True)       # signups, posts, comments, likes, messages, active_users
+    granularity = db.Column(db.String(8), primary_key=True)   # minute, hour, day, total
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    value = db.Column(db.Integer, default=0, nullable=False)
+
+
+class UserSearchTerm(db.Model):
+    """Kullanıcı adı ve isimlerin normalize edilmiş önek arama terimleri (user_search.py)"""
+    __tablename__ = 'user_search_term'
+    __table_args__ = (
+        db.Index('ix_user_search_term_user_id_term', 'user_id', 'term'),
+        {'sqlite_with_rowid': False},
+    )
+
+    term = db.Column(db.String(200), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+
+
+class Job(db.Model):
+    """Kalıcı arka plan işi (jobs.py)"""
+    __table_args__ = (
+        # Sıradaki işi alma, tip başına derinlik ve gecikme sorguları
+        db.Index('ix_job_status_job_type_run_at', 'status', 'job_type', 'run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(32), nullable=False)
+    payload = db.Column(db.Text, nullable=False)                      # JSON
+    idempotency_key = db.Column(db.String(128), unique=True)          # aynı anahtarla ikinci iş eklenmez
+    status = db.Column(db.String(16), default='queued', nullable=False)  # queued, running, done, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=5, nullable=False)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # running iken kira bitişi
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+
 class Post(db.Model):
+    __table_args__ = (
+        db.Index('ix_post_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_post_timestamp', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     body = db.Column(db.Text, nullable=False)
     hashtags = db.Column(db.Text)  # Hashtag alanı
@@ -96,12 +231,13 @@ class Post(db.Model):
         if not self.is_liked_by(user):
             self.liked_by.append(user)
             self.like_count = len(self.liked_by)
-            user.check_achievements()
+            mark_stats_dirty(self.user_id)
 
     def unlike(self, user):
         if self.is_liked_by(user):
             self.liked_by.remove(user)
             self.like_count = len(self.liked_by)
+            mark_stats_dirty(self.user_id)
 
     def is_liked_by(self, user):
         if user.is_authenticated:
@@ -117,6 +253,12 @@ class Post(db.Model):
 
 
 class Comment(db.Model):
+    __table_args__ = (
+        db.Index('ix_comment_post_id_timestamp', 'post_id', 'timestamp'),
+        db.Index('ix_comment_user_id', 'user_id'),
+        db.Index('ix_comment_timestamp', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     body = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
@@ -128,6 +270,11 @@ class Comment(db.Model):
 
 
 class User(UserMixin, db.Model):
+    __table_args__ = (
+        db.Index('ix_user_points', 'points'),
+        db.Index('ix_user_last_activity', 'last_activity'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False)
     password = db.Column(db.String(128), nullable=False)
@@ -146,6 +293,14 @@ class User(UserMixin, db.Model):
     experience = db.Column(db.Integer, default=0)
     last_activity = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Sayaçlar: takip ve gönderi işlemleriyle aynı transaction'da güncellenir
+    follower_count = db.Column(db.Integer, default=0, nullable=False)
+    followed_count = db.Column(db.Integer, default=0, nullable=False)
+    post_count = db.Column(db.Integer, default=0, nullable=False)
+
+    # Kimlik önbelleği sürümü: profil/şifre/puan değişikliklerinde artar
+    identity_version = db.Column(db.Integer, default=0, nullable=False)
+
     # Güvenlik alanları
     is_verified = db.Column(db.Boolean, default=False)
     two_factor_enabled = db.Column(db.Boolean, default=False)
@@ -162,48 +317,70 @@ class User(UserMixin, db.Model):
         lazy='dynamic'
     )
 
-    def followed_posts(self):
-        return Post.query.join(
-            followers, (followers.c.followed_id == Post.user_id)
-        ).filter(followers.c.follower_id == self.id).order_by(Post.timestamp.desc())
+    @property
+    def orm(self):
+        # identity.CachedUser ile aynı arayüz: ORM nesnesi gereken yerlerde current_user.orm
+        return self
 
     def follow(self, user):
         if not self.is_following(user):
             self.followed.append(user)
-            self.check_achievements()
+            self.increment_counters(followed_count=1)
+            user.increment_counters(follower_count=1)
+            mark_follow_changed(self.id, user.id, 1)
 
     def unfollow(self, user):
         if self.is_following(user):
             self.followed.remove(user)
+            self.increment_counters(followed_count=-1)
+            user.increment_counters(follower_count=-1)
+            mark_follow_changed(self.id, user.id, -1)
 
     def is_following(self, user):
-        return self.followed.filter(followers.c.followed_id == user.id).count() > 0
+        """Veritabanından kesin kontrol (yazma yolu); okumalar follow_graph'ı kullanır"""
+        return db.session.query(self.followed.filter(followers.c.followed_id == user.id).exists()).scalar()
+
+    def increment_counters(self, **deltas):
+        """Sayaç kolonlarını SQL tarafında (col = col + n) günceller"""
+        values = {getattr(User, name): getattr(User, name) + delta for name, delta in deltas.items()}
+        values[User.identity_version] = User.identity_version + 1
+        db.session.execute(db.update(User).where(User.id == self.id).values(values))
+        mark_stats_dirty(self.id)
+        mark_identity_dirty(self.id)
 
     def followers_count(self):
-        return self.followers_rel.count()
+        return self.follower_count or 0
 
     def following_count(self):
-        return self.followed.count()
+        return self.followed_count or 0
 
     def posts_count(self):
-        return self.posts.count()
+        return self.post_count or 0
 
     def add_points(self, amount):
-        """Kullanıcıya puan ekler ve seviye kontrolü yapar"""
-        self.points += amount
-        self.experience += amount
+        """Puan ve deneyimi SQL tarafında artırır, seviye kontrolü yapar; commit çağırana aittir.
+
+        Farklı süreçlerde aynı kullanıcı için çalışan işler birbirinin artışını ezmez.
+        """
+        self.increment_counters(points=amount, experience=amount)
         self.check_level_up()
-        db.session.commit()
 
     def check_level_up(self):
-        """Seviye atlama kontrolü"""
-        exp_needed = self.level * 100
-        if self.experience >= exp_needed:
-            self.level += 1
-            self.experience -= exp_needed
+        """Seviye atlama kontrolü; koşul ve güncelleme tek UPDATE'te"""
+        level = db.session.execute(
+            db.update(User).where(
+                User.id == self.id,
+                User.experience >= User.level * 100
+            ).values(
+                level=User.level + 1,
+                experience=User.experience - User.level * 100,
+                identity_version=User.identity_version + 1
+            ).returning(User.level)
+        ).scalar()
+        if level is not None:
             notification = Notification(
                 user_id=self.id,
-                message=f'Tebrikler! Seviye atladınız: {self.level}',
+                message=f'Tebrikler! Seviye atladınız: {level}',
                 notification_type='level_up'
             )
             db.session.add(notification)
@@ -265,9 +442,44 @@ class User(UserMixin, db.Model):
             user_id=self.id
         ).order_by(Notification.timestamp.desc()).limit(limit).all()
 
+    def mark_notifications_read(self, up_to_id=None, ids=None):
+        """Tek UPDATE ile okundu işaretler: up_to_id'ye kadar hepsi ya da verilen id'ler"""
+        conditions = [Notification.user_id == self.id, Notification.is_read == False]
+        if up_to_id is not None:
+            conditions.append(Notification.id <= up_to_id)
+        if ids is not None:
+            conditions.append(Notification.id.in_(ids))
+        result = db.session.execute(db.update(Notification).where(*conditions).values(is_read=True),
+                                    execution_options={'synchronize_session': False})
+        return result.rowcount
+
+    def get_recent_messages(self, limit=5):
+        return Message.query.join(
+            user_conversations, user_conversations.c.conversation_id == Message.conversation_id
+        ).filter(
+            user_conversations.c.user_id == self.id
+        ).order_by(Message.timestamp.desc()).limit(limit).all()
+
+    def get_direct_conversation(self, other):
+        """İki kullanıcı arasındaki birebir konuşmayı bulur"""
+        own = user_conversations.alias('own')
+        theirs = user_conversations.alias('theirs')
+        return Conversation.query.join(
+            own, own.c.conversation_id == Conversation.id
+        ).join(
+            theirs, theirs.c.conversation_id == Conversation.id
+        ).filter(
+            own.c.user_id == self.id,
+            theirs.c.user_id == other.id,
+            Conversation.is_group == False
+        ).first()
+
     def get_unread_messages_count(self):
-        return Message.query.filter(
-            Message.conversation.has(Conversation.participants.any(id=self.id)),
+        # İlişki üzerinden EXISTS yerine ara tablo ile join: index kullanılsın
+        return Message.query.join(
+            user_conversations, user_conversations.c.conversation_id == Message.conversation_id
+        ).filter(
+            user_conversations.c.user_id == self.id,
             Message.sender_id != self.id,
             Message.is_read == False
         ).count()
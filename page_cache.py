@@ -0,0 +1,198 @@
+"""Anonim ziyaretçiler için tam sayfa yanıt önbelleği ve koşullu GET.
+
+`@cached_page` ile işaretlenen GET route'ları giriş yapmamış ziyaretçiler
+için bir kez render edilir; gövde baytları yol + sorgu + vary başlıkları
+anahtarıyla TTL süresince süreç içinde tutulur. Her yanıt gövdenin
+özetinden üretilen güçlü bir ETag taşır; `If-None-Match` eşleşirse gövde
+gönderilmeden 304 döner.
+
+Sayfalar etiketlerle (ör. 'index', 'leaderboard') kaydedilir. Commit edilen
+ORM değişiklikleri tablo/kolon bazında `TAG_RULES` ile eşleştirilir ve
+etkilenen etiketin tüm sayfaları düşürülür. Diğer süreçlerdeki kopyalar en
+geç TTL sonunda yenilenir.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event, inspect
+
+import compression
+from database import RoutingSession
+
+ROWS = 'rows'
+
+# etiket -> {tablo: ROWS (satır ekleme/silme) ya da değişimi önemli kolonlar}
+TAG_RULES = {
+    'index': {'user': ROWS, 'post': ROWS, 'comment': ROWS},
+    'leaderboard': {'user': {'username', 'points', 'level'}, 'user_achievement': ROWS},
+}
+TRACKED_TABLES = {table for rules in TAG_RULES.values() for table in rules}
+
+
+class PageCache:
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # anahtar -> (etag, gövde, mimetype, bitiş, etiketler)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, body, mimetype, ttl, tags):
+        etag = hashlib.sha1(body).hexdigest()
+        entry = (etag, body, mimetype, time.monotonic() + ttl, frozenset(tags))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *tags):
+        tags = set(tags)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[4] & tags]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+page_cache = PageCache()
+
+
+def _cache_key(vary):
+    return (request.full_path,) + tuple(request.headers.get(name, '') for name in vary)
+
+
+def _cacheable_request():
+    return (request.method in ('GET', 'HEAD')
+            and current_app.config['PAGE_CACHE_ENABLED']
+            and not current_user.is_authenticated
+            and not session.get('_flashes'))
+
+
+def _respond(entry, vary):
+    etag, body, mimetype = entry[:3]
+    response = make_response(body)
+    response.mimetype = mimetype
+    response.set_etag(etag)
+    # Tarayıcı saklayabilir ama her seferinde ETag ile doğrulamalı
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.update(('Cookie',) + tuple(vary))
+    # Sıkıştırılmış yanıtın ETag'i "<etag>-gzip" biçimindedir; istemci bu
+    # varyantı gönderdiyse karşılaştırma onunla yapılır
+    variant = next((tag for tag in compression.etag_variants(etag)
+                    if request.if_none_match.contains_weak(tag) or request.if_match.contains(tag)), None)
+    if variant:
+        response.set_etag(variant)
+    response = response.make_conditional(request)
+    if variant and response.status_code == 200:
+        response.set_etag(etag)  # gövde yeniden sıkıştırılınca etiket yeniden üretilir
+    return response
+
+
+def cached_page(ttl=None, tags=(), vary=('Accept-Language',)):
+    """Anonim GET yanıtlarını önbelleğe alan dekoratör"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _cacheable_request():
+                return view(*args, **kwargs)
+
+            key = _cache_key(vary)
+            entry = page_cache.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                # Yalnızca çerez yazmayan, başarılı ve tamponlanmış yanıtlar saklanır
+                if (response.status_code != 200 or response.is_streamed
+                        or 'Set-Cookie' in response.headers):
+                    return response
+                entry = page_cache.set(key, response.get_data(), response.mimetype,
+                                       ttl or current_app.config['PAGE_CACHE_TTL'], tags)
+            return _respond(entry, vary)
+        return wrapper
+    return decorator
+
+
+def _affected_tags(table, columns):
+    """columns=None satır ekleme/silme; aksi halde güncellenen kolonlar"""
+    tags = set()
+    for tag, rules in TAG_RULES.items():
+        rule = rules.get(table)
+        if rule is None:
+            continue
+        if columns is None or (rule is not ROWS and rule & columns):
+            tags.add(tag)
+    return tags
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def collect_page_changes(session, flush_context):
+    tags = set()
+    for obj in session.new | session.deleted:
+        table = getattr(obj, '__tablename__', None)
+        if table:
+            tags |= _affected_tags(table, None)
+    for obj in session.dirty:
+        table = getattr(obj, '__tablename__', None)
+        if table in TRACKED_TABLES:
+            state = inspect(obj)
+            changed = {attr.key for attr in state.attrs if attr.history.has_changes()}
+            tags |= _affected_tags(table, changed)
+    if tags:
+        session.info.setdefault('page_tags', set()).update(tags)
+
+
+def _updated_columns(statement):
+    """UPDATE ifadesinin SET kolonları (anahtarlar Column ya da ad olabilir)"""
+    values = statement._values or dict(statement._ordered_values or ())
+    return {getattr(column, 'key', column) for column in values}
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def collect_bulk_page_changes(orm_execute_state):
+    # Toplu INSERT/DELETE ifadeleri (arşivleme, içe aktarma) satır sayısını
+    # değiştirir; SQL tarafı UPDATE'ler (points = points + n) kolon değiştirir
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_insert or orm_execute_state.is_delete:
+        tags = _affected_tags(getattr(statement.table, 'name', None), None)
+    elif orm_execute_state.is_update:
+        tags = _affected_tags(getattr(statement.table, 'name', None), _updated_columns(statement))
+    else:
+        return
+    if tags:
+        orm_execute_state.session.info.setdefault('page_tags', set()).update(tags)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def drop_changed_pages(session):
+    tags = session.info.pop('page_tags', None)
+    if tags:
+        page_cache.invalidate(*tags)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_page_changes(session):
+    session.info.pop('page_tags', None)
+
+
+def init_app(app):
+    app.config.setdefault('PAGE_CACHE_ENABLED', True)
+    app.config.setdefault('PAGE_CACHE_TTL', 30)
+    app.config.setdefault('PAGE_CACHE_MAX_ENTRIES', 1000)
+    page_cache.max_entries = app.config['PAGE_CACHE_MAX_ENTRIES']
@@ -0,0 +1,125 @@
+"""Şifre hash'leme ve doğrulamanın süreç havuzunda yapılması.
+
+bcrypt her çağrıda yüzlerce milisaniye CPU harcar. bcrypt 4.x hash
+sırasında GIL'i bırakır, ancak istek thread'lerinde sınırsız sayıda
+eşzamanlı hash tüm çekirdekleri doldurur ve giriş dalgası diğer route'ları
+CPU'suz bırakır. Hash ve doğrulama sınırlı bir `ProcessPoolExecutor`'a
+gönderilir: aynı anda en fazla PASSWORD_POOL_SIZE hash çalışır ve CPU işi
+web sürecinden ayrı süreçlerde yapılır; istek thread'i yalnızca sonucu
+bekler. Bekleyen iş sayısı PASSWORD_MAX_PENDING'i aşarsa yeni istek kuyruğa
+girmeden `PasswordHasherBusy` ile reddedilir.
+Maliyet BCRYPT_LOG_ROUNDS ile ayarlanır; başarılı girişte hash farklı bir
+maliyetle üretilmişse şifre yeni maliyetle yeniden hash'lenir.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from flask_bcrypt import Bcrypt
+
+_bcrypt = Bcrypt()
+
+
+class PasswordHasherBusy(Exception):
+    """Havuz dolu ya da sonuç zamanında gelmedi"""
+
+
+def _hash(password, rounds):
+    return _bcrypt.generate_password_hash(password, rounds).decode('utf-8')
+
+
+def _check(pw_hash, password):
+    return _bcrypt.check_password_hash(pw_hash, password)
+
+
+def _pool_context():
+    # Socket.IO, iş kuyruğu ve log thread'leri çalışan süreç fork edilmez;
+    # forkserver olmayan platformlarda spawn
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def hash_rounds(pw_hash):
+    """'$2b$12$...' biçimindeki hash'in maliyet faktörü"""
+    try:
+        return int(pw_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, rounds=12, pool_size=2, max_pending=8, timeout=10):
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def configure(self, rounds, pool_size, max_pending, timeout):
+        self.shutdown()
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+    def _run(self, function, *args):
+        # pool_size=0: havuzsuz, doğrudan çağıran thread'de (geliştirme/test)
+        if not self.pool_size:
+            return function(*args)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy(f'{self._pending} şifre işlemi bekliyor')
+            self._pending += 1
+            if self._executor is None:
+                # Havuz ilk kullanımda kurulur; import ve CLI komutları süreç başlatmaz
+                self._executor = ProcessPoolExecutor(max_workers=self.pool_size,
+                                                     mp_context=_pool_context())
+            executor = self._executor
+        try:
+            future = executor.submit(function, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Bekleyen sayısı iş gerçekten bitince (ya da iptal edilince) düşer;
+        # zaman aşımında havuzda kalan iş de max_pending'e sayılır
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise PasswordHasherBusy('Şifre işlemi zaman aşımına uğradı')
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, pw_hash, password):
+        return self._run(_check, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        return hash_rounds(pw_hash) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
+
+
+def init_app(app):
+    app.config.setdefault('BCRYPT_LOG_ROUNDS', 12)
+    app.config.setdefault('PASSWORD_POOL_SIZE', 2)
+    app.config.setdefault('PASSWORD_MAX_PENDING', app.config['PASSWORD_POOL_SIZE'] * 4)
+    app.config.setdefault('PASSWORD_TIMEOUT', 10)
+    password_hasher.configure(app.config['BCRYPT_LOG_ROUNDS'],
+                              app.config['PASSWORD_POOL_SIZE'],
+                              app.config['PASSWORD_MAX_PENDING'],
+                              app.config['PASSWORD_TIMEOUT'])
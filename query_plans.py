@@ -0,0 +1,204 @@
+"""Sıcak sorgular için EXPLAIN QUERY PLAN regresyon kontrolü.
+
+`flask check-query-plans` komutu bellek içi bir veritabanını örnek verilerle
+doldurur, uygulamadaki sık çalışan sorguları gerçek model metotları üzerinden
+çalıştırıp yakalar ve her birinin planını SQLite'a sorar. Herhangi bir sorgu
+tam tablo taramasına (SCAN <tablo>) düşerse komut hata koduyla çıkar.
+"""
+import random
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import click
+from flask import Flask
+from sqlalchemy import event
+
+import comments
+import read_models
+import user_search
+from models import (db, User, Post, Comment, Notification, Conversation, Message,
+                    Achievement, UserAchievement, DEFAULT_ACHIEVEMENTS)
+
+# Küçük ve sabit tablolar: tamamını okumak beklenen davranış
+ALLOWED_SCANS = {'achievement'}
+
+SCAN_RE = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+@contextmanager
+def capture_queries(engine):
+    """Blok içinde çalışan SQL ifadelerini (statement, parametreler) olarak toplar"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def explain(connection, statement, parameters):
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+    return [row[3] for row in rows]
+
+
+def table_scans(plan, tables):
+    """Plan satırlarından index kullanmayan tablo taramalarını döner"""
+    scans = []
+    for detail in plan:
+        match = SCAN_RE.match(detail)
+        if match and match.group(1) in tables and match.group(1) not in ALLOWED_SCANS:
+            scans.append(detail)
+    return scans
+
+
+def seed(users=300, posts_per_user=8, seed_value=42):
+    """Plan kontrolü için tekrarlanabilir örnek veri üretir"""
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+
+    for achievement_data in DEFAULT_ACHIEVEMENTS:
+        db.session.add(Achievement(**achievement_data))
+
+    accounts = [
+        User(username=f'user{i}', password='x', points=rng.randint(0, 1000),
+             last_activity=now - timedelta(hours=rng.randint(0, 72)))
+        for i in range(users)
+    ]
+    db.session.add_all(accounts)
+    db.session.flush()
+
+    for user in accounts:
+        for followed in rng.sample(accounts, 10):
+            if followed is not user:
+                user.followed.append(followed)
+
+    all_posts = []
+    for user in accounts:
+        for _ in range(posts_per_user):
+            all_posts.append(Post(body='#deneme gönderi', user_id=user.id,
+                                  timestamp=now - timedelta(minutes=rng.randint(0, 10000))))
+    db.session.add_all(all_posts)
+    db.session.flush()
+
+    for post in rng.sample(all_posts, len(all_posts) // 2):
+        post.liked_by.extend(rng.sample(accounts, 3))
+        db.session.add(Comment(body='yorum', post_id=post.id,
+                               user_id=rng.choice(accounts).id))
+
+    for user in accounts:
+        for _ in range(5):
+            db.session.add(Notification(user_id=user.id, message='bildirim',
+                                        notification_type='like',
+                                        is_read=rng.random() < 0.5))
+
+    for _ in range(users):
+        first, second = rng.sample(accounts, 2)
+        conversation = Conversation()
+        conversation.participants.extend([first, second])
+        db.session.add(conversation)
+        db.session.flush()
+        for _ in range(5):
+            db.session.add(Message(conversation_id=conversation.id,
+                                   sender_id=rng.choice([first, second]).id,
+                                   content='mesaj'))
+
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def hot_queries(user, other, post, conversation):
+    """(ad, çağrılabilir) çiftleri; app.py'deki istek yollarının kullandığı sorgular"""
+    since = datetime.utcnow() - timedelta(hours=24)
+    achievement = Achievement.query.first()
+    return [
+        ('feed', lambda: read_models.feed(user.id)),
+        ('is_following', lambda: user.is_following(other)),
+        ('followers_count', lambda: user.followers_count()),
+        ('following_count', lambda: user.following_count()),
+        ('posts_count', lambda: user.posts_count()),
+        ('has_achievement', lambda: user.has_achievement(achievement)),
+        ('unread_notifications_count', lambda: user.get_unread_notifications_count()),
+        ('recent_notifications', lambda: user.get_recent_notifications(20)),
+        ('notifications_page', lambda: read_models.notifications_page(user.id, 20, (datetime.utcnow(), 10**9))),
+        ('notifications_page_type', lambda: read_models.notifications_page(user.id, 20, None, 'like')),
+        ('unread_messages_count', lambda: user.get_unread_messages_count()),
+        ('recent_messages', lambda: user.get_recent_messages(5)),
+        ('direct_conversation', lambda: user.get_direct_conversation(other)),
+        ('inbox_page', lambda: read_models.inbox_page(user.id, 20, (datetime.utcnow(), 10**9))),
+        ('conversation_messages', lambda: conversation.ordered_messages().all()),
+        ('conversation_participants', lambda: conversation.participants),
+        ('post_liked_by', lambda: post.is_liked_by(user)),
+        ('post_comments', lambda: post.post_comments),
+        ('comments_page', lambda: comments.comments_page(post.id, 20, (datetime.utcnow(), 10**9))),
+        # Sayaç değeri önbellekte olmayan bir anahtar üretir; sorgu her seferinde çalışır
+        ('latest_comments', lambda: comments.latest_comments(
+            [(post_id, -1) for post_id in db.session.scalars(db.select(Post.id).limit(5))], size=3)),
+        ('user_achievements_count', lambda: UserAchievement.query.filter_by(user_id=user.id).count()),
+        ('leaderboard', lambda: read_models.leaderboard(20)),
+        ('active_today', lambda: User.query.filter(User.last_activity >= since).count()),
+        ('posts_today', lambda: Post.query.filter(Post.timestamp >= since).count()),
+        ('comments_today', lambda: Comment.query.filter(Comment.timestamp >= since).count()),
+        ('user_search', lambda: user_search.search_users(other.username[:3], limit=20)),
+    ]
+
+
+def check_query_plans(users=300):
+    """Tüm sıcak sorguları çalıştırır; {ad: [(plan, taramalar), ...]} döner"""
+    check_app = Flask(__name__)
+    check_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    check_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(check_app)
+    comments.init_app(check_app)  # read_models.feed önizleme boyutu
+
+    results = {}
+    with check_app.app_context():
+        # Ana uygulamanın 'reader' bind'ı burada yok; yalnızca varsayılan metadata
+        db.create_all(bind_key=None)
+        seed(users=users)
+        tables = set(db.metadata.tables)
+
+        user = db.session.get(User, 1)
+        other = user.followed.first()
+        post = Post.query.filter_by(user_id=other.id).first()
+        conversation = Conversation.query.first()
+
+        for name, run in hot_queries(user, other, post, conversation):
+            # İlişkiler yeniden yüklensin diye her sorgudan önce oturumu boşalt
+            db.session.expire_all()
+            with capture_queries(db.engine) as captured:
+                run()
+            with db.engine.connect() as connection:
+                results[name] = [
+                    (plan, table_scans(plan, tables))
+                    for plan in (explain(connection, statement, parameters)
+                                 for statement, parameters in captured)
+                ]
+        db.session.remove()
+    return results
+
+
+def init_app(app):
+    @app.cli.command('check-query-plans')
+    @click.option('--users', default=300, help='Örnek veri için kullanıcı sayısı')
+    @click.option('--verbose', is_flag=True, help='Tüm planları yazdır')
+    def check_query_plans_command(users, verbose):
+        """Sıcak sorguların tablo taramasına düşmediğini doğrular."""
+        results = check_query_plans(users=users)
+        failures = 0
+        for name, plans in results.items():
+            scans = [scan for _, found in plans for scan in found]
+            failures += bool(scans)
+            click.echo(f"{'FAIL' if scans else 'ok  '} {name}")
+            for plan, _ in plans if (verbose or scans) else []:
+                for detail in plan:
+                    click.echo(f'       {detail}')
+        if failures:
+            raise click.ClickException(f'{failures} sorgu tablo taramasına düştü')
+        click.echo(f'{len(results)} sorgu index kullanıyor')
@@ -0,0 +1,216 @@
+"""Süreçler arası paylaşılan, SQLite tabanlı hız sınırlama.
+
+`memory://` depolaması her worker sürecinde ayrı sayaç tuttuğu için N worker
+ile gerçek sınır N katına çıkıyordu. `SQLiteStorage`, `limits` kütüphanesine
+`sqlite:///yol` şemasıyla kaydolur; sayaçlar tek bir SQLite dosyasında
+tutulur ve harici sunucu gerektirmez. Varsayılan strateji kayan pencere
+sayacıdır (sliding-window-counter): her kontrol önceki ve şimdiki pencerenin
+iki birincil anahtar okuması ile tek bir UPSERT'tir, yani istek başına O(1).
+
+Anahtarlar giriş yapmış kullanıcı için `user:<id>`, diğerleri için
+`ip:<adres>` olur. Yazma işlemleri ortak bir kotadan maliyetlerine göre düşer
+(resimli gönderi beğeniden pahalıdır).
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from math import floor
+
+from flask import current_app, g, request
+from flask_limiter.util import get_remote_address
+from flask_login import current_user
+from limits import parse
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport
+
+from database import DEFAULT_PRAGMAS, apply_pragmas
+
+# Ortak yazma kotasından düşen maliyetler (endpoint -> birim)
+WRITE_COSTS = {
+    'main.posts': 5,
+    'main.comment_post': 2,
+    'main.like_post': 1,
+    'main.follow': 1,
+    'main.unfollow': 1,
+    'main.profile': 3,
+}
+IMAGE_UPLOAD_COST = 20
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS rate_limit (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+)
+'''
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport):
+    """`limits` için süreçler arası SQLite depolaması: sqlite:///yol/ratelimit.db"""
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri, wrap_exceptions=False, cleanup_every=1000, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri.split(':///', 1)[1]
+        self.cleanup_every = cleanup_every
+        self._local = threading.local()
+        self._hits = 0
+        with self._transaction() as connection:
+            connection.execute(SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # isolation_level=None: transaction'ları BEGIN IMMEDIATE ile biz açarız
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            apply_pragmas(connection, DEFAULT_PRAGMAS)
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _get(self, connection, key, now):
+        row = connection.execute(
+            'SELECT count, expires_at FROM rate_limit WHERE key = ? AND expires_at > ?',
+            (key, now)).fetchone()
+        return row or (0, now)
+
+    def _incr(self, connection, key, expiry, amount, now):
+        # Süresi geçmiş sayaç yerinde sıfırlanır
+        return connection.execute(
+            '''INSERT INTO rate_limit (key, count, expires_at) VALUES (?, ?, ?)
+               ON CONFLICT(key) DO UPDATE SET
+                   count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END,
+                   expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END
+               RETURNING count''',
+            (key, amount, now + expiry, now, now)).fetchone()[0]
+
+    def _maybe_cleanup(self, connection, now):
+        self._hits += 1
+        if self._hits % self.cleanup_every == 0:
+            connection.execute('DELETE FROM rate_limit WHERE expires_at <= ?', (now,))
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        with self._transaction() as connection:
+            self._maybe_cleanup(connection, now)
+            return self._incr(connection, key, expiry, amount, now)
+
+    def get(self, key):
+        return self._get(self._connection(), key, time.time())[0]
+
+    def get_expiry(self, key):
+        return self._get(self._connection(), key, time.time())[1]
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._transaction() as connection:
+            return connection.execute('DELETE FROM rate_limit').rowcount
+
+    def clear(self, key):
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM rate_limit WHERE key = ?', (key,))
+
+    # ---- kayan pencere sayacı ----
+
+    @staticmethod
+    def _window_keys(key, expiry, now):
+        window = int(now // expiry)
+        return f'{key}/{window - 1}', f'{key}/{window}'
+
+    def _window(self, connection, key, expiry, now):
+        previous_key, current_key = self._window_keys(key, expiry, now)
+        previous_count = self._get(connection, previous_key, now)[0]
+        current_count = self._get(connection, current_key, now)[0]
+        # Önceki pencerenin şimdiki pencereyle hâlâ örtüşen kısmı
+        previous_ttl = expiry - (now % expiry) if previous_count else 0.0
+        current_ttl = expiry - (now % expiry) + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as connection:
+            # BEGIN IMMEDIATE yazma kilidini alır; okuma ve artırma atomik
+            previous_count, previous_ttl, current_count, _ = self._window(connection, key, expiry, now)
+            if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                return False
+            self._maybe_cleanup(connection, now)
+            self._incr(connection, self._window_keys(key, expiry, now)[1], 2 * expiry, amount, now)
+            return True
+
+    def get_sliding_window(self, key, expiry):
+        return self._window(self._connection(), key, expiry, time.time())
+
+    def clear_sliding_window(self, key, expiry):
+        with self._transaction() as connection:
+            connection.executemany('DELETE FROM rate_limit WHERE key = ?',
+                                   [(k,) for k in self._window_keys(key, expiry, time.time())])
+
+
+def rate_limit_key():
+    """Giriş yapmış kullanıcı için kullanıcı, diğerleri için IP anahtarı"""
+    if current_user.is_authenticated:
+        return f'user:{current_user.id}'
+    return f'ip:{get_remote_address()}'
+
+
+def login_username_key():
+    """Hesap + IP başına deneme sayacı; başkasının IP'sinden gelen denemeler
+    hesabı kilitlemez"""
+    username = request.form.get('username', '').strip().lower()
+    return f'login:{username}:{get_remote_address()}'
+
+
+def login_failed(response):
+    """Giriş sınırları yalnızca başarısız denemelerde düşer (deduct_when)"""
+    return g.get('login_failed', False)
+
+
+def write_quota():
+    return current_app.config['RATELIMIT_WRITE_QUOTA']
+
+
+def request_cost():
+    cost = WRITE_COSTS.get(request.endpoint, 1)
+    if any(upload.filename for upload in request.files.values()):
+        cost += IMAGE_UPLOAD_COST
+    return cost
+
+
+def allow_socket_event(limiter, event, cost=1):
+    """Socket.IO olayları Flask-Limiter dekoratörlerinden geçmez; aynı depodan düşülür"""
+    item = parse(current_app.config['RATELIMIT_SOCKET_QUOTA'])
+    return limiter.limiter.hit(item, 'socket', event, rate_limit_key(), cost=cost)
+
+
+def init_app(app):
+    """Limiter oluşturulmadan önce çağrılır; depolama ve strateji ayarlarını yapar"""
+    os.makedirs(app.instance_path, exist_ok=True)
+    app.config.setdefault('RATELIMIT_STORAGE_URI',
+                          'sqlite:///' + os.path.join(app.instance_path, 'ratelimit.db'))
+    app.config.setdefault('RATELIMIT_STRATEGY', 'sliding-window-counter')
+    app.config.setdefault('RATELIMIT_WRITE_QUOTA', '300 per hour')
+    app.config.setdefault('RATELIMIT_SOCKET_QUOTA', '60 per minute')
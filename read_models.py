@@ -0,0 +1,107 @@
+"""Listeleme sayfaları için ORM'siz okuma modelleri.
+
+Akış, liderlik tablosu, bildirimler ve gelen kutusu yalnızca gösterilen
+sütunları seçen Core sorgularıyla okunur ve namedtuple satır tiplerine
+dönüştürülür. ORM nesnesi oluşturulmaz, identity map'e bir şey eklenmez,
+parola özeti gibi gösterilmeyen sütunlar hiç okunmaz. Satırlar şablonlara
+ve JSON yanıtlarına doğrudan verilir (`_asdict()` ile sözlüğe çevrilir).
+
+İzleyiciye özel alanlar (beğendi mi, okunmamış sayısı) aynı sorguda
+ilişkili alt sorgularla hesaplanır; satır başına ek sorgu atılmaz.
+"""
+from collections import namedtuple
+
+from sqlalchemy import exists, func, literal, select, union
+
+import comments
+from database import encode_cursor
+from models import (db, User, Post, Notification, Conversation, Message, UserAchievement,
+                    followers, likes, user_conversations)
+
+FeedPost = namedtuple('FeedPost', 'id body hashtags timestamp image like_count comment_count '
+                                  'author author_image is_liked comments comments_cursor')
+LeaderboardRow = namedtuple('LeaderboardRow', 'username points level achievements')
+NotificationRow = namedtuple('NotificationRow', 'id message notification_type is_read timestamp related_id')
+InboxRow = namedtuple('InboxRow', 'id is_group group_name last_activity_at participants '
+                                  'last_content last_sender_id last_timestamp unread_count')
+
+
+def fetch(row_type, query):
+    """Sorgu sütunları satır tipinin alan sırasıyla seçilmiş olmalı"""
+    return [row_type._make(row) for row in db.session.execute(query)]
+
+
+def feed(user_id):
+    """Takip edilenlerin ve kullanıcının kendi gönderileri, son yorum önizlemeleriyle"""
+    authors = union(
+        select(followers.c.followed_id).where(followers.c.follower_id == user_id),
+        select(literal(user_id))
+    )
+    is_liked = exists().where(likes.c.post_id == Post.id, likes.c.user_id == user_id)
+    rows = db.session.execute(
+        select(Post.id, Post.body, Post.hashtags, Post.timestamp, Post.image, Post.like_count,
+               Post.comment_count, User.username, User.profile_image, is_liked)
+        .join(User, User.id == Post.user_id)
+        .where(Post.user_id.in_(authors))
+        .order_by(Post.timestamp.desc())
+    ).all()
+
+    previews = comments.latest_comments([(row.id, row.comment_count) for row in rows])
+    posts = []
+    for row in rows:
+        latest = previews[row.id]
+        cursor = encode_cursor(latest[0]['timestamp'], latest[0]['id']) if latest else None
+        posts.append(FeedPost(*row, comments=latest, comments_cursor=cursor))
+    return posts
+
+
+def leaderboard(limit=20):
+    achievements = select(func.count()).where(UserAchievement.user_id == User.id).scalar_subquery()
+    return fetch(LeaderboardRow, select(User.username, User.points, User.level, achievements)
+                 .order_by(User.points.desc()).limit(limit))
+
+
+def notifications_page(user_id, limit=20, before=None, notification_type=None):
+    """(timestamp, id) azalan sırada keyset sayfası; before=(timestamp, id) son görülen"""
+    query = select(Notification.id, Notification.message, Notification.notification_type,
+                   Notification.is_read, Notification.timestamp, Notification.related_id
+                   ).where(Notification.user_id == user_id)
+    if notification_type:
+        query = query.where(Notification.notification_type == notification_type)
+    if before:
+        query = query.where(db.tuple_(Notification.timestamp, Notification.id) < db.tuple_(*before))
+    return fetch(NotificationRow, query.order_by(Notification.timestamp.desc(), Notification.id.desc()).limit(limit))
+
+
+def inbox_page(user_id, limit=20, before=None):
+    """Gelen kutusu sayfası tek sorguda: konuşma, diğer katılımcılar, son mesaj özeti
+    ve okunmamış sayısı. (last_activity_at, id) azalan sırada keyset;
+    before=(last_activity_at, id) son görülen"""
+    members = user_conversations.alias('members')
+    last_message = Message.__table__.alias('last_message')
+    others = select(func.group_concat(User.username, ', ')).select_from(
+        members.join(User, User.id == members.c.user_id)
+    ).where(
+        members.c.conversation_id == Conversation.id,
+        members.c.user_id != user_id
+    ).correlate(Conversation).scalar_subquery()
+    unread = select(func.count()).where(
+        Message.conversation_id == Conversation.id,
+        Message.is_read == False,
+        Message.sender_id != user_id
+    ).correlate(Conversation).scalar_subquery()
+    query = select(
+        Conversation.id, Conversation.is_group, Conversation.group_name, Conversation.last_activity_at,
+        others,
+        func.substr(last_message.c.content, 1, 80),
+        last_message.c.sender_id,
+        last_message.c.timestamp,
+        unread,
+    ).select_from(user_conversations).join(
+        Conversation, Conversation.id == user_conversations.c.conversation_id
+    ).outerjoin(
+        last_message, last_message.c.id == Conversation.last_message_id
+    ).where(user_conversations.c.user_id == user_id)
+    if before:
+        query = query.where(db.tuple_(Conversation.last_activity_at, Conversation.id) < db.tuple_(*before))
+    return fetch(InboxRow, query.order_by(Conversation.last_activity_at.desc(), Conversation.id.desc()).limit(limit))
@@ -0,0 +1,323 @@
+"""Eski satırların arşivlenmesi, metrik kovalarının budanması ve incremental VACUUM.
+
+Her tablo için RETENTION_POLICIES'te bir saklama süresi ve arşiv hedefi
+tanımlanır:
+
+- 'database': satırlar ayrı bir arşiv SQLite dosyasına taşınır ve oradan
+  okunabilir (eski mesajlar konuşma sayfasından istenince gösterilir).
+- 'jsonl': satırlar tablo başına günlük .jsonl.gz segmentlerine eklenir;
+  her parti ayrı bir gzip üyesidir, `gzip.open` dosyayı bütün olarak okur.
+- None: satırlar yalnızca silinir.
+
+Zaman kolonu varsayılan olarak `timestamp`tır ('column' ile değişir);
+'where' verilirse yalnızca bu kolon değerlerine eşit satırlar ele alınır
+(örneğin yalnızca `done` durumundaki işler).
+
+Taşıma id sırasıyla partiler halinde yapılır: her parti kısa bir
+transaction'da okunur, arşive yazılır ve silinir; partiler arasında
+beklenerek istek yolundaki yazıcıya yer açılır. Satırlar eklendikleri anın
+zaman damgasını taşıdığı için id sırası zaman sırasıdır; süresi dolmamış
+satır bulunmayan ilk partide tarama durur, tabloyu baştan sona okumaz.
+Arşive yazma silmeden önce yapılır; yarıda kalan bir parti tekrar
+çalıştığında veritabanı arşivinde çift kayıt oluşmaz (aynı id yok sayılır).
+
+Günlük iş RETENTION_WINDOW saatleri (sunucu yerel saati) arasında arka plan
+thread'inde çalışır ve pencere bitince durur. Sıcak veritabanı
+auto_vacuum=INCREMENTAL ise boşalan sayfalar işin sonunda dosyaya iade
+edilir; mevcut bir veritabanını bu moda geçirmek için bir kez
+`flask retention --enable-incremental-vacuum` çalıştırılır.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import click
+from sqlalchemy import Column, Index, MetaData, Table, create_engine, delete, event, func, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import audit
+from database import DEFAULT_PRAGMAS, apply_pragmas
+from models import db, Job, Message, MetricBucket, Notification
+
+
+class ArchiveDatabase:
+    """Kaynak tabloların kolon ve indekslerini kopyalayan ayrı SQLite arşivi"""
+
+    def __init__(self, uri):
+        self.engine = create_engine(uri)
+        self.metadata = MetaData()
+        self._lock = threading.Lock()
+
+        @event.listens_for(self.engine, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, DEFAULT_PRAGMAS)
+
+    def table_for(self, source):
+        with self._lock:
+            table = self.metadata.tables.get(source.name)
+            if table is None:
+                # Yabancı anahtarlar kopyalanmaz: arşivde user/conversation tabloları yok
+                table = Table(source.name, self.metadata, *[
+                    Column(column.name, column.type, primary_key=column.primary_key)
+                    for column in source.columns
+                ])
+                for index in source.indexes:
+                    Index(index.name, *[table.c[column.name] for column in index.columns])
+                self.metadata.create_all(self.engine, tables=[table])
+            return table
+
+    def write(self, source, rows):
+        table = self.table_for(source)
+        with self.engine.begin() as connection:
+            connection.execute(sqlite_insert(table).on_conflict_do_nothing(), rows)
+
+
+class JsonlArchive:
+    """<dizin>/<tablo>/<gün>.jsonl.gz segmentleri; parti başına bir gzip üyesi"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def write(self, source, rows):
+        folder = os.path.join(self.directory, source.name)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'{date.today().isoformat()}.jsonl.gz')
+        lines = ''.join(json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in rows)
+        with open(path, 'ab') as segment:
+            segment.write(gzip.compress(lines.encode('utf-8')))
+            segment.flush()
+            os.fsync(segment.fileno())  # silme ancak satırlar diske yazıldıktan sonra
+
+
+class RetentionManager:
+    def __init__(self):
+        self.archive_db = None
+        self.jsonl = None
+        self.last_report = None
+
+    def configure(self, archive_uri, archive_dir):
+        self.archive_db = ArchiveDatabase(archive_uri)
+        self.jsonl = JsonlArchive(archive_dir)
+
+    def sink(self, kind):
+        return {'database': self.archive_db, 'jsonl': self.jsonl, None: None}[kind]
+
+    # ---- arşiv okuma ----
+
+    def archived_messages(self, conversation_id, before=None, limit=50):
+        """Arşivdeki mesajlar, yeniden eskiye; before=(timestamp, id) son görülen"""
+        table = self.archive_db.table_for(Message.__table__)
+        query = select(table).where(table.c.conversation_id == conversation_id)
+        if before:
+            query = query.where(tuple_(table.c.timestamp, table.c.id) < tuple_(*before))
+        query = query.order_by(table.c.timestamp.desc(), table.c.id.desc()).limit(limit)
+        with self.archive_db.engine.connect() as connection:
+            return connection.execute(query).all()
+
+    def has_archived_messages(self, conversation_id):
+        table = self.archive_db.table_for(Message.__table__)
+        with self.archive_db.engine.connect() as connection:
+            return connection.execute(
+                select(table.c.id).where(table.c.conversation_id == conversation_id).limit(1)
+            ).first() is not None
+
+
+retention_manager = RetentionManager()
+
+
+def policy_tables():
+    """Politika adı -> (motor, tablo)"""
+    return {
+        'notification': (db.engine, Notification.__table__),
+        'message': (db.engine, Message.__table__),
+        'security_event': (audit.security_audit.engine, audit.security_event),
+        'job': (db.engine, Job.__table__),
+    }
+
+
+def filters(table, where):
+    """{kolon: değer} eşitliklerini WHERE koşullarına çevirir"""
+    return [table.c[name] == value for name, value in (where or {}).items()]
+
+
+def archive_table(engine, table, cutoff, sink, batch_size=500, deadline=None, pause=0.05,
+                  column='timestamp', where=None):
+    """`column` değeri `cutoff`tan eski satırları id sırasıyla partiler halinde taşır; taşınan sayıyı döner"""
+    last_id = 0
+    moved = 0
+    while deadline is None or time.monotonic() < deadline:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(table).where(table.c.id > last_id, *filters(table, where))
+                .order_by(table.c.id).limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            aged = [dict(row) for row in rows if row[column] is not None and row[column] < cutoff]
+            if not aged:
+                break  # saklama sınırı geçildi
+            if sink is not None:
+                sink.write(table, aged)
+            connection.execute(delete(table).where(table.c.id.in_([row['id'] for row in aged])))
+        moved += len(aged)
+        time.sleep(pause)
+    return moved
+
+
+def count_aged(engine, table, cutoff, column='timestamp', where=None):
+    with engine.connect() as connection:
+        return connection.execute(
+            select(func.count()).select_from(table)
+            .where(table.c[column] < cutoff, *filters(table, where))).scalar()
+
+
+def prune_metric_buckets(days_by_granularity, now=None):
+    """Dakika/saat kovalarını budar; gün ve toplam kovaları tutulur"""
+    now = now or datetime.utcnow()
+    deleted = {}
+    for granularity, days in days_by_granularity.items():
+        result = db.session.execute(delete(MetricBucket).where(
+            MetricBucket.granularity == granularity,
+            MetricBucket.bucket_start < now - timedelta(days=days)))
+        deleted[granularity] = result.rowcount
+    db.session.commit()
+    return deleted
+
+
+def incremental_vacuum(engine, deadline=None, pages=2000, pause=0.05):
+    """Boş sayfaları partiler halinde dosyaya iade eder; mod kapalıysa None"""
+    with engine.connect() as connection:
+        if connection.exec_driver_sql('PRAGMA auto_vacuum').scalar() != 2:
+            return None
+    freed = 0
+    while deadline is None or time.monotonic() < deadline:
+        # Bağlantı her adımda alınıp beklemeden önce bırakılır (archive_table'daki
+        # partiler gibi); ana motorun tek yazıcı bağlantısı aradaki yazmalara kalır
+        connection = engine.raw_connection()
+        try:
+            sqlite = connection.driver_connection
+            free = sqlite.execute('PRAGMA freelist_count').fetchone()[0]
+            if free:
+                # pysqlite execute() pragmayı bir kez adımlar (tek sayfa);
+                # executescript ifadeyi sonuna kadar çalıştırır
+                sqlite.executescript(f'PRAGMA incremental_vacuum({pages})')
+        finally:
+            connection.close()
+        if not free:
+            break
+        freed += min(free, pages)
+        time.sleep(pause)
+    with engine.connect() as connection:
+        connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+    return freed
+
+
+def run_retention(config, deadline=None, dry_run=False):
+    """Tüm politikaları uygular; {ad: taşınan/silinen} raporu döner"""
+    now = datetime.utcnow()
+    report = {}
+    for name, (engine, table) in policy_tables().items():
+        policy = config['RETENTION_POLICIES'].get(name)
+        if not policy or engine is None:
+            continue
+        cutoff = now - timedelta(days=policy['days'])
+        column = policy.get('column', 'timestamp')
+        where = policy.get('where')
+        if dry_run:
+            report[name] = count_aged(engine, table, cutoff, column, where)
+            continue
+        report[name] = archive_table(engine, table, cutoff, retention_manager.sink(policy.get('archive')),
+                                     batch_size=config['RETENTION_BATCH_SIZE'], deadline=deadline,
+                                     pause=config['RETENTION_BATCH_PAUSE'], column=column, where=where)
+    if dry_run:
+        return report
+    report['metric_bucket'] = prune_metric_buckets(config['RETENTION_METRIC_DAYS'], now)
+    report['vacuum_pages'] = {
+        'main': incremental_vacuum(db.engine, deadline=deadline),
+        'audit': incremental_vacuum(audit.security_audit.engine, deadline=deadline),
+    }
+    retention_manager.last_report = {'finished_at': datetime.utcnow().isoformat(), **report}
+    return report
+
+
+def window_deadline(window, now=None):
+    """Şu an pencere içindeyse pencerenin bitişine kalan süre (monotonic), değilse None"""
+    now = now or datetime.now()
+    start, end = window
+    if not start <= now.hour < end:
+        return None
+    ends_at = now.replace(hour=end, minute=0, second=0, microsecond=0)
+    return time.monotonic() + (ends_at - now).total_seconds()
+
+
+def start_scheduler(app):
+    """Pencere içinde günde bir kez çalışan daemon thread"""
+    def loop():
+        last_run = None
+        while True:
+            time.sleep(app.config['RETENTION_CHECK_INTERVAL'])
+            deadline = window_deadline(app.config['RETENTION_WINDOW'])
+            if deadline is None or last_run == date.today():
+                continue
+            last_run = date.today()
+            with app.app_context():
+                try:
+                    report = run_retention(app.config, deadline=deadline)
+                    app.logger.info(f'Saklama işi tamamlandı: {report}')
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception('Saklama işi başarısız')
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=loop, name='retention', daemon=True)
+    thread.start()
+    return thread
+
+
+def init_app(app):
+    """audit.init_app'ten sonra çağrılır (denetim deposu motoru)"""
+    app.config.setdefault('RETENTION_POLICIES', {
+        'notification': {'days': 90, 'archive': 'jsonl'},
+        'message': {'days': 365, 'archive': 'database'},
+        'security_event': {'days': app.config.get('AUDIT_RETENTION_DAYS', 90), 'archive': 'jsonl'},
+        # Başarıyla biten işler; idempotency anahtarları bu süre boyunca korunur.
+        # failed işler hata kayıtlarıyla `flask jobs --retry-failed` için kalır
+        'job': {'days': 7, 'archive': None, 'column': 'finished_at', 'where': {'status': 'done'}},
+    })
+    app.config.setdefault('RETENTION_METRIC_DAYS', {'minute': 2, 'hour': 90})
+    app.config.setdefault('RETENTION_ARCHIVE_URI',
+                          'sqlite:///' + os.path.join(app.instance_path, 'archive.db'))
+    app.config.setdefault('RETENTION_ARCHIVE_DIR', os.path.join(app.instance_path, 'archive'))
+    app.config.setdefault('RETENTION_BATCH_SIZE', 500)
+    app.config.setdefault('RETENTION_BATCH_PAUSE', 0.05)  # sn, partiler arası
+    app.config.setdefault('RETENTION_WINDOW', (3, 5))  # yerel saat [başlangıç, bitiş)
+    app.config.setdefault('RETENTION_CHECK_INTERVAL', 600)  # sn; 0 = zamanlayıcı kapalı
+    os.makedirs(app.instance_path, exist_ok=True)
+    retention_manager.configure(app.config['RETENTION_ARCHIVE_URI'], app.config['RETENTION_ARCHIVE_DIR'])
+    started = threading.Lock()
+
+    @app.before_request
+    def start_scheduler_once():
+        if app.config['RETENTION_CHECK_INTERVAL'] and started.acquire(blocking=False):
+            start_scheduler(app)
+
+    @app.cli.command('retention')
+    @click.option('--dry-run', is_flag=True, help='Sadece süresi dolan satırları say')
+    @click.option('--enable-incremental-vacuum', is_flag=True,
+                  help='Ana ve denetim veritabanlarını auto_vacuum=INCREMENTAL moduna geçirir (tam VACUUM, bir kez)')
+    def retention_command(dry_run, enable_incremental_vacuum):
+        """Saklama politikalarını hemen uygular (arşivle, buda, incremental VACUUM)."""
+        if enable_incremental_vacuum:
+            for engine in (db.engine, audit.security_audit.engine):
+                with engine.connect() as connection:
+                    connection.exec_driver_sql('PRAGMA auto_vacuum=INCREMENTAL')
+                    connection.exec_driver_sql('VACUUM')
+            click.echo('auto_vacuum=INCREMENTAL etkin')
+        report = run_retention(app.config, dry_run=dry_run)
+        for name, value in report.items():
+            click.echo(f'{name:<16}{value}')
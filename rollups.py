@@ -0,0 +1,171 @@
+"""Zaman kovalı metrik sayaçları.
+
+Olaylar (kayıt, gönderi, yorum, beğeni, mesaj, aktif kullanıcı) gerçekleştiği
+anda `record` ile dakika, saat, gün ve toplam kovalarına tek bir UPSERT ile
+eklenir. /, /admin ve /api/stats sayfaları COUNT(*) yerine birkaç kova
+satırı okur; aynı tablo panolar için zaman serisi de sağlar.
+"""
+from datetime import datetime
+
+import click
+from flask import request
+from flask_login import current_user
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, User, Post, Comment, Message, MetricBucket, likes
+
+METRICS = ('signups', 'posts', 'comments', 'likes', 'messages', 'active_users')
+GRANULARITIES = ('minute', 'hour', 'day')
+TOTAL = 'total'
+EPOCH = datetime(1970, 1, 1)
+
+_touched = {}  # user_id -> bu süreçte yazılan son dakika kovası
+TOUCHED_MAX_ENTRIES = 10000
+
+
+def bucket_start(granularity, when):
+    if granularity == 'minute':
+        return when.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return when.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return when.replace(hour=0, minute=0, second=0, microsecond=0)
+    return EPOCH
+
+
+def _upsert(rows):
+    statement = sqlite_insert(MetricBucket).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=['metric', 'granularity', 'bucket_start'],
+        set_={'value': MetricBucket.value + statement.excluded.value}
+    )
+    db.session.execute(statement)
+
+
+def record(metric, amount=1, when=None):
+    """Olayı tüm kovalara ekler; çağıranın transaction'ında çalışır"""
+    when = when or datetime.utcnow()
+    rows = [
+        {'metric': metric, 'granularity': granularity,
+         'bucket_start': bucket_start(granularity, when), 'value': amount}
+        for granularity in GRANULARITIES + (TOTAL,)
+    ]
+    _upsert(rows)
+
+
+def touch_user(user, when=None):
+    """Kullanıcıyı içinde bulunulan dakika/saat/gün için aktif sayar.
+
+    last_activity yalnızca dakika sınırı geçildiğinde yazılır; böylece her
+    istek bir UPDATE üretmez. `user` kimlik önbelleğindeki kopya olabilir ve
+    eski olabilir; yalnızca yazma denemesine karar verir. Kovaları hangi
+    isteğin sayacağına koşullu UPDATE karar verir: aynı dakikadaki paralel
+    istekler ve worker'lar arasında satırı yalnızca biri günceller.
+    last_activity değişince identity_version artırılmaz; aktif kullanıcıların
+    kimlik önbelleği dakikada bir düşmez.
+    """
+    when = when or datetime.utcnow()
+    minute = bucket_start('minute', when)
+    last = max(filter(None, (user.last_activity, _touched.get(user.id))), default=None)
+    if last is not None and last >= minute:
+        return False
+
+    counted = ()
+    # En geniş kovadan başlanır: gün sınırı geçildiyse üç kova da sayılır
+    for index in reversed(range(len(GRANULARITIES))):
+        result = db.session.execute(
+            update(User).where(
+                User.id == user.id,
+                or_(User.last_activity == None,
+                    User.last_activity < bucket_start(GRANULARITIES[index], when))
+            ).values(last_activity=when),
+            execution_options={'synchronize_session': False}
+        )
+        if result.rowcount == 1:
+            counted = GRANULARITIES[:index + 1]
+            break
+    if counted:
+        _upsert([
+            {'metric': 'active_users', 'granularity': granularity,
+             'bucket_start': bucket_start(granularity, when), 'value': 1}
+            for granularity in counted
+        ])
+    db.session.commit()
+
+    if len(_touched) >= TOUCHED_MAX_ENTRIES:
+        _touched.clear()
+    _touched[user.id] = minute
+    return bool(counted)
+
+
+def totals(metrics):
+    """{metrik: toplam} - her metrik için tek kova satırı"""
+    rows = db.session.execute(
+        select(MetricBucket.metric, MetricBucket.value).where(
+            MetricBucket.metric.in_(metrics),
+            MetricBucket.granularity == TOTAL,
+            MetricBucket.bucket_start == EPOCH
+        )
+    ).all()
+    result = dict.fromkeys(metrics, 0)
+    result.update(rows)
+    return result
+
+
+def window_sums(metrics, granularity, since):
+    """`since` anından itibaren kovaların metrik bazında toplamı"""
+    rows = db.session.execute(
+        select(MetricBucket.metric, func.sum(MetricBucket.value)).where(
+            MetricBucket.metric.in_(metrics),
+            MetricBucket.granularity == granularity,
+            MetricBucket.bucket_start >= bucket_start(granularity, since)
+        ).group_by(MetricBucket.metric)
+    ).all()
+    result = dict.fromkeys(metrics, 0)
+    result.update(rows)
+    return result
+
+
+def series(metric, granularity, limit=60):
+    """Son `limit` kova; [(kova başlangıcı, değer), ...] eskiden yeniye"""
+    rows = db.session.execute(
+        select(MetricBucket.bucket_start, MetricBucket.value).where(
+            MetricBucket.metric == metric,
+            MetricBucket.granularity == granularity
+        ).order_by(MetricBucket.bucket_start.desc()).limit(limit)
+    ).all()
+    return [(start, value) for start, value in reversed(rows)]
+
+
+def backfill_totals():
+    """Toplam kovalarını mevcut tablolardan yeniden hesaplar"""
+    counts = {
+        'signups': select(func.count()).select_from(User),
+        'posts': select(func.count()).select_from(Post),
+        'comments': select(func.count()).select_from(Comment),
+        'likes': select(func.count()).select_from(likes),
+        'messages': select(func.count()).select_from(Message),
+    }
+    for metric, query in counts.items():
+        value = db.session.scalar(query)
+        statement = sqlite_insert(MetricBucket).values(
+            metric=metric, granularity=TOTAL, bucket_start=EPOCH, value=value)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['metric', 'granularity', 'bucket_start'],
+            set_={'value': statement.excluded.value}
+        ))
+    db.session.commit()
+
+
+def init_app(app):
+    @app.before_request
+    def track_active_user():
+        if request.endpoint != 'static' and current_user.is_authenticated:
+            touch_user(current_user)
+
+    @app.cli.command('backfill-rollups')
+    def backfill_rollups_command():
+        """Toplam kovalarını mevcut tablolardaki sayımlarla doldurur."""
+        backfill_totals()
+        click.echo('Toplam metrikler güncellendi')
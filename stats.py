@@ -0,0 +1,100 @@
+"""user_stats özet tablosunun SQL ile yenilenmesi.
+
+Beğeni, yorum, takip, gönderi ve puan değişiklikleri `mark_stats_dirty` ile
+etkilenen kullanıcıyı işaretler. Commit'ten hemen önce işaretli kullanıcıların
+satırları tek bir INSERT ... SELECT ile yeniden hesaplanır; böylece özet, onu
+değiştiren işlemle aynı transaction'da güncel kalır ve dashboard tek bir
+birincil anahtar okumasıyla çizilir.
+"""
+from datetime import datetime
+
+import click
+from sqlalchemy import delete, event, func, insert, literal, select
+
+from database import RoutingSession
+from models import db, User, Post, UserAchievement, UserStats
+
+BATCH_SIZE = 500
+
+
+def stats_select(user_ids):
+    """Verilen kullanıcılar için user_stats satırlarını üreten aggregate sorgu"""
+    likes_received = select(func.coalesce(func.sum(Post.like_count), 0)).where(
+        Post.user_id == User.id).scalar_subquery()
+    comments_received = select(func.coalesce(func.sum(Post.comment_count), 0)).where(
+        Post.user_id == User.id).scalar_subquery()
+    achievements_count = select(func.count()).where(
+        UserAchievement.user_id == User.id).scalar_subquery()
+    return select(
+        User.id,
+        func.coalesce(User.post_count, 0),
+        func.coalesce(User.follower_count, 0),
+        func.coalesce(User.followed_count, 0),
+        likes_received,
+        comments_received,
+        func.coalesce(User.points, 0),
+        func.coalesce(User.level, 1),
+        achievements_count,
+        literal(datetime.utcnow(), UserStats.updated_at.type),
+    ).where(User.id.in_(user_ids))
+
+
+STATS_COLUMNS = [
+    'user_id', 'posts_count', 'followers_count', 'following_count', 'likes_received',
+    'comments_received', 'points', 'level', 'achievements_count', 'updated_at',
+]
+
+
+def refresh_user_stats(user_ids, session=None):
+    """user_stats satırlarını aynı transaction içinde yeniden hesaplar"""
+    session = session or db.session
+    user_ids = sorted(set(user_ids))
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        batch = user_ids[start:start + BATCH_SIZE]
+        session.execute(delete(UserStats).where(UserStats.user_id.in_(batch)),
+                        execution_options={'synchronize_session': False})
+        session.execute(insert(UserStats).from_select(STATS_COLUMNS, stats_select(batch)))
+
+
+def get_stats_snapshot(user_id):
+    """Özet satırını döner; henüz yoksa oluşturur"""
+    snapshot = db.session.get(UserStats, user_id)
+    if snapshot is None:
+        refresh_user_stats([user_id])
+        db.session.commit()
+        snapshot = db.session.get(UserStats, user_id)
+    return snapshot
+
+
+@event.listens_for(RoutingSession, 'before_commit')
+def refresh_dirty_stats(session):
+    dirty = session.info.pop('stats_dirty', None)
+    if dirty:
+        # Bekleyen değişiklikler aggregate sorguya yansısın
+        session.flush()
+        refresh_user_stats(dirty, session=session)
+
+
+def refresh_all_user_stats():
+    """Tüm kullanıcıları id sırasıyla partiler halinde yeniler; kullanıcı sayısını döner"""
+    last_id = 0
+    total = 0
+    while True:
+        ids = db.session.scalars(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(BATCH_SIZE)
+        ).all()
+        if not ids:
+            break
+        refresh_user_stats(ids)
+        db.session.commit()
+        last_id = ids[-1]
+        total += len(ids)
+    return total
+
+
+def init_app(app):
+    @app.cli.command('refresh-user-stats')
+    def refresh_user_stats_command():
+        """Tüm kullanıcıların user_stats satırlarını yeniden hesaplar."""
+        total = refresh_all_user_stats()
+        click.echo(f'{total} kullanıcının istatistikleri yenilendi')
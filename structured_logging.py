@@ -0,0 +1,172 @@
+"""Kuyruk tabanlı, JSON yapılı uygulama logu.
+
+İstek thread'i log kaydını yalnızca bir kuyruğa bırakır (`QueueHandler`);
+dosyaya yazma ve rotasyon arka plandaki `QueueListener` thread'inde yapılır.
+İstek bağlamı (istek id, kullanıcı id, route, gecikme) kayda kuyruğa
+girmeden önce, istek thread'inde eklenir. Socket connect/disconnect gibi
+yüksek hacimli olaylar `extra={'sample': anahtar}` ile işaretlenir ve
+LOG_SAMPLE_RATES oranında örneklenir. Kuyruk dolarsa kayıt düşürülür; istek
+hiçbir zaman log için beklemez.
+"""
+import itertools
+import json
+import logging
+import os
+import queue
+import time
+import uuid
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+# LogRecord'un standart alanları; bunların dışındakiler JSON'a 'extra' olarak girer
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """İstek bağlamını kayda ekler; kayıt üreten thread'de çalışır"""
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+        socket_event = getattr(request, 'event', None)
+        record.request_id = g.get('request_id') or getattr(request, 'sid', None)
+        record.route = f"socket:{socket_event['message']}" if socket_event else request.endpoint
+        # current_user kullanıcıyı yükleyebilir; yalnızca zaten yüklenmişse oku
+        user = g.get('_login_user')
+        record.user_id = getattr(user, 'id', None)
+        started = g.get('_log_started')
+        if started is not None and not hasattr(record, 'latency_ms'):
+            record.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """`sample` anahtarlı kayıtların yalnızca her N'incisini geçirir"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.every = {key: max(1, round(1 / rate)) for key, rate in rates.items() if rate > 0}
+        self.dropped_keys = {key for key, rate in rates.items() if rate <= 0}
+        self.counters = {key: itertools.count() for key in self.every}
+
+    def filter(self, record):
+        key = getattr(record, 'sample', None)
+        if key is None:
+            return True
+        if key in self.dropped_keys:
+            return False
+        if key not in self.every:
+            return True
+        return next(self.counters[key]) % self.every[key] == 0
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.listener = None
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Mesaj ve traceback burada metne çevrilir; kayıt thread'ler arası güvenle taşınır
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def close(self):
+        # Kuyrukta kalanlar yazılır, listener thread'i ve log dosyası kapanır;
+        # çıkışta logging.shutdown() da bunu çağırır
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+        super().close()
+
+
+def init_app(app):
+    app.config.setdefault('LOG_FILE', os.path.join('logs', 'socialapp.log'))
+    app.config.setdefault('LOG_MAX_BYTES', 10 * 1024 * 1024)
+    app.config.setdefault('LOG_BACKUP_COUNT', 10)
+    app.config.setdefault('LOG_QUEUE_SIZE', 10000)
+    app.config.setdefault('LOG_SAMPLE_RATES', {'socket_connect': 0.1, 'socket_disconnect': 0.1})
+
+    # app.logger süreç genelinde tek; önceki create_app() çağrısının handler'ı
+    # ve listener thread'i kapatılmazsa her kayıt birden çok kez yazılır
+    for handler in list(app.logger.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            app.logger.removeHandler(handler)
+            handler.close()
+
+    log_dir = os.path.dirname(app.config['LOG_FILE'])
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    file_handler = RotatingFileHandler(app.config['LOG_FILE'],
+                                       maxBytes=app.config['LOG_MAX_BYTES'],
+                                       backupCount=app.config['LOG_BACKUP_COUNT'],
+                                       encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+    file_handler.setLevel(logging.INFO)
+
+    # Konsol çıktısı da listener thread'inden yazılır
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(default_handler.formatter)
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=app.config['LOG_QUEUE_SIZE']))
+    queue_handler.addFilter(SamplingFilter(app.config['LOG_SAMPLE_RATES']))
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.listener = QueueListener(queue_handler.queue, file_handler, console_handler,
+                                           respect_handler_level=True)
+    queue_handler.listener.start()
+
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(queue_handler)
+    app.logger.setLevel(logging.INFO)
+    app.extensions['structured_logging'] = queue_handler
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g._log_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        if 'request_id' in g:
+            response.headers['X-Request-ID'] = g.request_id
+        if request.endpoint != 'static':
+            app.logger.info('request', extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+            })
+        return response
@@ -0,0 +1,160 @@
+"""Kullanıcı dizini ve indeksli önek araması.
+
+Kullanıcı adı, ad, soyad ve "ad soyad" normalize edilerek (küçük harf,
+aksansız, ı/İ -> i) `user_search_term` tablosuna yazılır. Tablonun birincil
+anahtarı (term, user_id) ve WITHOUT ROWID olduğu için önek araması
+`term >= q AND term < q + U+10FFFF` biçiminde tek bir indeks aralık
+taramasıdır; `LIKE '%q%'` gibi tam tablo taraması yapılmaz.
+
+Sayfalama (term, user_id) üzerinden keyset ile yapılır; OFFSET kullanılmaz.
+Bir kullanıcı birden çok terimiyle eşleşirse yalnızca aralıktaki ilk terimi
+döner, böylece sayfalar arasında tekrar olmaz.
+
+Terimler, kullanıcıyı değiştiren işlemle aynı transaction'da commit'ten
+hemen önce yenilenir (stats.py ile aynı düzen).
+"""
+import unicodedata
+
+import click
+from sqlalchemy import and_, delete, event, exists, insert, inspect, select, tuple_
+from sqlalchemy.orm import aliased
+
+from database import RoutingSession, decode_cursor, encode_cursor
+from models import db, User, UserSearchTerm
+
+BATCH_SIZE = 1000
+MAX_TERM_LENGTH = 200
+SEARCH_FIELDS = ('username', 'first_name', 'last_name')
+PREFIX_END = '\U0010ffff'  # UTF-8 ikili sıralamada her karakterden büyük
+
+
+def normalize(text):
+    """Büyük/küçük harf ve aksan duyarsız arama anahtarı"""
+    if not text:
+        return ''
+    text = text.replace('ı', 'i').replace('İ', 'i')
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.casefold().split())[:MAX_TERM_LENGTH]
+
+
+def search_terms(username, first_name, last_name):
+    terms = {normalize(username), normalize(first_name), normalize(last_name),
+             normalize(f'{first_name or ""} {last_name or ""}')}
+    terms.discard('')
+    return terms
+
+
+def refresh_search_terms(user_ids, session=None):
+    """Kullanıcıların terimlerini siler ve yeniden yazar"""
+    session = session or db.session
+    user_ids = sorted(set(user_ids))
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        batch = user_ids[start:start + BATCH_SIZE]
+        session.execute(delete(UserSearchTerm).where(UserSearchTerm.user_id.in_(batch)),
+                        execution_options={'synchronize_session': False})
+        rows = session.execute(
+            select(User.id, User.username, User.first_name, User.last_name).where(User.id.in_(batch)))
+        values = [{'term': term, 'user_id': user_id}
+                  for user_id, *fields in rows for term in search_terms(*fields)]
+        if values:
+            session.execute(insert(UserSearchTerm), values)
+
+
+def rebuild_search_index():
+    """Tüm kullanıcılar için terimleri id sırasıyla partiler halinde yazar"""
+    last_id = 0
+    total = 0
+    while True:
+        ids = db.session.scalars(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(BATCH_SIZE)).all()
+        if not ids:
+            break
+        refresh_search_terms(ids)
+        db.session.commit()
+        last_id = ids[-1]
+        total += len(ids)
+    return total
+
+
+def search_cursor(cursor):
+    """(terim, kullanıcı id) imlecini çözer; geçersizse ilk sayfa"""
+    values = decode_cursor(cursor, 2)
+    if not values or not isinstance(values[0], str):
+        return None
+    try:
+        return values[0], int(values[1])
+    except (TypeError, ValueError):
+        return None
+
+
+def search_users(query, limit=20, cursor=None):
+    """Önek eşleşen kullanıcılar ve sonraki sayfanın imleci; boş sorgu tüm dizin"""
+    prefix = normalize(query)
+
+    term = UserSearchTerm.__table__
+    earlier = aliased(UserSearchTerm)
+    in_range = and_(term.c.term >= prefix, term.c.term < prefix + PREFIX_END)
+    # Aynı kullanıcının aralıkta daha önce gelen bir terimi varsa bu satırı atla
+    duplicate = exists().where(earlier.user_id == term.c.user_id,
+                               earlier.term >= prefix, earlier.term < term.c.term)
+    stmt = (select(term.c.term, User.id, User.username, User.first_name,
+                   User.last_name, User.profile_image)
+            .join(User, User.id == term.c.user_id)
+            .where(in_range, ~duplicate)
+            .order_by(term.c.term, term.c.user_id)
+            .limit(limit + 1))
+    after = search_cursor(cursor)
+    if after:
+        stmt = stmt.where(tuple_(term.c.term, term.c.user_id) > tuple_(*after))
+
+    rows = db.session.execute(stmt).all()
+    next_cursor = encode_cursor(rows[limit - 1].term, rows[limit - 1].id) if len(rows) > limit else None
+    return [{
+        'id': row.id,
+        'username': row.username,
+        'name': ' '.join(filter(None, (row.first_name, row.last_name))),
+        'profile_image': row.profile_image,
+    } for row in rows[:limit]], next_cursor
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def collect_search_changes(session, flush_context):
+    dirty = set()
+    for obj in session.new | session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if obj in session.new or any(state.attrs[name].history.has_changes() for name in SEARCH_FIELDS):
+                dirty.add(obj.id)
+    if dirty:
+        session.info.setdefault('search_dirty', set()).update(dirty)
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def drop_deleted_user_terms(session, flush_context, instances):
+    # Kullanıcı satırından önce silinmeli (yabancı anahtar)
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, User)]
+    if deleted:
+        session.execute(delete(UserSearchTerm).where(UserSearchTerm.user_id.in_(deleted)),
+                        execution_options={'synchronize_session': False})
+
+
+@event.listens_for(RoutingSession, 'before_commit')
+def refresh_dirty_search_terms(session):
+    session.flush()
+    dirty = session.info.pop('search_dirty', None)
+    if dirty:
+        refresh_search_terms(dirty, session=session)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_search_changes(session):
+    session.info.pop('search_dirty', None)
+
+
+def init_app(app):
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Kullanıcı arama terimlerini baştan oluşturur."""
+        total = rebuild_search_index()
+        click.echo(f'{total} kullanıcının arama terimleri yazıldı')